@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import time
+from core.batch_scorer import score_directory
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+def main():
+    """Headless scoring of recorded lecture videos"""
+    parser = argparse.ArgumentParser(description="Score recorded sessions for engagement offline")
+    parser.add_argument("video_dir", help="Directory containing recorded session videos")
+    parser.add_argument("--output-dir", default="batch_results", help="Where per-video summaries are written")
+    parser.add_argument("--model-path",
+                        default=os.path.join(os.getcwd(), "artifacts", "shape_predictor_68_face_landmarks.dat"))
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all CPU cores)")
+    parser.add_argument("--frame-width", type=int, default=450)
+    parser.add_argument("--course", default="")
+    parser.add_argument("--group", default="")
+    parser.add_argument("--module", default="")
+    parser.add_argument("--record-dir", default=None,
+                        help="Also write landmark recordings here for re-scoring with rescore.py")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model_path):
+        parser.error(f"Model file not found: {args.model_path}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.record_dir:
+        os.makedirs(args.record_dir, exist_ok=True)
+
+    session_defaults = {"course": args.course, "group": args.group, "module": args.module}
+    total_frames = 0
+    processed = 0
+    started = time.perf_counter()
+
+    for summary in score_directory(args.video_dir, args.model_path, session_defaults,
+                                   workers=args.workers, frame_width=args.frame_width,
+                                   record_dir=args.record_dir):
+        stem = os.path.splitext(summary["video"])[0]
+        with open(os.path.join(args.output_dir, f"{stem}.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+
+        if "error" in summary:
+            print(f"{summary['video']}: FAILED ({summary['error']})")
+            continue
+        processed += 1
+        total_frames += summary["processed_frames"]
+        print(f"{summary['video']}: {summary['engaged_percentage']:.1f}% engaged, "
+              f"{summary['processed_frames']} frames @ {summary['fps']:.1f} FPS source")
+
+    elapsed = time.perf_counter() - started
+    throughput = total_frames / elapsed if elapsed > 0 else 0.0
+    print(f"Scored {processed} videos, {total_frames} frames in {elapsed:.1f}s "
+          f"({throughput:.1f} frames/s aggregate)")
+    logger.info(f"Batch scoring: {processed} videos, {total_frames} frames, {throughput:.1f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
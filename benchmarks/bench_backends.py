@@ -0,0 +1,65 @@
+"""Compare face/landmark backends on recorded or live frames.
+
+Run from the project root:
+    python -m benchmarks.bench_backends --video lecture.mp4 --frames 120
+    python -m benchmarks.bench_backends --camera 0
+"""
+import argparse
+import os
+import cv2
+import imutils
+from config.settings import BackendConfig, PipelineConfig
+from core.face_backends import BACKENDS, benchmark_backends, create_backend, pick_backend
+
+
+def read_frames(source, count: int, width: int) -> list:
+    """Up to `count` grayscale frames from a video file or camera index"""
+    capture = cv2.VideoCapture(source)
+    frames = []
+    try:
+        while len(frames) < count:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(cv2.cvtColor(imutils.resize(frame, width=width), cv2.COLOR_BGR2GRAY))
+    finally:
+        capture.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="Video file to sample frames from")
+    source.add_argument("--camera", type=int, help="Camera index to sample frames from")
+    parser.add_argument("--frames", type=int, default=BackendConfig.BENCHMARK_FRAMES)
+    parser.add_argument("--frame-width", type=int, default=PipelineConfig.FRAME_WIDTH)
+    parser.add_argument("--model-path",
+                        default=os.path.join(os.getcwd(), "artifacts", "shape_predictor_68_face_landmarks.dat"))
+    args = parser.parse_args()
+
+    frames = read_frames(args.video if args.video else args.camera, args.frames, args.frame_width)
+    if not frames:
+        parser.error("No frames could be read from the source")
+
+    config = BackendConfig()
+    reference = create_backend("dlib", args.model_path, config)
+    backends = [reference]
+    for name in BACKENDS[1:]:
+        try:
+            backends.append(create_backend(name, args.model_path, config))
+        except RuntimeError as e:
+            print(f"{name}: unavailable ({e})")
+
+    results = benchmark_backends(frames, backends, reference)
+    print(f"{len(frames)} frames at width {args.frame_width}")
+    for r in results:
+        print(f"{r['backend']:>9}: {r['ms_per_frame']:6.2f} ms/frame, "
+              f"faces in {r['detection_rate'] * 100:5.1f}% of frames, EAR error {r['ear_mae']:.4f}")
+    reference_rate = next(r["detection_rate"] for r in results if r["backend"] == "dlib")
+    choice = pick_backend(results, config.EAR_TOLERANCE, reference_rate) or "dlib"
+    print(f"Selected: {choice} (EAR tolerance {config.EAR_TOLERANCE})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Startup time and memory of the app shell, the session modules and the dlib models.
+
+Each measurement runs in a fresh interpreter so import caches don't leak between them.
+Run from the project root:
+    python -m benchmarks.bench_startup --model artifacts/shape_predictor_68_face_landmarks.dat
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Executed in a child interpreter; prints one JSON object
+_PROBE = """
+import json, resource, sys, time
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform != "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB elsewhere
+print(json.dumps({{"seconds": elapsed, "rss_growth_mb": (peak - baseline) / scale / 1024,
+                  "peak_rss_mb": peak / scale / 1024{extra}}}))
+"""
+
+SCENARIOS = {
+    # What Streamlit pays on every cold start before the form is drawn
+    "app_shell": ("import main", ""),
+    # What used to be imported eagerly by main.py
+    "session_modules": ("import ui.session_ui", ""),
+    "models_cold": (
+        "from core.model_registry import get_model_registry\n"
+        "models = get_model_registry()\n"
+        "models.face_detector(); models.landmark_predictor({model!r})\n"
+        "second = time.perf_counter()\n"
+        "models.face_detector(); models.landmark_predictor({model!r})\n"
+        "cached = time.perf_counter() - second",
+        ', "cached_seconds": cached',
+    ),
+}
+
+
+def measure(name: str, model_path: str) -> dict:
+    body, extra = SCENARIOS[name]
+    code = _PROBE.format(body=body.format(model=model_path), extra=extra)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          cwd=os.getcwd())
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.path.join("artifacts", "shape_predictor_68_face_landmarks.dat"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name in SCENARIOS:
+        runs = [measure(name, args.model) for _ in range(args.repeat)]
+        errors = [r["error"] for r in runs if "error" in r]
+        if errors:
+            print(f"{name}: {errors[0]}")
+            continue
+        best = min(runs, key=lambda r: r["seconds"])
+        line = (f"{name}: {best['seconds'] * 1000:.0f} ms, +{best['rss_growth_mb']:.1f} MiB "
+                f"(peak {best['peak_rss_mb']:.1f} MiB)")
+        if "cached_seconds" in best:
+            line += f", cached lookup {best['cached_seconds'] * 1e6:.1f} us"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Load test for the live dashboard: event fan-out latency and memory with many publishers and viewers.
+
+Starts the server in a subprocess (or targets --url). Each step runs
+simulated kiosks that POST status events (a progress update every
+--interval seconds, plus random engaged/disengaged transitions) and
+dashboard viewers on the SSE stream, filtered by group, course or nothing.
+A few viewers can be made deliberately slow. Every step reports the
+publish round trip, the delay from an event's timestamp to its arrival at
+a viewer, how many updates were merged, and the server's CPU and memory.
+
+Run from the project root:
+    python -m benchmarks.load_dashboard --steps 100x100,300x300,500x500 --slow-viewers 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+import numpy as np
+from benchmarks.load_live import cpu_seconds, rss_mb, start_server
+
+COURSES = 20
+GROUPS = 5
+
+
+def event(index: int, event_type: str, disengaged: bool, percentage: float) -> dict:
+    return {"session_id": f"kiosk-{index}", "name": f"Student {index}", "matric_id": f"D{index:05d}",
+            "course": f"C{index % COURSES}", "group": f"G{index // COURSES % GROUPS}", "module": "load test",
+            "type": event_type, "status": "Eyes Closed" if disengaged else "Engaged", "disengaged": disengaged,
+            "engaged_percentage": percentage, "ts": time.time()}
+
+
+async def _open(host: str, port: int):
+    return await asyncio.wait_for(asyncio.open_connection(host, port), timeout=60)
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    """Status code of a keep-alive HTTP/1.1 response, after reading its body"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def publisher(host: str, port: int, index: int, interval: float, stop_at: float,
+                    transition_rate: float, rtts: list, counts: dict):
+    """One kiosk on a keep-alive connection: a progress event every `interval`, transitions at random"""
+    loop = asyncio.get_running_loop()
+    disengaged = False
+    percentage = 100.0
+    await asyncio.sleep(random.uniform(0, interval))
+    try:
+        reader, writer = await _open(host, port)
+    except (OSError, asyncio.TimeoutError):
+        counts["publish_errors"] += 1
+        return
+    try:
+        while loop.time() < stop_at:
+            events = [event(index, "progress", disengaged, percentage)]
+            if random.random() < transition_rate:
+                disengaged = not disengaged
+                percentage = max(percentage - random.uniform(0, 2), 0.0)
+                events.append(event(index, "transition", disengaged, percentage))
+            body = json.dumps(events).encode()
+            started = time.perf_counter()
+            writer.write(b"POST /api/v1/engagement/live/events HTTP/1.1\r\nHost: %s\r\n"
+                         b"Content-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+                         % (host.encode(), len(body), body))
+            if await _read_response(reader) == 200:
+                rtts.append(time.perf_counter() - started)
+                counts["published"] += len(events)
+            else:
+                counts["publish_errors"] += 1
+            await asyncio.sleep(interval)
+    except (OSError, asyncio.IncompleteReadError):
+        counts["publish_errors"] += 1
+    finally:
+        writer.close()
+
+
+async def viewer(host: str, port: int, index: int, stop_at: float, slow: float, latencies: list, counts: dict):
+    """One dashboard: the SSE stream for a group, a course or everything"""
+    loop = asyncio.get_running_loop()
+    choice = random.random()
+    query = ""
+    if choice < 0.9:
+        query = f"?course=C{index % COURSES}"
+    if choice < 0.7:
+        query += f"&group=G{index // COURSES % GROUPS}"
+    try:
+        reader, writer = await _open(host, port)
+    except (OSError, asyncio.TimeoutError):
+        counts["viewer_errors"] += 1
+        return
+    try:
+        writer.write(f"GET /api/v1/engagement/live/dashboard/stream{query} HTTP/1.1\r\nHost: {host}\r\n\r\n"
+                     .encode())
+        await reader.readuntil(b"\r\n\r\n")
+        counts["viewers"] += 1
+        name = None
+        while loop.time() < stop_at:
+            # Chunked transfer encoding: size lines and blank lines are neither "event:" nor "data:"
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b"event:"):
+                name = line[7:].strip()
+            elif line.startswith(b"data:") and name == b"update":
+                received = time.time()
+                updates = json.loads(line[5:])
+                counts["updates"] += len(updates)
+                counts["pushes"] += 1
+                if not slow:
+                    latencies.extend(received - u["ts"] for u in updates)
+                else:
+                    await asyncio.sleep(slow)  # a viewer on a bad link or a busy browser tab
+    except (OSError, asyncio.IncompleteReadError):
+        counts["viewer_errors"] += 1
+    finally:
+        writer.close()
+
+
+def dashboard_counters(base: str) -> dict:
+    counters = {}
+    with urllib.request.urlopen(f"{base}/metrics") as response:
+        text = response.read().decode()
+    for line in text.splitlines():
+        if line.startswith("ases_server_dashboard_"):
+            name, value = line.rsplit(" ", 1)
+            counters[name[len("ases_server_dashboard_"):]] = float(value)
+    return counters
+
+
+async def run_step(base: str, publishers: int, viewers: int, slow_viewers: int, seconds: float,
+                   interval: float, transition_rate: float, slow: float, server_pid: int) -> dict:
+    rtts, latencies = [], []
+    counts = {"published": 0, "publish_errors": 0, "viewers": 0, "viewer_errors": 0, "updates": 0, "pushes": 0}
+    url = urllib.parse.urlsplit(base)
+    host, port = url.hostname, url.port or 80
+    loop = asyncio.get_running_loop()
+    rss_before = rss_mb(server_pid) if server_pid else None
+    ramp = min(5.0, seconds / 4)
+    stop_at = loop.time() + ramp + seconds
+    tasks = [asyncio.create_task(viewer(host, port, i, stop_at, slow if i < slow_viewers else 0, latencies, counts))
+             for i in range(viewers)]
+    await asyncio.sleep(ramp)  # viewers connect before the measured publishing starts
+    cpu_before, wall_before = cpu_seconds(server_pid), time.perf_counter()
+    tasks += [asyncio.create_task(publisher(host, port, i, interval, stop_at, transition_rate, rtts, counts))
+              for i in range(publishers)]
+    await asyncio.sleep(max(stop_at - loop.time(), 0))
+    wall = time.perf_counter() - wall_before
+    cpu = (cpu_seconds(server_pid) - cpu_before) / wall if server_pid else None
+    rss_peak = rss_mb(server_pid) if server_pid else None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    rtt_ms = np.array(rtts or [0.0]) * 1000
+    delay_ms = np.array(latencies or [0.0]) * 1000
+    counters = dashboard_counters(base)
+    return {
+        "publishers": publishers,
+        "viewers": viewers,
+        "slow_viewers": slow_viewers,
+        "events_per_second": counts["published"] / wall,
+        "publish_rtt_p50_ms": float(np.percentile(rtt_ms, 50)),
+        "publish_rtt_p95_ms": float(np.percentile(rtt_ms, 95)),
+        "delivery_p50_ms": float(np.percentile(delay_ms, 50)),
+        "delivery_p95_ms": float(np.percentile(delay_ms, 95)),
+        "delivery_p99_ms": float(np.percentile(delay_ms, 99)),
+        "pushes_per_second": counts["pushes"] / wall,
+        "updates_delivered": counts["updates"],
+        "errors": counts["publish_errors"] + counts["viewer_errors"],
+        "connected_viewers": counts["viewers"],
+        "server_cpu": cpu,
+        "server_rss_mb_before": rss_before,
+        "server_rss_mb_peak": rss_peak,
+        "hub": counters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", default="100x100,250x250,500x500",
+                        help="Comma-separated PUBLISHERSxVIEWERS, one step each")
+    parser.add_argument("--seconds", type=float, default=20, help="Measured duration of each step")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds between a kiosk's progress events (DashboardConfig default is 5)")
+    parser.add_argument("--transition-rate", type=float, default=0.2,
+                        help="Chance that a kiosk also reports a transition with each progress event")
+    parser.add_argument("--slow-viewers", type=int, default=0, help="Viewers that pause after every push")
+    parser.add_argument("--slow-seconds", type=float, default=5.0)
+    parser.add_argument("--url", help="Target a running server instead of starting one (no CPU/RSS figures)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    # Every publisher and viewer is a socket on each side
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    server = None
+    base = args.url
+    if base is None:
+        server = start_server(args.port, tempfile.mkdtemp(prefix="ases_dashboard_"))
+        base = f"http://127.0.0.1:{args.port}"
+    results = []
+    try:
+        for step in args.steps.split(","):
+            publishers, viewers = (int(n) for n in step.lower().split("x"))
+            result = asyncio.run(run_step(base, publishers, viewers, min(args.slow_viewers, viewers), args.seconds,
+                                          args.interval, args.transition_rate, args.slow_seconds,
+                                          server.pid if server else 0))
+            results.append(result)
+            cpu = f"{result['server_cpu'] * 100:4.0f}%" if result["server_cpu"] is not None else " n/a"
+            rss = (f"{result['server_rss_mb_before']:.0f}->{result['server_rss_mb_peak']:.0f} MB"
+                   if result["server_rss_mb_peak"] is not None else "n/a")
+            print(f"{publishers:5d} publishers x {viewers:5d} viewers: {result['events_per_second']:7.0f} events/s, "
+                  f"publish p95 {result['publish_rtt_p95_ms']:6.1f} ms, delivery p50 "
+                  f"{result['delivery_p50_ms']:6.1f} ms p95 {result['delivery_p95_ms']:6.1f} ms "
+                  f"p99 {result['delivery_p99_ms']:6.1f} ms, {result['pushes_per_second']:6.0f} pushes/s, "
+                  f"server CPU {cpu}, RSS {rss}, errors {result['errors']}", flush=True)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results, "interval": args.interval, "slow_viewers": args.slow_viewers}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Load test for live scoring: how many concurrent kiosk sessions one server node sustains.
+
+Starts the server in a subprocess (or targets --url), then steps up the
+number of simulated kiosks. Each one streams synthetic per-frame EARs at
+--fps over its own WebSocket, in packets of --batch-frames, exactly as
+LiveScoringClient does. Every step reports the packet round trip (send to
+acknowledgement), frames scored per second against the offered rate, and
+the server process's CPU and memory.
+
+Run from the project root:
+    python -m benchmarks.load_live --sessions 250,500,1000,2000 --seconds 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import numpy as np
+from websockets.asyncio.client import connect
+from config.settings import LiveConfig
+from services.live_scoring import EAR_SCALE, encode_batch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def synthetic_ears(count: int, fps: float, rng) -> np.ndarray:
+    """Open eyes with blinks, and a 2-4 s eye closure every half minute or so (quantized)"""
+    ears = rng.normal(0.30, 0.01, count)
+    for start in rng.integers(0, count, max(count // int(fps * 4), 1)):
+        ears[start:start + 3] = 0.12  # blink
+    for start in range(int(fps * 20), count, int(fps * 30)):
+        ears[start:start + int(fps * rng.uniform(2, 4))] = 0.12  # sustained closure
+    return np.round(ears * EAR_SCALE).astype(np.int64)
+
+
+async def kiosk(url: str, index: int, fps: float, batch_frames: int, stop_at: float, ears: np.ndarray,
+                latencies: list, counts: dict):
+    """One simulated kiosk: hello, paced packets, then end the session and wait for its summary"""
+    loop = asyncio.get_running_loop()
+    hello = {"session_id": f"load-{os.getpid()}-{index}-{time.time_ns()}", "fps": fps,
+             "session": {"name": f"Load {index}", "matric_id": f"L{index:05d}", "course": f"C{index % 20}",
+                         "group": f"G{index % 5}", "module": "load test", "duration": 1}}
+    sent_at = {}
+    finished = loop.create_future()
+
+    async def read(ws):
+        async for message in ws:
+            reply = json.loads(message)
+            if "summary" in reply:
+                finished.set_result(reply["summary"])
+                return
+            started = sent_at.pop(reply.get("ack"), None)
+            if started is not None:
+                latencies.append(time.perf_counter() - started)
+                counts["acked_frames"] += batch_frames
+
+    try:
+        async with connect(url, open_timeout=60, close_timeout=5) as ws:
+            await ws.send(json.dumps(hello))
+            await ws.recv()
+            counts["connected"] += 1
+            reader = asyncio.create_task(read(ws))
+            interval = batch_frames / fps
+            next_send = loop.time() + random.uniform(0, interval)  # kiosks are not in lockstep
+            seq = 0
+            while next_send < stop_at:
+                await asyncio.sleep(max(next_send - loop.time(), 0))
+                offsets = np.arange(seq, seq + batch_frames) % len(ears)
+                packet = encode_batch(seq, np.arange(seq, seq + batch_frames) * 1000 // int(fps), ears[offsets])
+                seq += batch_frames
+                sent_at[seq] = time.perf_counter()
+                await ws.send(packet)
+                counts["sent_frames"] += batch_frames
+                next_send += interval
+            await ws.send(json.dumps({"type": "end"}))
+            await asyncio.wait_for(finished, timeout=60)
+            counts["finished"] += 1
+            await reader
+    except Exception as e:
+        counts["errors"] += 1
+        counts.setdefault("last_error", repr(e))
+
+
+def cpu_seconds(pid: int) -> float:
+    """User + system CPU time of a process (Linux /proc; 0 elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+def rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+async def run_step(url: str, sessions: int, seconds: float, fps: float, batch_frames: int, ramp: float,
+                   server_pid: int) -> dict:
+    rng = np.random.default_rng(sessions)
+    ears = synthetic_ears(int(fps * 120), fps, rng)
+    latencies = []
+    counts = {"connected": 0, "finished": 0, "errors": 0, "sent_frames": 0, "acked_frames": 0}
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + ramp + seconds
+    tasks = []
+    for i in range(sessions):
+        tasks.append(asyncio.create_task(kiosk(url, i, fps, batch_frames, stop_at, ears, latencies, counts)))
+        await asyncio.sleep(ramp / sessions)  # spread the connection handshakes over the ramp
+
+    # Measure only the steady state, once every kiosk is streaming
+    measure_from = len(latencies)
+    cpu_before, wall_before = cpu_seconds(server_pid), time.perf_counter()
+    acked_before = counts["acked_frames"]
+    await asyncio.sleep(max(stop_at - loop.time(), 0))
+    wall = time.perf_counter() - wall_before
+    cpu = (cpu_seconds(server_pid) - cpu_before) / wall if server_pid else None
+    rss = rss_mb(server_pid) if server_pid else None
+    scored_per_second = (counts["acked_frames"] - acked_before) / wall
+    steady = np.array(latencies[measure_from:] or [0.0]) * 1000
+    await asyncio.gather(*tasks)
+
+    return {
+        "sessions": sessions,
+        "connected": counts["connected"],
+        "errors": counts["errors"],
+        "last_error": counts.get("last_error"),
+        "offered_fps": sessions * fps,
+        "scored_fps": scored_per_second,
+        "rtt_p50_ms": float(np.percentile(steady, 50)),
+        "rtt_p95_ms": float(np.percentile(steady, 95)),
+        "rtt_p99_ms": float(np.percentile(steady, 99)),
+        "server_cpu": cpu,
+        "server_rss_mb": rss,
+        "summaries": counts["finished"],
+    }
+
+
+def start_server(port: int, workdir: str) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "server:app", "--port", str(port),
+                                "--log-level", "warning", "--backlog", "4096"],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="100,250,500,1000",
+                        help="Comma-separated numbers of concurrent kiosks, one step each")
+    parser.add_argument("--seconds", type=float, default=20, help="Steady-state duration of each step")
+    parser.add_argument("--ramp", type=float, default=5, help="Seconds over which each step's kiosks connect")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--batch-frames", type=int, default=LiveConfig.BATCH_FRAMES)
+    parser.add_argument("--slo-ms", type=float, default=250, help="p95 round trip a step must stay under")
+    parser.add_argument("--url", help="Target a running server instead of starting one (no CPU/RSS figures)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    # Every kiosk is a socket on each side
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    server = None
+    url = args.url
+    workdir = tempfile.mkdtemp(prefix="ases_load_")
+    if url is None:
+        server = start_server(args.port, workdir)
+        url = f"ws://127.0.0.1:{args.port}/api/v1/engagement/live"
+    results = []
+    try:
+        for sessions in (int(n) for n in args.sessions.split(",")):
+            result = asyncio.run(run_step(url, sessions, args.seconds, args.fps, args.batch_frames, args.ramp,
+                                          server.pid if server else 0))
+            results.append(result)
+            cpu = f"{result['server_cpu'] * 100:5.0f}%" if result["server_cpu"] is not None else "  n/a"
+            rss = f"{result['server_rss_mb']:6.0f} MB" if result["server_rss_mb"] is not None else "   n/a"
+            print(f"{sessions:6d} sessions: scored {result['scored_fps']:9.0f}/{result['offered_fps']:9.0f} "
+                  f"frames/s, RTT p50 {result['rtt_p50_ms']:7.1f} ms p95 {result['rtt_p95_ms']:7.1f} ms, "
+                  f"server CPU {cpu}, RSS {rss}, errors {result['errors']}", flush=True)
+            if result["errors"]:
+                print(f"        last error: {result['last_error']}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    sustained = [r["sessions"] for r in results
+                 if not r["errors"] and r["rtt_p95_ms"] < args.slo_ms and r["scored_fps"] >= 0.95 * r["offered_fps"]]
+    print(f"Sustained: {max(sustained) if sustained else 0} concurrent sessions "
+          f"(p95 round trip < {args.slo_ms:.0f} ms, >= 95% of frames scored, no errors; "
+          f"load generator on {'the same' if server else 'another'} host, {os.cpu_count()} CPUs)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results, "sustained_sessions": max(sustained) if sustained else 0,
+                       "fps": args.fps, "batch_frames": args.batch_frames, "cpus": os.cpu_count()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""Benchmark suite for the vision and scoring hot paths; no webcam needed.
+
+Every case runs in isolation on synthetic data (or frames from --video and
+EAR traces from --recording) and reports microseconds per operation. Results
+are written as JSON, and --compare flags regressions against a stored run.
+Synthetic frames contain no face, so vision.end_to_end is skipped unless
+--video has one; vision.landmarks predicts on hand-placed boxes either way.
+
+Run from the project root:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --tolerance 0.15
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+import cv2
+import numpy as np
+from config.settings import EngagementConfig
+from core.batch_engine import score_trace, smooth_ears
+from core.engagement_detector import EngagementDetector, ears_from_landmarks
+from core.frame_pool import FramePool
+from benchmarks.bench_engagement_detector import synthetic_ears
+
+FPS = 30.0
+SOURCE_SIZE = (640, 480)  # CameraConfig.WIDTH x HEIGHT
+
+
+@dataclass
+class Case:
+    """One benchmark: `setup` returns (op, operations per op call), or raises to skip the case"""
+    name: str
+    setup: Callable[[], Tuple[Callable[[], object], int]]
+    params: Dict = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        if not self.params:
+            return self.name
+        return f"{self.name}[{','.join(f'{k}={v}' for k, v in self.params.items())}]"
+
+
+def synthetic_landmarks(count: int, ear: float = 0.3, seed: int = 0) -> np.ndarray:
+    """(count, 68, 2) landmarks whose eyes have roughly the given aspect ratio"""
+    rng = np.random.default_rng(seed)
+    landmarks = rng.integers(100, 300, (count, 68, 2))
+    width = 30
+    ears = np.clip(rng.normal(ear, 0.03, count), 0.05, 0.5)
+    for start, x0 in ((36, 150), (42, 220)):
+        half = np.rint(ears * width / 2).astype(int)
+        # p1..p6 around the eye: EAR = (|p2-p6| + |p3-p5|) / (2 |p1-p4|) = 2 * half / width
+        xs = (x0, x0 + width // 3, x0 + 2 * width // 3, x0 + width, x0 + 2 * width // 3, x0 + width // 3)
+        for i, x in enumerate(xs):
+            landmarks[:, start + i, 0] = x
+        landmarks[:, start, 1] = landmarks[:, start + 3, 1] = 200
+        landmarks[:, start + 1, 1] = landmarks[:, start + 2, 1] = 200 - half
+        landmarks[:, start + 4, 1] = landmarks[:, start + 5, 1] = 200 + half
+    return landmarks
+
+
+def synthetic_frames(count: int, size: Tuple[int, int], seed: int = 0) -> List[np.ndarray]:
+    """Smoothed noise frames; HOG and resize costs depend on size, not content"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        frame = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+        frames.append(cv2.GaussianBlur(frame, (7, 7), 0))
+    return frames
+
+
+def video_frames(path: str, count: int) -> List[np.ndarray]:
+    capture = cv2.VideoCapture(path)
+    frames = []
+    try:
+        while len(frames) < count:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(frame)
+    finally:
+        capture.release()
+    if not frames:
+        raise RuntimeError(f"No frames could be read from {path}")
+    return frames
+
+
+def _resize(frames: List[np.ndarray], width: int) -> List[np.ndarray]:
+    return [cv2.resize(f, (width, int(f.shape[0] * width / f.shape[1])), interpolation=cv2.INTER_AREA)
+            for f in frames]
+
+
+def _calibrated_detector(config: EngagementConfig) -> EngagementDetector:
+    detector = EngagementDetector(config, FPS)
+    t = 0.0
+    while not detector.calibrate(0.3, t):
+        t += 1 / FPS
+    return detector
+
+
+class _Clock:
+    """Synthetic frame timestamps that keep advancing across repeats"""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def next(self) -> float:
+        self.t += 1 / FPS
+        return self.t
+
+
+def scoring_cases(ears: np.ndarray) -> List[Case]:
+    config = EngagementConfig()
+    chunk = ears[:1000].tolist()
+    landmarks = synthetic_landmarks(1000)
+    eye = landmarks[0, 36:42]
+
+    def ear_single():
+        return lambda: EngagementDetector.eye_aspect_ratio(eye), 1
+
+    def ear_from_landmarks():
+        detector = EngagementDetector(config, FPS)
+        return lambda: detector.ear_from_landmarks(landmarks[0]), 1
+
+    def ear_vectorised():
+        return lambda: ears_from_landmarks(landmarks), len(landmarks)
+
+    def detect_engagement():
+        detector, clock = _calibrated_detector(config), _Clock()
+
+        def op():
+            for ear in chunk:
+                detector.detect_engagement(ear, clock.next())
+        return op, len(chunk)
+
+    def update_threshold():
+        detector, clock = _calibrated_detector(config), _Clock()
+        start = clock.t
+
+        def op():
+            for ear in chunk:
+                t = clock.next()
+                detector.ear_history.append(ear)  # what detect_engagement records for it
+                detector.ear_times.append(t)
+                detector.update_threshold_dynamically(t, start)
+        return op, len(chunk)
+
+    def scoring_frame():
+        detector, clock = _calibrated_detector(config), _Clock()
+        start = clock.t
+
+        def op():
+            for ear in chunk:
+                t = clock.next()
+                detector.detect_engagement(detector.smooth_ear(ear), t)
+                detector.update_threshold_dynamically(t, start)
+        return op, len(chunk)
+
+    def batch_score_trace():
+        present = ears > 0
+        timestamps = np.arange(len(ears)) / FPS
+        return lambda: score_trace(ears, present, timestamps, FPS, config), len(ears)
+
+    def batch_smoothing():
+        present = ears > 0
+        return lambda: smooth_ears(ears, present, config.EAR_SMOOTHING_WINDOW), len(ears)
+
+    return [
+        Case("ear.eye_aspect_ratio", ear_single),
+        Case("ear.from_landmarks", ear_from_landmarks),
+        Case("ear.vectorised", ear_vectorised, {"frames": len(landmarks)}),
+        Case("detector.detect_engagement", detect_engagement),
+        Case("detector.update_threshold_dynamically", update_threshold),
+        Case("detector.frame", scoring_frame),
+        Case("batch.smooth_ears", batch_smoothing, {"frames": len(ears)}),
+        Case("batch.score_trace", batch_score_trace, {"frames": len(ears)}),
+    ]
+
+
+def preprocess_cases(frames: List[np.ndarray], widths: List[int]) -> List[Case]:
+    def pooled(width: int):
+        def setup():
+            pool, i = FramePool(width), [0]
+
+            def op():
+                slot = pool.load(frames[i[0] % len(frames)])
+                slot.gray()
+                slot.release()
+                i[0] += 1
+            return op, 1
+        return setup
+
+    return [Case("preprocess.pooled", pooled(w), {"width": w}) for w in widths]
+
+
+def vision_cases(frames: List[np.ndarray], widths: List[int], face_counts: List[int],
+                 model_path: str) -> List[Case]:
+    """dlib cases; each one is skipped when dlib or the landmark model is unavailable"""
+    config = EngagementConfig()
+
+    def models():
+        from core.model_registry import get_model_registry
+        if not os.path.exists(model_path):
+            raise RuntimeError(f"landmark model not found: {model_path}")
+        registry = get_model_registry()
+        return registry.face_detector(), registry.landmark_predictor(model_path)
+
+    def grays(width: int) -> List[np.ndarray]:
+        return [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in _resize(frames, width)]
+
+    def detection(width: int):
+        def setup():
+            detector, _ = models()
+            images, i = grays(width), [0]
+
+            def op():
+                detector(images[i[0] % len(images)], 0)
+                i[0] += 1
+            return op, 1
+        return setup
+
+    def landmarks(faces: int):
+        def setup():
+            import dlib
+            from core.face_analyzer import FaceAnalyzer
+            analyzer = FaceAnalyzer(*models())
+            image = grays(max(widths))[0]
+            height, width = image.shape
+            side = max(40, min(width // faces, height) - 4)
+            boxes = [dlib.rectangle(x, 0, x + side, side) for x in range(0, side * faces, side)]
+            out = np.zeros((68, 2), dtype=int)
+
+            def op():
+                for box in boxes:
+                    analyzer.predict_landmarks(image, box, out)
+            return op, 1
+        return setup
+
+    def end_to_end(width: int):
+        def setup():
+            from core.face_analyzer import FaceAnalyzer
+            face_detector, landmark_predictor = models()
+            # Without a face this would only time resize and HOG, which vision.detect already covers
+            if not any(len(face_detector(gray, 0)) for gray in grays(width)):
+                raise RuntimeError("no face detected in the frames; pass --video with a recorded face")
+            analyzer = FaceAnalyzer(face_detector, landmark_predictor)
+            detector, clock = _calibrated_detector(config), _Clock()
+            pool, i = FramePool(width), [0]
+
+            def op():
+                slot = pool.load(frames[i[0] % len(frames)])
+                landmarks = analyzer.analyze(slot.gray())
+                ear = 0 if landmarks is None else detector.smooth_ear(detector.ear_from_landmarks(landmarks))
+                t = clock.next()
+                detector.detect_engagement(ear, t)
+                detector.update_threshold_dynamically(t, 0.0)
+                slot.release()
+                i[0] += 1
+            return op, 1
+        return setup
+
+    return ([Case("vision.detect", detection(w), {"width": w}) for w in widths]
+            + [Case("vision.landmarks", landmarks(n), {"faces": n}) for n in face_counts]
+            + [Case("vision.end_to_end", end_to_end(w), {"width": w}) for w in widths])
+
+
+def run_case(case: Case, repeat: int, min_time: float) -> Dict:
+    """Median, min and spread of per-operation time over `repeat` timed runs"""
+    try:
+        op, ops = case.setup()
+    except Exception as e:
+        return {"case": case.key, "skipped": f"{type(e).__name__}: {e}"}
+
+    # Calibrate the loop count so one run lasts at least min_time
+    started = time.perf_counter()
+    op()
+    calls = max(1, int(min_time / max(time.perf_counter() - started, 1e-9)))
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # as timeit does; collections are run between repeats
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(calls):
+                op()
+            samples.append((time.perf_counter() - started) / (calls * ops) * 1e6)
+            gc.collect()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "case": case.key, "name": case.name, "params": case.params,
+        "us_per_op": statistics.median(samples), "us_min": min(samples),
+        "us_stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_run": calls * ops, "repeat": repeat,
+    }
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "machine": platform.node(), "platform": platform.platform(), "processor": platform.processor(),
+        "cpu_count": os.cpu_count(), "python": platform.python_version(),
+        "numpy": np.__version__, "opencv": cv2.__version__, "commit": commit, "created_at": time.time(),
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[Dict]:
+    """Per-case ratio against the baseline run; status is regression, improvement or ok.
+
+    Runs are compared on their fastest repeat, which is the least disturbed by
+    other load on the machine (the same reasoning as timeit's min).
+    """
+    previous = {r["case"]: r for r in baseline.get("results", []) if "us_min" in r}
+    rows = []
+    for result in results:
+        base = previous.get(result["case"])
+        if base is None or "us_min" not in result:
+            continue
+        ratio = result["us_min"] / base["us_min"] if base["us_min"] > 0 else float("inf")
+        status = "regression" if ratio > 1 + tolerance else "improvement" if ratio < 1 - tolerance else "ok"
+        rows.append({"case": result["case"], "baseline_us": base["us_min"], "us": result["us_min"],
+                     "ratio": ratio, "status": status})
+    return rows
+
+
+def _ints(text: str) -> List[int]:
+    return [int(v) for v in text.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Flag regressions against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Relative slowdown that counts as a regression (default 0.15)")
+    parser.add_argument("--only", action="append", default=[], help="Run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed run")
+    parser.add_argument("--widths", type=_ints, default=[320, 450, 640], help="Frame widths, e.g. 320,450,640")
+    parser.add_argument("--faces", type=_ints, default=[1, 4, 8],
+                        help="Hand-placed face boxes per frame for vision.landmarks (detection is unaffected)")
+    parser.add_argument("--video", help="Recorded video to take frames from instead of synthetic ones; "
+                                        "vision.end_to_end needs one with a face")
+    parser.add_argument("--recording", help="Landmark recording (.lmr) to take the EAR trace from")
+    parser.add_argument("--minutes", type=float, default=10, help="Length of the synthetic EAR trace")
+    parser.add_argument("--model", default=os.path.join("artifacts", "shape_predictor_68_face_landmarks.dat"))
+    args = parser.parse_args()
+
+    frames = video_frames(args.video, 30) if args.video else synthetic_frames(8, SOURCE_SIZE)
+    if args.recording:
+        from core.landmark_recording import LandmarkRecording
+        with LandmarkRecording(args.recording) as recording:
+            ears = np.where(recording.present, ears_from_landmarks(recording.landmarks), 0.0)
+    else:
+        ears = synthetic_ears(int(args.minutes * 60 * FPS))
+
+    cases = (scoring_cases(ears) + preprocess_cases(frames, args.widths)
+             + vision_cases(frames, args.widths, args.faces, args.model))
+    if args.only:
+        cases = [c for c in cases if any(s in c.key for s in args.only)]
+
+    results = []
+    for case in cases:
+        result = run_case(case, args.repeat, args.min_time)
+        results.append(result)
+        if "skipped" in result:
+            print(f"{case.key:<48} skipped ({result['skipped']})")
+        else:
+            print(f"{case.key:<48} {result['us_per_op']:>12.3f} us/op (min {result['us_min']:.3f}, "
+                  f"sd {result['us_stdev']:.3f})")
+
+    report = {"environment": environment(), "source": {"video": args.video, "recording": args.recording},
+              "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("environment", {}).get("machine") != report["environment"]["machine"]:
+            print("warning: baseline was recorded on a different machine")
+        rows = compare(results, baseline, args.tolerance)
+        print(f"\nAgainst {args.compare} (tolerance {args.tolerance:.0%}):")
+        for row in rows:
+            print(f"{row['case']:<48} {row['baseline_us']:>12.3f} -> {row['us']:>12.3f} us "
+                  f"({row['ratio']:.2f}x) {row['status'].upper() if row['status'] != 'ok' else ''}")
+        regressions = [r for r in rows if r["status"] == "regression"]
+        if regressions:
+            print(f"{len(regressions)} regression(s)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
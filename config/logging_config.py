@@ -1,11 +1,52 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from config.settings import LoggingConfig
+
+_listener = None
+_setup_lock = threading.Lock()
+
 
 def setup_logging():
-    """Setup logging with rotation to prevent large log files"""
-    handler = RotatingFileHandler("client.log", maxBytes=10*1024*1024, backupCount=3)
-    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    """Setup logging once per process.
+
+    Records are handed to a queue and written by a background listener
+    thread, so callers never wait on disk I/O. Safe to call from every
+    module and on every Streamlit rerun.
+    """
+    global _listener
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-    logger.addHandler(handler)
+    with _setup_lock:
+        if _listener is None:
+            config = LoggingConfig()
+            handler = RotatingFileHandler(config.LOG_FILE, maxBytes=config.MAX_BYTES,
+                                          backupCount=config.BACKUP_COUNT)
+            handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+            log_queue = queue.SimpleQueue()
+            logger.setLevel(config.LEVEL)
+            logger.addHandler(QueueHandler(log_queue))
+            _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)
     return logger
+
+
+class RateLimiter:
+    """Lets a per-frame log statement through at most once per interval"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.suppressed = 0
+        self._next = 0.0
+
+    def ready(self) -> bool:
+        now = time.monotonic()
+        if now < self._next:
+            self.suppressed += 1
+            return False
+        self._next = now + self.interval
+        return True
@@ -12,4 +12,176 @@ class EngagementConfig:
     ALERT_COOLDOWN: int = 5  # seconds
     DISENGAGED_THRESHOLD: float = 1.5  # seconds
     DYNAMIC_ADJUSTMENT_INTERVAL: int = 30  # seconds
-    
\ No newline at end of file
+    MAX_SESSION_MINUTES: int = 120  # sizes the preallocated status timeline
+    # Per-student calibration profiles: repeat sessions skip calibration and validate in the background
+    CALIBRATION_CACHE_PATH: str = "calibration_profiles.json"
+    CALIBRATION_CACHE_TTL_DAYS: float = 30
+    VALIDATION_DURATION: float = 2.0  # seconds of open-eye samples checked against the profile
+    VALIDATION_TOLERANCE: float = 0.15  # relative drift of the baseline EAR that forces recalibration
+    # Face localisation: full HOG detection every N frames, correlation tracking in between
+    FACE_TRACKING: bool = True
+    REDETECT_INTERVAL: int = 10  # frames
+    TRACKING_MIN_CONFIDENCE: float = 7.0  # correlation tracker peak-to-sidelobe ratio
+    TRACKING_FALLBACK: str = "roi"  # "roi": search padded window around last face first, "full": whole frame
+    TRACKING_ROI_PADDING: float = 0.5  # fraction of the face box added on each side
+
+
+@dataclass
+class PipelineConfig:
+    """Configuration for the capture / analysis / presentation pipeline"""
+    FRAME_WIDTH: int = 450
+    CAPTURE_QUEUE_SIZE: int = 1  # frames waiting for analysis (oldest dropped)
+    DISPLAY_QUEUE_SIZE: int = 1  # analysed frames waiting for display (oldest dropped)
+    CAPTURE_RETRIES: int = 3
+    STATS_REFRESH_INTERVAL: float = 1.0  # seconds
+    DISPLAY_FPS: float = 15.0  # frames pushed to the browser, independent of the analysis rate
+    JPEG_QUALITY: int = 70  # 0-100; lower saves bandwidth on remote classrooms
+    # Governor: skip frames, then shrink the processing width, to keep analysis within a CPU budget
+    ADAPTIVE_GOVERNOR: bool = True
+    CPU_BUDGET: float = 0.6  # fraction of wall time the analysis loop may be busy
+    MIN_FRAME_WIDTH: int = 240
+    MAX_FRAME_SKIP: int = 3  # frames skipped between analysed frames
+    GOVERNOR_INTERVAL: int = 15  # analysed frames between adjustments
+    FRAME_POOL_SLOTS: int = 6  # preallocated frame buffers; covers every stage and queue holding one
+
+
+@dataclass
+class BackendConfig:
+    """Face detector / landmark predictor selection"""
+    BACKEND: str = "dlib"  # "dlib" (HOG), "yunet", "haar", "haar_lbf" or "auto" (benchmark once per machine)
+    YUNET_MODEL_PATH: str = "artifacts/face_detection_yunet_2023mar.onnx"
+    YUNET_SCORE_THRESHOLD: float = 0.7
+    LBF_MODEL_PATH: str = "artifacts/lbfmodel.yaml"
+    BENCHMARK_FRAMES: int = 60
+    EAR_TOLERANCE: float = 0.02  # max mean absolute EAR difference from dlib for "auto" to pick a backend
+    BENCHMARK_CACHE_PATH: str = "backend_benchmark.json"
+
+
+@dataclass
+class RecordingConfig:
+    """Optional per-frame landmark recording for offline re-scoring"""
+    ENABLED: bool = False
+    DIRECTORY: str = "recordings"
+    CHUNK_FRAMES: int = 256  # frames buffered in memory per chunk written
+
+
+@dataclass
+class ClassroomConfig:
+    """Configuration for multi-student classroom monitoring from one camera"""
+    FRAME_WIDTH: int = 800  # wider than single-student mode so distant faces stay detectable
+    IOU_MATCH_THRESHOLD: float = 0.3  # minimum box overlap to keep a student's identity
+    MAX_MISSED_FRAMES: int = 90  # frames an identity may go unseen before it is retired
+    MIN_TRACK_FRAMES: int = 30  # identities seen for fewer frames are not reported
+    LANDMARK_WORKERS: int = 4
+
+
+@dataclass
+class ServerConfig:
+    """Configuration for the ingestion server"""
+    DATABASE_PATH: str = "engagement.db"
+    BATCH_SIZE: int = 500  # summaries per SQLite transaction
+    FLUSH_INTERVAL: float = 0.5  # seconds between time-triggered flushes
+    MAX_PENDING: int = 50000  # uploads buffered in memory before callers wait for a flush
+    ROLLUP_BUCKET_SECONDS: int = 3600  # time-window granularity of the engagement rollups
+    EXPORT_CHUNK_SIZE: int = 1000  # rows per read transaction when streaming exports
+
+
+@dataclass
+class UploadConfig:
+    """Configuration for the background upload client"""
+    SERVER_URL: str = "http://127.0.0.1:8000"
+    OUTBOX_PATH: str = "engagement_outbox.jsonl"
+    BATCH_SIZE: int = 100  # summaries per bulk request when replaying the outbox
+    POOL_SIZE: int = 4
+    REQUEST_TIMEOUT: float = 10.0  # seconds
+    BACKOFF_BASE: float = 1.0  # seconds, doubled after each failed attempt
+    BACKOFF_MAX: float = 60.0  # seconds
+
+
+@dataclass
+class LiveConfig:
+    """Thin-client mode: per-frame EARs are streamed to the server and scored there"""
+    ENABLED: bool = False
+    SERVER_URL: str = "ws://127.0.0.1:8000/api/v1/engagement/live"
+    BATCH_FRAMES: int = 15  # frames per packet (6 bytes each)
+    BATCH_INTERVAL: float = 0.5  # seconds; a partial batch is sent after this long
+    QUEUE_FRAMES: int = 9000  # unacknowledged frames kept while the server is unreachable (~5 min at 30 FPS)
+    RECONNECT_BACKOFF_MAX: float = 30.0  # seconds
+    CLOSE_TIMEOUT: float = 10.0  # seconds to wait for the server's final summary
+    RESUME_SECONDS: float = 60.0  # server side: how long a dropped session waits for its kiosk to reconnect
+
+
+@dataclass
+class DashboardConfig:
+    """Live instructor dashboard: session status events fanned out to viewers"""
+    ENABLED: bool = False  # kiosks publish status events (sessions scored by the server are always published)
+    PROGRESS_INTERVAL: float = 5.0  # seconds between engagement percentage updates per session
+    PUBLISH_QUEUE: int = 1000  # kiosk side: events waiting to be sent; the oldest are dropped
+    PUBLISH_BATCH: int = 100  # kiosk side: events per request
+    REQUEST_TIMEOUT: float = 2.0  # seconds
+    EVENT_BUFFER: int = 500  # server side: recent events kept per course and group
+    STALE_SECONDS: float = 300.0  # sessions without an update for this long leave the dashboard
+    COALESCE_INTERVAL: float = 0.5  # minimum seconds between pushes to one viewer; updates in between are merged
+    HEARTBEAT_SECONDS: float = 15.0  # keep-alive comment on idle streams
+
+
+@dataclass
+class AlertConfig:
+    """Configuration for spoken alerts; each phrase is rendered once and replayed from a cache"""
+    PHRASES: tuple = ("Please stay engaged!", "Please focus on the screen!")  # rendered at startup
+    CACHE_DIR: str = "alert_audio"
+    RATE: int = 150  # words per minute
+    VOLUME: float = 0.9
+
+
+@dataclass
+class ChatConfig:
+    """Configuration for the chatbot model, prompt window and response cache"""
+    MODEL: str = "gemma3:4b"
+    OLLAMA_HOST: str = ""  # empty: the client default (OLLAMA_HOST env var, else localhost:11434)
+    SYSTEM_PROMPT: str = "You are a helpful assistant for students, providing guidance on lectures and engagement tips."
+    HISTORY_TOKEN_BUDGET: int = 1500  # estimated prompt tokens: system prompt, summary, recent turns, question
+    SUMMARY_TOKEN_BUDGET: int = 150  # earlier questions dropped from the window are listed within this
+    CACHE_SIZE: int = 256  # responses kept in the LRU cache
+    CACHE_CONTEXT_TURNS: int = 2  # preceding messages that are part of the cache key
+    # Sidecar: the chat page runs as its own Streamlit server, started on first use
+    SIDECAR_PORT: int = 8502
+    SIDECAR_LOG: str = "chatbot.log"
+    READY_TIMEOUT: float = 30.0  # seconds to wait for the sidecar's health endpoint
+    HEALTH_PATH: str = "/_stcore/health"
+    HEALTH_RECHECK_SECONDS: float = 10.0  # a sidecar that answered is probed again at most this often
+    RESTART_BACKOFF_BASE: float = 1.0  # seconds, doubled after each crash
+    RESTART_BACKOFF_MAX: float = 60.0  # seconds
+    STABLE_SECONDS: float = 60.0  # uptime after which a crash counts as the first one again
+
+
+@dataclass
+class MetricsConfig:
+    """Configuration for hot-path instrumentation"""
+    ENABLED: bool = True
+    EXPORT_PORT: int = 9108  # Prometheus text endpoint for the kiosk; 0 disables it
+
+
+@dataclass
+class LoggingConfig:
+    """Configuration for the background log writer"""
+    LOG_FILE: str = "client.log"
+    LEVEL: str = "INFO"
+    MAX_BYTES: int = 10 * 1024 * 1024
+    BACKUP_COUNT: int = 3
+    FRAME_LOG_INTERVAL: float = 1.0  # seconds between sampled per-frame debug records
+
+
+@dataclass
+class CameraConfig:
+    """Configuration for camera probing and the warm capture handle"""
+    PROBE_INDICES: int = 3
+    PROBE_FRAMES: int = 30
+    WIDTH: int = 640
+    HEIGHT: int = 480
+    TARGET_FPS: int = 30
+    CAPTURE_BUFFERS: int = 3  # frames the capture thread reads into in rotation
+    CACHE_PATH: str = "camera_cache.json"
+    CACHE_TTL_HOURS: float = 24 * 7  # re-measure a device's FPS after this long
+    READY_TIMEOUT: float = 5.0  # seconds to wait for the first frame
+    IDLE_RELEASE_SECONDS: float = 600  # close a warm handle unused for this long
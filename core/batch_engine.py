@@ -0,0 +1,201 @@
+import itertools
+import numpy as np
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+from config.settings import EngagementConfig
+from core.engagement_detector import ears_from_landmarks
+
+# Same tolerance the streaming detector applies to its accumulated seconds
+_EPS = 1e-9
+
+
+@dataclass
+class BatchResult:
+    """Outcome of scoring one trace with one configuration"""
+    config: EngagementConfig
+    calibrated: bool
+    ear_thresh: float
+    total_disengaged: int  # timeline ticks (1/fps seconds each)
+    engaged_status: np.ndarray = field(repr=False)
+
+    @property
+    def engaged_fraction(self) -> float:
+        if not len(self.engaged_status):
+            return 0.0
+        return float(np.count_nonzero(self.engaged_status)) / len(self.engaged_status)
+
+
+def _ring_means(values: np.ndarray, window: int) -> np.ndarray:
+    """RingBuffer.mean after each append, with the buffer's exact float arithmetic.
+
+    The buffer keeps a running sum (subtract oldest, add newest) and re-sums
+    itself every `window` writes, so each block of `window` writes is replayed
+    as `window` vector steps across all blocks at once.
+    """
+    n = len(values)
+    blocks = -(-n // window)
+    v = np.zeros(blocks * window)
+    v[:n] = values
+    v = v.reshape(blocks, window)
+    resums = v.sum(axis=1)  # the buffer's data[:count].sum() at the end of each block
+
+    sums = np.empty_like(v)
+    current = np.empty(blocks)
+    current[0] = 0.0
+    current[1:] = resums[:-1]
+    for j in range(window):
+        if j < window - 1:
+            if blocks > 1:
+                current[1:] -= v[:-1, j]  # oldest value, written one block earlier
+            current += v[:, j]
+            sums[:, j] = current
+        else:
+            sums[:, j] = resums
+    sums = sums.reshape(-1)[:n]
+    return sums / np.minimum(np.arange(1, n + 1), window)
+
+
+def smooth_ears(raw: np.ndarray, present: np.ndarray, window: int) -> np.ndarray:
+    """EngagementDetector.smooth_ear for a whole trace: mean of the last `window` raw EARs
+    of frames with a face; frames without a face read 0"""
+    values = raw[present]
+    smoothed = np.zeros(len(raw))
+    if values.size:
+        smoothed[present] = _ring_means(values, max(1, int(window)))
+    return smoothed
+
+
+def _run_sums(values: np.ndarray, reset: np.ndarray) -> np.ndarray:
+    """Running sum of `values` that restarts from zero at every `reset` frame"""
+    sums = np.cumsum(values)
+    last_reset = np.maximum.accumulate(np.where(reset, np.arange(len(values)), -1))
+    base = np.where(last_reset >= 0, sums[np.maximum(last_reset, 0)], 0.0)
+    return sums - base
+
+
+def _threshold_schedule(ears: np.ndarray, times: np.ndarray, start_time: float, thresh: float,
+                        config: EngagementConfig, fps: float) -> Tuple[np.ndarray, float]:
+    """EAR threshold in force for each detection frame (and after the last one),
+    replaying update_threshold_dynamically.
+
+    The threshold can only change when the adjustment tick changes, so the loop runs once per
+    DYNAMIC_ADJUSTMENT_INTERVAL rather than once per frame.
+    """
+    interval = config.DYNAMIC_ADJUSTMENT_INTERVAL
+    capacity = max(1, int(fps * 60))  # ear_history ring buffer size
+    period = 1.0 / fps
+    ticks = (times - start_time) // interval
+    boundaries = np.flatnonzero(np.concatenate(([True], ticks[1:] != ticks[:-1])))
+
+    schedule = np.empty(len(ears))
+    first = 0
+    for j in boundaries:
+        schedule[first:j + 1] = thresh  # frame j is scored before the update runs
+        first = j + 1
+        lo = max(0, j - capacity + 1)
+        if times[j] - times[lo] + period <= interval:
+            continue
+        recent = ears[lo:j + 1][times[lo:j + 1] > times[j] - interval]
+        recent = recent[recent > thresh * 0.9]
+        if recent.size:
+            new_thresh = np.clip(recent.mean() * 0.85, config.MIN_EAR_THRESH, config.MAX_EAR_THRESH)
+            if abs(new_thresh - thresh) > 0.01:
+                thresh = new_thresh
+    schedule[first:] = thresh
+    return schedule, float(thresh)
+
+
+def score_trace(raw: np.ndarray, present: np.ndarray, timestamps: np.ndarray, fps: float,
+                config: Optional[EngagementConfig] = None, smoothed: Optional[np.ndarray] = None) -> BatchResult:
+    """Score a whole trace with array operations; matches the streaming EngagementDetector.
+
+    `raw` holds per-frame EARs (ignored where `present` is False) and `timestamps` the
+    frame times in seconds. Pass `smoothed` to reuse smoothing across configurations.
+    """
+    config = config or EngagementConfig()
+    raw = np.asarray(raw, dtype=np.float64)
+    present = np.asarray(present, dtype=bool)
+    times = np.asarray(timestamps, dtype=np.float64)
+    period = 1.0 / fps
+    empty = BatchResult(config, False, config.INITIAL_EAR_THRESH, 0, np.zeros(0, dtype=np.int8))
+    if not len(times):
+        return empty
+    ears = smoothed if smoothed is not None else smooth_ears(raw, present, config.EAR_SMOOTHING_WINDOW)
+
+    dt = np.empty(len(times))
+    dt[0] = period
+    dt[1:] = np.maximum(np.diff(times), 0.0)
+
+    # Calibration: valid seconds accumulate until CALIBRATION_DURATION is reached
+    valid = ears > 0.1
+    calibration_seconds = np.cumsum(np.where(valid, dt, 0.0))
+    done = calibration_seconds >= config.CALIBRATION_DURATION - _EPS
+    if not done.any():
+        return empty
+    c = int(np.argmax(done))
+    mean_ear = np.cumsum(np.where(valid, ears, 0.0))[c] / np.count_nonzero(valid[:c + 1])
+    thresh = np.clip(mean_ear * 0.85, config.MIN_EAR_THRESH, config.MAX_EAR_THRESH)
+
+    # Detection runs from the frame after calibration completes
+    d0 = c + 1
+    ear, t, dt = ears[d0:], times[d0:], dt[d0:]
+    if not len(ear):
+        return BatchResult(config, True, float(thresh), 0, np.zeros(0, dtype=np.int8))
+    schedule, final_thresh = _threshold_schedule(ear, t, times[c], thresh, config, fps)
+
+    # Previous raw EAR in the smoothing buffer, and how many values it holds (at most its window)
+    present_count = np.minimum(np.cumsum(present), max(1, int(config.EAR_SMOOTHING_WINDOW)))
+    present_idx = np.flatnonzero(present)
+    prev_raw = np.zeros(len(times))
+    prev_raw[present_idx[1:]] = raw[present_idx[:-1]]
+    prev_raw, present_count = prev_raw[d0:], present_count[d0:]
+
+    capacity = max(1, int(fps * 60))
+    oldest = np.maximum(np.arange(len(t)) - capacity + 1, 0)
+    history_seconds = t - t[oldest] + period
+
+    away = ear == 0
+    blink = (~away & (history_seconds >= config.BLINK_DURATION) & (present_count >= 2)
+             & (ear < schedule * 0.7) & (prev_raw > schedule * 0.9))
+    open_or_closed = ~away & ~blink
+    closed = open_or_closed & (ear < schedule)
+
+    lookdown_seconds = _run_sums(np.where(away, dt, 0.0), ~away)
+    blink_seconds = _run_sums(np.where(blink, dt, 0.0), open_or_closed)
+    closed_seconds = _run_sums(np.where(closed, dt, 0.0), open_or_closed & ~closed)
+    disengaged_after = config.DISENGAGED_THRESHOLD - _EPS
+    disengaged = np.where(away, lookdown_seconds >= disengaged_after,
+                          np.where(blink, blink_seconds > config.BLINK_DURATION + _EPS,
+                                   closed_seconds >= disengaged_after))
+
+    # Wall-clock timeline: each frame holds its status over the ticks since the previous one
+    timeline_start = t[0] - period
+    target = np.rint((t - timeline_start) * fps).astype(np.int64)
+    logged = np.concatenate(([0], np.maximum.accumulate(target)[:-1]))
+    ticks = np.maximum(target - logged, 0)
+    engaged_status = np.repeat(np.where(disengaged, 0, 1).astype(np.int8), ticks)
+    return BatchResult(config, True, final_thresh, int(ticks[disengaged].sum()), engaged_status)
+
+
+def score_grid(raw: np.ndarray, present: np.ndarray, timestamps: np.ndarray, fps: float,
+               grid: Dict[str, Sequence], base: Optional[EngagementConfig] = None) -> List[Tuple[Dict, BatchResult]]:
+    """Score one trace against every combination of the EngagementConfig values in `grid`"""
+    base = base or EngagementConfig()
+    names = list(grid)
+    smoothed_by_window = {}
+    results = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        overrides = dict(zip(names, values))
+        config = replace(base, **overrides)
+        window = config.EAR_SMOOTHING_WINDOW
+        if window not in smoothed_by_window:
+            smoothed_by_window[window] = smooth_ears(raw, present, window)
+        results.append((overrides, score_trace(raw, present, timestamps, fps, config,
+                                               smoothed_by_window[window])))
+    return results
+
+
+def score_landmarks(landmarks: np.ndarray, present: np.ndarray, timestamps: np.ndarray, fps: float,
+                    config: Optional[EngagementConfig] = None) -> BatchResult:
+    """score_trace for an (N, 68, 2) landmark array"""
+    return score_trace(ears_from_landmarks(landmarks), present, timestamps, fps, config)
@@ -0,0 +1,158 @@
+import os
+import time
+import cv2
+import imutils
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+from config.settings import EngagementConfig
+from core.data_models import SessionData
+from core.engagement_detector import EngagementDetector
+from core.face_analyzer import create_face_analyzer
+from core.landmark_recording import LandmarkRecorder
+from core.model_registry import get_model_registry
+from services.api_service import build_engagement_summary
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+DEFAULT_FPS = 30.0
+
+# Per-process models, loaded once by the pool initializer
+_face_detector = None
+_landmark_predictor = None
+
+
+def _init_worker(model_path: str):
+    """Load the dlib detector and predictor once per worker process"""
+    global _face_detector, _landmark_predictor
+    cv2.setNumThreads(1)  # One video per core; avoid oversubscribing with OpenCV threads
+    models = get_model_registry()
+    _face_detector = models.face_detector()
+    _landmark_predictor = models.landmark_predictor(model_path)
+
+
+def find_videos(directory: str) -> List[str]:
+    """Video files in a directory, sorted by name"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(VIDEO_EXTENSIONS)
+    )
+
+
+def score_video(path: str, session: SessionData, config: Optional[EngagementConfig] = None,
+                frame_width: int = 450, record_path: Optional[str] = None) -> Dict:
+    """Run calibration and engagement detection over a recorded video.
+
+    Uses the file's own frame rate and frame timestamps in place of the
+    live camera probe and wall clock.
+    """
+    config = config or EngagementConfig()
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps or fps <= 0:
+        fps = DEFAULT_FPS
+        logger.warning(f"{path}: unknown frame rate, assuming {DEFAULT_FPS} FPS")
+
+    detector_engine = EngagementDetector(config, fps)
+    face_analyzer = create_face_analyzer(_face_detector, _landmark_predictor, config)
+    recorder = (LandmarkRecorder(record_path, fps, video=os.path.basename(path), frame_width=frame_width)
+                if record_path else None)
+
+    frames = 0
+    start_time = None
+    started = time.perf_counter()
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            current_time = frames / fps
+            frames += 1
+
+            frame = imutils.resize(frame, width=frame_width)
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+            ear = 0
+            landmarks = None
+            face = face_analyzer.detect_primary(gray)
+            if face is not None:
+                landmarks = face_analyzer.predict_landmarks(gray, face)
+                ear = detector_engine.smooth_ear(detector_engine.ear_from_landmarks(landmarks))
+            if recorder is not None:
+                box = None if face is None else (face.left(), face.top(), face.right(), face.bottom())
+                recorder.append(current_time, box, landmarks)
+
+            if not detector_engine.is_calibrated:
+                if detector_engine.calibrate(ear, current_time):
+                    start_time = current_time
+            else:
+                detector_engine.detect_engagement(ear, current_time)
+                detector_engine.update_threshold_dynamically(current_time, start_time)
+    finally:
+        cap.release()
+        if recorder is not None:
+            recorder.close()
+
+    elapsed = time.perf_counter() - started
+    scored_time = len(detector_engine.engaged_status) / fps
+    summary = build_engagement_summary(session, detector_engine.engaged_status, scored_time, fps)
+    summary.update({
+        "video": os.path.basename(path),
+        "calibrated": detector_engine.is_calibrated,
+        "ear_thresh": float(detector_engine.ear_thresh),
+        "processed_frames": frames,
+        "processing_seconds": elapsed,
+    })
+    return summary
+
+
+def _score_task(path: str, session_fields: Dict, config_fields: Dict, frame_width: int,
+                record_path: Optional[str]) -> Dict:
+    return score_video(path, SessionData(**session_fields), EngagementConfig(**config_fields), frame_width,
+                       record_path)
+
+
+def score_directory(directory: str, model_path: str, session_defaults: Dict,
+                    config: Optional[EngagementConfig] = None, workers: Optional[int] = None,
+                    frame_width: int = 450, record_dir: Optional[str] = None) -> Iterator[Dict]:
+    """Score every video in a directory on a process pool, one video per worker.
+
+    Videos are not split into time chunks because calibration and the
+    detector's counters carry state across the whole recording.
+    """
+    config = config or EngagementConfig()
+    videos = find_videos(directory)
+    if not videos:
+        logger.warning(f"No video files found in {directory}")
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(videos)),
+                             initializer=_init_worker, initargs=(model_path,)) as pool:
+        futures = {}
+        for path in videos:
+            stem = os.path.splitext(os.path.basename(path))[0]
+            session = SessionData(
+                name=session_defaults.get("name") or stem,
+                matric_id=session_defaults.get("matric_id") or stem,
+                course=session_defaults.get("course", ""),
+                group=session_defaults.get("group", ""),
+                module=session_defaults.get("module", ""),
+                duration=0,
+            )
+            record_path = os.path.join(record_dir, f"{stem}.lmr") if record_dir else None
+            futures[pool.submit(_score_task, path, asdict(session), asdict(config), frame_width,
+                                record_path)] = path
+
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                logger.error(f"Failed to score {path}: {e}")
+                yield {"video": os.path.basename(path), "error": str(e)}
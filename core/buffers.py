@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Preallocated fixed-size float ring buffer with an O(1) running mean"""
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        self.capacity = max(1, int(capacity))
+        self._data = np.zeros(self.capacity, dtype=dtype)
+        self._head = 0  # index of the next write
+        self._count = 0
+        self._sum = 0.0
+        self._writes_since_resum = 0
+
+    def append(self, value: float):
+        """Add a value, overwriting the oldest one once full"""
+        if self._count == self.capacity:
+            self._sum -= self._data[self._head]
+        else:
+            self._count += 1
+        self._data[self._head] = value
+        self._sum += value
+        self._head = (self._head + 1) % self.capacity
+
+        # Re-sum once per wrap to stop floating point drift in the running sum
+        self._writes_since_resum += 1
+        if self._writes_since_resum >= self.capacity:
+            self._writes_since_resum = 0
+            self._sum = float(self._data[:self._count].sum())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def last(self, offset: int = 0) -> float:
+        """Value `offset` steps back from the newest (0 = newest)"""
+        if offset >= self._count:
+            raise IndexError("ring buffer index out of range")
+        return self._data[(self._head - 1 - offset) % self.capacity]
+
+    def recent(self, n: int) -> np.ndarray:
+        """The newest n values, oldest first (a view when they are contiguous)"""
+        n = min(n, self._count)
+        start = self._head - n
+        if start >= 0:
+            return self._data[start:self._head]
+        return np.concatenate((self._data[start:], self._data[:self._head]))
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        self._sum = 0.0
+        self._writes_since_resum = 0
+
+
+class FrameLog:
+    """Append-only per-frame int8 log backed by a preallocated array"""
+
+    def __init__(self, capacity: int):
+        self._data = np.zeros(max(1, int(capacity)), dtype=np.int8)
+        self._count = 0
+        self._nonzero = 0
+
+    def _reserve(self, size: int):
+        # Only reached if a session outlives the preallocated capacity
+        capacity = len(self._data)
+        while capacity < size:
+            capacity *= 2
+        if capacity > len(self._data):
+            self._data = np.concatenate((self._data, np.zeros(capacity - len(self._data), dtype=np.int8)))
+
+    def append(self, value: int):
+        self._reserve(self._count + 1)
+        self._data[self._count] = value
+        self._count += 1
+        if value:
+            self._nonzero += 1
+
+    def extend(self, value: int, n: int):
+        """Append `value` n times with a single slice fill"""
+        if n <= 0:
+            return
+        end = self._count + n
+        self._reserve(end)
+        self._data[self._count:end] = value
+        self._count = end
+        if value:
+            self._nonzero += n
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nonzero(self) -> int:
+        return self._nonzero
+
+    @property
+    def values(self) -> np.ndarray:
+        """View of the logged values"""
+        return self._data[:self._count]
+
+    def clear(self):
+        """Forget logged values, keeping the allocation"""
+        self._count = 0
+        self._nonzero = 0
@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, Optional
+from core.data_models import CalibrationProfile
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class CalibrationCache:
+    """On-disk calibration profiles, keyed by matric number and camera index"""
+
+    _lock = threading.Lock()  # sessions on other Streamlit threads save concurrently
+
+    def __init__(self, path: str, ttl_days: float):
+        self.path = path
+        self.ttl = ttl_days * 86400
+
+    @staticmethod
+    def key(matric_id: str, camera_index: int) -> str:
+        return f"{matric_id.strip().upper()}:{camera_index}"
+
+    def _read(self) -> Dict[str, CalibrationProfile]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {k: CalibrationProfile(**v) for k, v in data.items()}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable calibration cache: {e}")
+            return {}
+
+    def load(self, matric_id: str, camera_index: int) -> Optional[CalibrationProfile]:
+        """Profile for a student on a camera, or None if missing or expired"""
+        with self._lock:
+            profile = self._read().get(self.key(matric_id, camera_index))
+        if profile is None or time.time() - profile.updated_at >= self.ttl:
+            return None
+        return profile
+
+    def save(self, profile: CalibrationProfile):
+        with self._lock:
+            profiles = self._read()
+            profiles[self.key(profile.matric_id, profile.camera_index)] = profile
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({k: asdict(p) for k, p in profiles.items()}, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not write calibration cache: {e}")
@@ -1,43 +1,252 @@
 import cv2
+import json
+import os
+import threading
 import time
+from dataclasses import asdict
+from typing import Dict, Optional
+from config.settings import CameraConfig
+from core.data_models import CameraProfile
 from config.logging_config import setup_logging
 
 logger = setup_logging()
 
+
+class CameraCache:
+    """On-disk cache of probed camera profiles, keyed by device index"""
+
+    def __init__(self, path: str, ttl_hours: float):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+
+    def load(self) -> Dict[int, CameraProfile]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            profiles = {int(k): CameraProfile(**v) for k, v in data.items()}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable camera cache: {e}")
+            return {}
+        now = time.time()
+        return {k: p for k, p in profiles.items() if now - p.probed_at < self.ttl}
+
+    def save(self, profile: CameraProfile):
+        profiles = self.load()
+        profiles[profile.index] = profile
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({str(k): asdict(p) for k, p in profiles.items()}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write camera cache: {e}")
+
+
+class CameraStream:
+    """Threaded capture handle that stays open (paused) between sessions"""
+
+    def __init__(self, index: int, cap: cv2.VideoCapture, idle_release: float, buffers: int = 3):
+        self.index = index
+        self.cap = cap
+        self.idle_release = idle_release
+        # Frames are read into a small rotation of buffers instead of a new array each time;
+        # a consumer has (buffers - 1) frame periods to copy the latest one out
+        self._buffers = [None] * max(2, buffers)
+        self._latest = (0, None)  # (sequence number, frame), swapped as one reference
+        self._cond = threading.Condition()
+        self._active = threading.Event()
+        self._closed = False
+        self._idle_since = time.monotonic()
+        self._fps_window = (time.monotonic(), 0)
+        self.thread = threading.Thread(target=self._reader, name=f"camera-{index}", daemon=True)
+        self.thread.start()
+
+    def _reader(self):
+        while not self._closed:
+            if not self._active.wait(timeout=0.5):
+                if time.monotonic() - self._idle_since > self.idle_release:
+                    logger.info(f"Releasing idle camera {self.index}")
+                    self.close()
+                continue
+            seq = self._seq + 1
+            slot = seq % len(self._buffers)
+            ret, frame = self.cap.read(self._buffers[slot])
+            if not ret:
+                time.sleep(0.01)
+                continue
+            self._buffers[slot] = frame  # differs from the buffer passed in only after a size change
+            with self._cond:
+                self._latest = (seq, frame)
+                self._cond.notify_all()
+
+    def start(self):
+        """Resume grabbing frames for a session"""
+        with self._cond:
+            self._fps_window = (time.monotonic(), self._seq)
+        self._active.set()
+
+    def pause(self):
+        """Stop grabbing but keep the device open for the next session"""
+        self._active.clear()
+        self._idle_since = time.monotonic()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Block until a frame newer than the call arrives; replaces fixed warm-up sleeps"""
+        with self._cond:
+            seq = self._seq
+            return self._cond.wait_for(lambda: self._seq > seq or self._closed, timeout) and not self._closed
+
+    @property
+    def _seq(self) -> int:
+        return self._latest[0]
+
+    def read(self):
+        """Latest captured frame; its buffer is reused a few frames later, so copy what you keep"""
+        return self._latest[1]
+
+    def read_latest(self) -> tuple:
+        """(sequence number, frame) of the latest capture; the number tells new frames from repeats"""
+        return self._latest
+
+    @property
+    def measured_fps(self) -> float:
+        started, seq = self._fps_window
+        elapsed = time.monotonic() - started
+        return (self._seq - seq) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def frame_size(self) -> tuple[int, int]:
+        """(width, height) of the latest frame, or (0, 0) before the first one"""
+        frame = self._latest[1]
+        if frame is None:
+            return 0, 0
+        return frame.shape[1], frame.shape[0]
+
+    @property
+    def is_open(self) -> bool:
+        return not self._closed and self.cap.isOpened()
+
+    def close(self):
+        self._closed = True
+        self._active.set()
+        with self._cond:
+            self._cond.notify_all()
+        self.cap.release()
+
+
 class CameraManager:
     """Optimized camera management"""
-    
-    @staticmethod
-    def get_best_camera() -> tuple[float, int]:
-        """Find the best available camera and calculate its FPS"""
-        for index in range(3):
-            try:
-                cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-                if not cap.isOpened():
+
+    config = CameraConfig()
+    _streams: Dict[int, CameraStream] = {}
+    _users: Dict[int, int] = {}  # sessions currently holding each stream
+    _lock = threading.Lock()
+
+    @classmethod
+    def _open(cls, index: int) -> Optional[cv2.VideoCapture]:
+        cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        # Set optimal resolution for performance
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, cls.config.WIDTH)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, cls.config.HEIGHT)
+        cap.set(cv2.CAP_PROP_FPS, cls.config.TARGET_FPS)
+        return cap
+
+    @classmethod
+    def _stream(cls, index: int, cap: cv2.VideoCapture) -> CameraStream:
+        return CameraStream(index, cap, cls.config.IDLE_RELEASE_SECONDS, cls.config.CAPTURE_BUFFERS)
+
+    @classmethod
+    def _measure(cls, index: int, cap: cv2.VideoCapture) -> Optional[CameraProfile]:
+        num_frames = cls.config.PROBE_FRAMES
+        start_time = time.time()
+        for _ in range(num_frames):
+            ret, frame = cap.read()
+            if not ret:
+                return None
+        elapsed = time.time() - start_time
+        fps = num_frames / elapsed if elapsed > 0 else 30.0
+        height, width = frame.shape[:2]
+        return CameraProfile(index, width, height, fps, time.time())
+
+    @classmethod
+    def _cache(cls) -> CameraCache:
+        return CameraCache(cls.config.CACHE_PATH, cls.config.CACHE_TTL_HOURS)
+
+    @classmethod
+    def get_best_camera(cls) -> tuple[float, int]:
+        """Find the best available camera and its FPS, reusing warm handles and cached probes"""
+        with cls._lock:
+            profiles = cls._cache().load()
+
+            # A warm handle from a previous session needs no probing at all
+            for index, stream in list(cls._streams.items()):
+                if stream.is_open:
+                    profile = profiles.get(index)
+                    return (profile.fps if profile else float(cls.config.TARGET_FPS)), index
+                del cls._streams[index]
+
+            # Cached profile: open the device directly and skip the FPS measurement
+            for index, profile in sorted(profiles.items()):
+                cap = cls._open(index)
+                if cap is not None:
+                    logger.info(f"Camera {index} FPS (cached): {profile.fps:.2f}")
+                    cls._streams[index] = cls._stream(index, cap)
+                    return profile.fps, index
+
+            for index in range(cls.config.PROBE_INDICES):
+                try:
+                    cap = cls._open(index)
+                    if cap is None:
+                        continue
+                    profile = cls._measure(index, cap)
+                    if profile is None:
+                        cap.release()
+                        continue
+                    logger.info(f"Camera {index} FPS: {profile.fps:.2f}")
+                    cls._cache().save(profile)
+                    # Keep the probed handle open instead of re-opening it for the session
+                    cls._streams[index] = cls._stream(index, cap)
+                    return profile.fps, index
+                except Exception as e:
+                    logger.error(f"Error testing camera {index}: {e}")
                     continue
-                
-                # Set optimal resolution for performance
-                cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                cap.set(cv2.CAP_PROP_FPS, 30)
-                
-                # Calculate actual FPS
-                num_frames = 30
-                start_time = time.time()
-                for _ in range(num_frames):
-                    ret, _ = cap.read()
-                    if not ret:
-                        break
-                else:
-                    elapsed = time.time() - start_time
-                    fps = num_frames / elapsed if elapsed > 0 else 30.0
-                    cap.release()
-                    logger.info(f"Camera {index} FPS: {fps:.2f}")
-                    return fps, index
-                
-                cap.release()
-            except Exception as e:
-                logger.error(f"Error testing camera {index}: {e}")
-                continue
-        
-        raise RuntimeError("No suitable camera found")
\ No newline at end of file
+
+        raise RuntimeError("No suitable camera found")
+
+    @classmethod
+    def acquire(cls, index: int) -> CameraStream:
+        """Warm capture stream for a device, opening it if needed; pair every call with release()"""
+        with cls._lock:
+            stream = cls._streams.get(index)
+            if stream is None or not stream.is_open:
+                cap = cls._open(index)
+                if cap is None:
+                    raise RuntimeError(f"Cannot open camera {index}")
+                stream = cls._streams[index] = cls._stream(index, cap)
+                cls._users[index] = 0
+            cls._users[index] = cls._users.get(index, 0) + 1
+            if cls._users[index] == 1:
+                stream.start()  # Already capturing for another session otherwise
+        return stream
+
+    @classmethod
+    def release(cls, index: int):
+        """End a session's use of a stream; capture pauses when no session holds it and the device stays open"""
+        with cls._lock:
+            stream = cls._streams.get(index)
+            if stream is None:
+                return
+            cls._users[index] = max(cls._users.get(index, 0) - 1, 0)
+            if cls._users[index]:
+                return  # Another session still reads from it
+            fps = stream.measured_fps
+            stream.pause()
+        if fps > 0:
+            # Refresh the cached FPS with what the session actually achieved
+            width, height = stream.frame_size
+            cls._cache().save(CameraProfile(index, width, height, fps, time.time()))
@@ -0,0 +1,137 @@
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from config.settings import ClassroomConfig, EngagementConfig
+from core.engagement_detector import EngagementDetector
+from core.face_analyzer import FaceAnalyzer
+from core.metrics import get_metrics
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) arrays of (left, top, right, bottom) boxes"""
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+@dataclass
+class StudentTrack:
+    """One tracked face identity with its own engagement detector state"""
+    track_id: int
+    box: Tuple[int, int, int, int]
+    detector: EngagementDetector
+    missed: int = 0
+    seen_frames: int = 0
+    start_time: Optional[float] = None
+    ear: float = 0.0
+    status: str = "Calibrating"
+    disengaged: bool = False
+    landmarks: Optional[np.ndarray] = field(default=None, repr=False)
+
+
+class ClassroomTracker:
+    """Per-face engagement tracking for every student visible to one camera"""
+
+    def __init__(self, face_analyzer: FaceAnalyzer, config: EngagementConfig,
+                 classroom_config: ClassroomConfig, fps: float):
+        self.face_analyzer = face_analyzer
+        self.config = config
+        self.classroom_config = classroom_config
+        self.fps = fps
+        self.tracks: Dict[int, StudentTrack] = {}
+        self.retired: List[StudentTrack] = []
+        self.metrics = get_metrics()
+        self._next_id = 1
+        # dlib releases the GIL during landmark prediction, so threads run concurrently
+        self._pool = ThreadPoolExecutor(max_workers=classroom_config.LANDMARK_WORKERS,
+                                        thread_name_prefix="landmarks")
+
+    def _match(self, boxes: np.ndarray) -> Dict[int, int]:
+        """Greedy highest-IoU assignment of detection index -> track id"""
+        track_ids = list(self.tracks)
+        if not track_ids or len(boxes) == 0:
+            return {}
+        track_boxes = np.array([self.tracks[t].box for t in track_ids], dtype=np.float64)
+        iou = box_iou(boxes.astype(np.float64), track_boxes)
+
+        matches = {}
+        for flat in np.argsort(iou, axis=None)[::-1]:
+            det_idx, track_idx = np.unravel_index(flat, iou.shape)
+            if iou[det_idx, track_idx] < self.classroom_config.IOU_MATCH_THRESHOLD:
+                break
+            track_id = track_ids[track_idx]
+            if det_idx in matches or track_id in matches.values():
+                continue
+            matches[int(det_idx)] = track_id
+        return matches
+
+    def update(self, gray: np.ndarray, current_time: float) -> List[StudentTrack]:
+        """Detect all faces, match them to identities and advance each student's detector"""
+        started = time.perf_counter()
+        faces = list(self.face_analyzer.face_detector(gray, 0))
+        boxes = np.array([(f.left(), f.top(), f.right(), f.bottom()) for f in faces], dtype=np.int64)
+        self.metrics.observe("detect", started)
+
+        started = time.perf_counter()
+        landmarks = list(self._pool.map(lambda f: self.face_analyzer.predict_landmarks(gray, f), faces))
+        self.metrics.observe("predict", started)
+
+        started = time.perf_counter()
+        matches = self._match(boxes)
+        seen = set()
+        for det_idx, box in enumerate(boxes):
+            track_id = matches.get(det_idx)
+            if track_id is None:
+                track_id = self._next_id
+                self._next_id += 1
+                self.tracks[track_id] = StudentTrack(track_id, tuple(box),
+                                                     EngagementDetector(self.config, self.fps))
+            track = self.tracks[track_id]
+            track.box = tuple(int(v) for v in box)
+            track.landmarks = landmarks[det_idx]
+            track.missed = 0
+            track.seen_frames += 1
+            track.ear = track.detector.smooth_ear(track.detector.ear_from_landmarks(track.landmarks))
+            seen.add(track_id)
+
+        for track_id in list(self.tracks):
+            track = self.tracks[track_id]
+            if track_id not in seen:
+                track.missed += 1
+                track.landmarks = None
+                track.ear = 0
+                if track.missed > self.classroom_config.MAX_MISSED_FRAMES:
+                    self.retired.append(self.tracks.pop(track_id))
+                    continue
+            self._score(track, current_time)
+        self.metrics.observe("ear", started)
+
+        return list(self.tracks.values())
+
+    def _score(self, track: StudentTrack, current_time: float):
+        detector = track.detector
+        if not detector.is_calibrated:
+            if detector.calibrate(track.ear, current_time):
+                track.start_time = current_time
+            track.status = "Calibrating"
+            track.disengaged = False
+            return
+        track.disengaged, track.status = detector.detect_engagement(track.ear, current_time)
+        detector.update_threshold_dynamically(current_time, track.start_time)
+
+    def all_tracks(self) -> List[StudentTrack]:
+        """Active and retired identities with enough frames to be reported"""
+        tracks = list(self.tracks.values()) + self.retired
+        return [t for t in tracks if t.seen_frames >= self.classroom_config.MIN_TRACK_FRAMES
+                and len(t.detector.engaged_status) > 0]
+
+    def close(self):
+        self._pool.shutdown(wait=False)
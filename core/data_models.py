@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from typing import Any, Optional
+import numpy as np
 
 @dataclass
 class SessionData:
@@ -8,4 +10,39 @@ class SessionData:
     course: str
     group: str
     module: str
-    duration: int
\ No newline at end of file
+    duration: int
+
+
+@dataclass
+class FrameResult:
+    """Analysed frame handed from the analysis stage to the presentation stage"""
+    frame: np.ndarray
+    calibrating: bool = True
+    calibration_progress: float = 0.0
+    status: str = ""
+    disengaged: bool = False
+    remaining: Optional[int] = None
+    progress: float = 0.0
+    notice: Optional[str] = None
+    buffers: Any = None  # pooled FrameSlot backing `frame`; released once the frame is displayed
+
+
+@dataclass
+class CameraProfile:
+    """Probed capabilities of a capture device"""
+    index: int
+    width: int
+    height: int
+    fps: float
+    probed_at: float
+
+
+@dataclass
+class CalibrationProfile:
+    """Calibrated EAR threshold of one student on one camera"""
+    matric_id: str
+    camera_index: int
+    ear_thresh: float
+    baseline_ear: float  # mean open-eye EAR the threshold was derived from
+    sessions: int
+    updated_at: float
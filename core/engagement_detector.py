@@ -1,31 +1,84 @@
 import numpy as np
-from collections import deque
+from core.buffers import FrameLog, RingBuffer
 from imutils import face_utils
 from config.settings import EngagementConfig
-from typing import Tuple
+from typing import Optional, Tuple
+
+def ears_from_landmarks(landmarks: np.ndarray) -> np.ndarray:
+    """Average EAR of both eyes for every frame of an (N, 68, 2) landmark array"""
+    points = np.asarray(landmarks, dtype=np.float64)
+    ears = np.zeros(len(points))
+    for name in ("left_eye", "right_eye"):
+        start, end = face_utils.FACIAL_LANDMARKS_IDXS[name]
+        eye = points[:, start:end]
+        A = np.linalg.norm(eye[:, 1] - eye[:, 5], axis=1)
+        B = np.linalg.norm(eye[:, 2] - eye[:, 4], axis=1)
+        C = np.linalg.norm(eye[:, 0] - eye[:, 3], axis=1)
+        ears += np.divide(A + B, 2.0 * C, out=np.zeros_like(C), where=C > 0)
+    return ears / 2.0
+
 
 class EngagementDetector:
-    """Optimized engagement detection class"""
+    """Optimized engagement detection class.
+
+    Blinks, sustained closure, calibration and threshold windows are measured
+    on the timestamps passed in (seconds), so frames may be skipped or arrive
+    unevenly. `fps` only sets the resolution of the status timeline and the
+    buffer capacities; callers without a clock get a nominal 1/fps per frame.
+    """
     
     def __init__(self, config: EngagementConfig, fps: float):
         self.config = config
         self.fps = fps
+        self.frame_period = 1.0 / fps
         self.ear_thresh = config.INITIAL_EAR_THRESH
-        self.ear_buffer = deque(maxlen=config.EAR_SMOOTHING_WINDOW)
-        self.ear_history = deque(maxlen=int(fps * 60))  # Keep 1 minute of history
-        self.counter = 0
-        self.total_disengaged = 0
-        self.calibration_ears = []
+
+        # Preallocated buffers: per-frame updates are O(1) and allocation-free
+        self.ear_buffer = RingBuffer(config.EAR_SMOOTHING_WINDOW)
+        self.ear_history = RingBuffer(int(fps * 60))  # Keep 1 minute of history at the nominal rate
+        self.ear_times = RingBuffer(int(fps * 60))
+        self.status_log = FrameLog(int(fps * 60 * config.MAX_SESSION_MINUTES))
+        self.timeline_start = None
+        self.total_disengaged = 0  # timeline ticks (1/fps seconds each)
+        self.closed_seconds = 0.0
+        self.lookdown_seconds = 0.0
+        self.blink_seconds = 0.0
+        self.calibration_sum = 0.0
+        self.calibration_count = 0
+        self.calibration_seconds = 0.0
+        self.last_sample_time = None
         self.last_alert_time = 0
-        self.blink_counter = 0
-        self.lookdown_counter = 0
-        self.engaged_status = []
+        self.last_adjustment_tick = None
         self.is_calibrated = False
+        self.baseline_ear = None  # mean open-eye EAR behind the current threshold
+        self.validation = None  # None, "pending", "confirmed" or "drifted" for a cached profile
+        self.validation_sum = 0.0
+        self.validation_count = 0
+        self.validation_seconds = 0.0
         
         # Eye landmark indices
         (self.left_eye_start, self.left_eye_end) = face_utils.FACIAL_LANDMARKS_IDXS["left_eye"]
         (self.right_eye_start, self.right_eye_end) = face_utils.FACIAL_LANDMARKS_IDXS["right_eye"]
     
+    def _advance(self, timestamp: Optional[float]) -> Tuple[float, float]:
+        """(timestamp, seconds since the previous sample) for a new sample"""
+        if timestamp is None:
+            timestamp = (self.last_sample_time + self.frame_period
+                         if self.last_sample_time is not None else 0.0)
+        if self.last_sample_time is None:
+            dt = self.frame_period
+        else:
+            dt = max(timestamp - self.last_sample_time, 0.0)
+        self.last_sample_time = timestamp
+        return timestamp, dt
+    
+    def history_seconds(self) -> float:
+        """Time span covered by the EAR history"""
+        count = len(self.ear_times)
+        if not count:
+            return 0.0
+        return self.ear_times.last() - self.ear_times.last(count - 1) + self.frame_period
+    
     @staticmethod
     def eye_aspect_ratio(eye_points: np.ndarray) -> float:
         """Calculate Eye Aspect Ratio efficiently"""
@@ -35,33 +88,54 @@ class EngagementDetector:
         C = np.linalg.norm(eye_points[0] - eye_points[3])
         return (A + B) / (2.0 * C) if C > 0 else 0
     
+    def eyes_from_landmarks(self, landmarks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Slice the left and right eye points out of a 68-point landmark array"""
+        return (landmarks[self.left_eye_start:self.left_eye_end],
+                landmarks[self.right_eye_start:self.right_eye_end])
+    
+    def ear_from_landmarks(self, landmarks: np.ndarray) -> float:
+        """Average EAR of both eyes for a 68-point landmark array"""
+        left_eye, right_eye = self.eyes_from_landmarks(landmarks)
+        return (self.eye_aspect_ratio(left_eye) + self.eye_aspect_ratio(right_eye)) / 2.0
+    
     def smooth_ear(self, ear: float) -> float:
         """Apply smoothing to EAR values"""
         self.ear_buffer.append(ear)
-        return np.mean(self.ear_buffer)
+        return self.ear_buffer.mean()
+    
+    @property
+    def engaged_status(self) -> np.ndarray:
+        """Engagement per 1/fps tick of wall-clock time (1 engaged, 0 disengaged) since calibration"""
+        return self.status_log.values
     
     def is_blink(self, ear: float) -> bool:
         """Detect if current EAR indicates a blink"""
-        if len(self.ear_history) < int(self.config.BLINK_DURATION * self.fps):
+        if self.history_seconds() < self.config.BLINK_DURATION:
             return False
         
         # Simplified blink detection - just check for rapid drop
         if len(self.ear_buffer) >= 2:
-            prev_ear = list(self.ear_buffer)[-2] if len(self.ear_buffer) > 1 else ear
+            prev_ear = self.ear_buffer.last(1)
             return (ear < self.ear_thresh * 0.7 and prev_ear > self.ear_thresh * 0.9)
         return False
     
-    def calibrate(self, ear: float) -> bool:
+    @property
+    def calibration_progress(self) -> float:
+        return min(self.calibration_seconds / self.config.CALIBRATION_DURATION, 1.0)
+    
+    def calibrate(self, ear: float, timestamp: Optional[float] = None) -> bool:
         """Calibrate EAR threshold"""
+        _, dt = self._advance(timestamp)
         # Only add valid EAR values (not zero, not extremely low)
         if ear > 0.1:  # Simple threshold instead of complex blink detection during calibration
-            self.calibration_ears.append(ear)
+            self.calibration_sum += ear
+            self.calibration_count += 1
+            self.calibration_seconds += dt
         
-        required_frames = int(self.config.CALIBRATION_DURATION * self.fps)
-        
-        # Check if we have enough frames for calibration
-        if len(self.calibration_ears) >= required_frames:
-            mean_ear = np.mean(self.calibration_ears)
+        # Check if we have seen enough valid time for calibration
+        if self.calibration_seconds >= self.config.CALIBRATION_DURATION - 1e-9:
+            mean_ear = self.calibration_sum / self.calibration_count
+            self.baseline_ear = mean_ear
             self.ear_thresh = np.clip(mean_ear * 0.85, 
                                     self.config.MIN_EAR_THRESH, 
                                     self.config.MAX_EAR_THRESH)
@@ -69,54 +143,119 @@ class EngagementDetector:
             return True
         return False
     
-    def update_threshold_dynamically(self, current_time: int, start_time: int):
+    def apply_profile(self, ear_thresh: float, baseline_ear: float):
+        """Start from a cached calibration; it is validated against the first few seconds of EARs"""
+        self.ear_thresh = float(np.clip(ear_thresh, self.config.MIN_EAR_THRESH, self.config.MAX_EAR_THRESH))
+        self.baseline_ear = baseline_ear
+        self.is_calibrated = True
+        self.validation = "pending"
+    
+    def _validate(self, ear: float, dt: float):
+        if ear <= 0.1:
+            return
+        self.validation_sum += ear
+        self.validation_count += 1
+        self.validation_seconds += dt
+        if self.validation_seconds < self.config.VALIDATION_DURATION - 1e-9:
+            return
+        mean_ear = self.validation_sum / self.validation_count
+        drift = abs(mean_ear - self.baseline_ear) / self.baseline_ear
+        if drift > self.config.VALIDATION_TOLERANCE:
+            self.recalibrate()
+            self.validation = "drifted"
+        else:
+            self.validation = "confirmed"
+    
+    def recalibrate(self):
+        """Discard the threshold and everything measured with it and calibrate from scratch"""
+        self.ear_thresh = self.config.INITIAL_EAR_THRESH
+        self.is_calibrated = False
+        self.calibration_sum = 0.0
+        self.calibration_count = 0
+        self.calibration_seconds = 0.0
+        self.last_sample_time = None
+        self.ear_buffer.clear()  # smoothed under the rejected profile
+        self.status_log.clear()
+        self.timeline_start = None
+        self.total_disengaged = 0
+        self.closed_seconds = self.lookdown_seconds = self.blink_seconds = 0.0
+        self.ear_history.clear()
+        self.ear_times.clear()
+        self.last_adjustment_tick = None
+    
+    def current_baseline(self) -> float:
+        """Open-eye EAR over the last minute, for saving with the final threshold"""
+        ears = self.ear_history.recent(len(self.ear_history))
+        ears = ears[ears > self.ear_thresh * 0.9]
+        return float(ears.mean()) if ears.size else float(self.baseline_ear or 0.0)
+    
+    def update_threshold_dynamically(self, current_time: float, start_time: float):
         """Update EAR threshold based on recent data"""
-        if ((current_time - start_time) % self.config.DYNAMIC_ADJUSTMENT_INTERVAL == 0 and 
-            len(self.ear_history) > self.fps * self.config.DYNAMIC_ADJUSTMENT_INTERVAL):
-            
-            recent_ears = [e for e in list(self.ear_history)[-int(self.fps * self.config.DYNAMIC_ADJUSTMENT_INTERVAL):] 
-                          if e > self.ear_thresh * 0.9]
-            
-            if recent_ears:
-                new_thresh = np.clip(np.mean(recent_ears) * 0.85,
-                                   self.config.MIN_EAR_THRESH,
-                                   self.config.MAX_EAR_THRESH)
-                if abs(new_thresh - self.ear_thresh) > 0.01:  # Only update if significant change
-                    self.ear_thresh = new_thresh
-    
-    def detect_engagement(self, ear: float, current_time: float) -> Tuple[bool, str]:
+        interval = self.config.DYNAMIC_ADJUSTMENT_INTERVAL
+        tick = int((current_time - start_time) // interval)
+        if tick == self.last_adjustment_tick:
+            return
+        # Adjust once per interval tick rather than on every frame of that tick
+        self.last_adjustment_tick = tick
+        if self.history_seconds() <= interval:
+            return
+        
+        count = len(self.ear_history)
+        window = self.ear_times.recent(count) > current_time - interval
+        recent_ears = self.ear_history.recent(count)[window]
+        recent_ears = recent_ears[recent_ears > self.ear_thresh * 0.9]
+        
+        if recent_ears.size:
+            new_thresh = np.clip(recent_ears.mean() * 0.85,
+                               self.config.MIN_EAR_THRESH,
+                               self.config.MAX_EAR_THRESH)
+            if abs(new_thresh - self.ear_thresh) > 0.01:  # Only update if significant change
+                self.ear_thresh = new_thresh
+    
+    def _log_status(self, disengaged: bool, timestamp: float):
+        """Fill the status timeline up to `timestamp`, holding the current status over skipped frames"""
+        if self.timeline_start is None:
+            self.timeline_start = timestamp - self.frame_period
+        ticks = int(round((timestamp - self.timeline_start) * self.fps)) - len(self.status_log)
+        if ticks <= 0:
+            return
+        self.status_log.extend(0 if disengaged else 1, ticks)
+        if disengaged:
+            self.total_disengaged += ticks
+    
+    def detect_engagement(self, ear: float, current_time: Optional[float] = None) -> Tuple[bool, str]:
         """Main engagement detection logic"""
+        current_time, dt = self._advance(current_time)
         self.ear_history.append(ear)
+        self.ear_times.append(current_time)
+        disengaged_after = self.config.DISENGAGED_THRESHOLD - 1e-9
         
         # Handle face not detected (ear = 0)
         if ear == 0:
-            self.lookdown_counter += 1
-            disengaged = self.lookdown_counter >= int(self.config.DISENGAGED_THRESHOLD * self.fps)
+            self.lookdown_seconds += dt
+            disengaged = self.lookdown_seconds >= disengaged_after
         else:
-            self.lookdown_counter = 0
+            self.lookdown_seconds = 0.0
             
             # Check for blink vs sustained eye closure
             if self.is_blink(ear):
-                self.blink_counter += 1
-                if self.blink_counter <= int(self.config.BLINK_DURATION * self.fps):
-                    disengaged = False  # Ignore blinks
-                else:
-                    disengaged = True
+                self.blink_seconds += dt
+                # Ignore blinks
+                disengaged = self.blink_seconds > self.config.BLINK_DURATION + 1e-9
             else:
-                self.blink_counter = 0
+                self.blink_seconds = 0.0
                 
                 # Check sustained eye closure
                 if ear < self.ear_thresh:
-                    self.counter += 1
+                    self.closed_seconds += dt
                 else:
-                    self.counter = 0
+                    self.closed_seconds = 0.0
                 
-                disengaged = self.counter >= int(self.config.DISENGAGED_THRESHOLD * self.fps)
-        
-        if disengaged:
-            self.total_disengaged += 1
+                disengaged = self.closed_seconds >= disengaged_after
         
-        self.engaged_status.append(0 if disengaged else 1)
+        self._log_status(disengaged, current_time)
+        if self.validation == "pending":
+            self._validate(ear, dt)
         
         # Determine status text
         if ear == 0:
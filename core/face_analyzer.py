@@ -0,0 +1,152 @@
+import numpy as np
+import dlib
+from typing import Optional
+from imutils import face_utils
+
+
+class FaceAnalyzer:
+    """Locate the primary face in a grayscale frame and predict its landmarks"""
+
+    def __init__(self, face_detector, landmark_predictor):
+        self.face_detector = face_detector
+        self.landmark_predictor = landmark_predictor
+
+    def detect_primary(self, gray: np.ndarray):
+        """Return the largest detected face rectangle, or None"""
+        faces = self.face_detector(gray, 0)
+        if len(faces) == 0:
+            return None
+        return max(faces, key=lambda rect: rect.width() * rect.height())
+
+    def predict_landmarks(self, gray: np.ndarray, face, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """68-point landmarks for a face rectangle as an (68, 2) int array, written into `out` if given"""
+        shape = self.landmark_predictor(gray, face)
+        # dlib returns a full_object_detection; other backends return the array directly
+        if isinstance(shape, np.ndarray):
+            if out is None:
+                return shape
+            np.copyto(out, shape, casting="unsafe")
+            return out
+        if out is None:
+            return face_utils.shape_to_np(shape)
+        for i, point in enumerate(shape.parts()):
+            out[i, 0] = point.x
+            out[i, 1] = point.y
+        return out
+
+    def analyze(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """Landmarks of the primary face, or None when no face is visible"""
+        face = self.detect_primary(gray)
+        if face is None:
+            return None
+        return self.predict_landmarks(gray, face)
+
+    def reset(self):
+        """Forget per-stream state, e.g. after the frame size changes"""
+
+
+class TrackingFaceAnalyzer(FaceAnalyzer):
+    """Detect once, then follow the face with a correlation tracker between detections"""
+
+    FALLBACK_POLICIES = ("roi", "full")
+
+    def __init__(self, face_detector, landmark_predictor, redetect_interval: int = 10,
+                 min_confidence: float = 7.0, fallback: str = "roi", roi_padding: float = 0.5):
+        super().__init__(face_detector, landmark_predictor)
+        if fallback not in self.FALLBACK_POLICIES:
+            raise ValueError(f"Unknown tracking fallback policy: {fallback}")
+        self.redetect_interval = max(1, redetect_interval)
+        self.min_confidence = min_confidence
+        self.fallback = fallback
+        self.roi_padding = roi_padding
+        self.tracker = None
+        self.last_box = None  # (left, top, right, bottom) of the last landmark set
+        self.frames_since_detection = 0
+        self.full_detections = 0
+        self.roi_detections = 0
+        self.tracked_frames = 0
+
+    @classmethod
+    def from_config(cls, face_detector, landmark_predictor, config):
+        return cls(face_detector, landmark_predictor,
+                   redetect_interval=config.REDETECT_INTERVAL,
+                   min_confidence=config.TRACKING_MIN_CONFIDENCE,
+                   fallback=config.TRACKING_FALLBACK,
+                   roi_padding=config.TRACKING_ROI_PADDING)
+
+    def reset(self):
+        self.tracker = None
+        self.last_box = None
+        self.frames_since_detection = 0
+
+    def _start_tracking(self, gray: np.ndarray, face):
+        self.tracker = dlib.correlation_tracker()
+        self.tracker.start_track(gray, face)
+        self.frames_since_detection = 0
+
+    def _detect_in_roi(self, gray: np.ndarray):
+        """Run the detector only on a padded window around the last landmark box"""
+        if self.last_box is None:
+            return None
+        left, top, right, bottom = self.last_box
+        pad_x = int((right - left) * self.roi_padding)
+        pad_y = int((bottom - top) * self.roi_padding)
+        height, width = gray.shape[:2]
+        x0, y0 = max(0, left - pad_x), max(0, top - pad_y)
+        x1, y1 = min(width, right + pad_x), min(height, bottom + pad_y)
+        if x1 <= x0 or y1 <= y0:
+            return None
+
+        face = super().detect_primary(np.ascontiguousarray(gray[y0:y1, x0:x1]))
+        if face is None:
+            return None
+        self.roi_detections += 1
+        return dlib.rectangle(face.left() + x0, face.top() + y0, face.right() + x0, face.bottom() + y0)
+
+    def _full_detection(self, gray: np.ndarray):
+        self.full_detections += 1
+        return super().detect_primary(gray)
+
+    def detect_primary(self, gray: np.ndarray):
+        """Tracked face rectangle, falling back to detection when tracking is lost or due"""
+        face = None
+        if self.tracker is not None and self.frames_since_detection < self.redetect_interval:
+            confidence = self.tracker.update(gray)
+            if confidence >= self.min_confidence:
+                self.frames_since_detection += 1
+                self.tracked_frames += 1
+                pos = self.tracker.get_position()
+                return dlib.rectangle(int(pos.left()), int(pos.top()), int(pos.right()), int(pos.bottom()))
+
+            # Tracking confidence dropped: apply the fallback policy before a full scan
+            if self.fallback == "roi":
+                face = self._detect_in_roi(gray)
+        if face is None:
+            face = self._full_detection(gray)
+
+        if face is None:
+            self.reset()
+            return None
+        self._start_tracking(gray, face)
+        return face
+
+    def predict_landmarks(self, gray: np.ndarray, face, out: Optional[np.ndarray] = None) -> np.ndarray:
+        landmarks = super().predict_landmarks(gray, face, out)
+        x_min, y_min = landmarks.min(axis=0)
+        x_max, y_max = landmarks.max(axis=0)
+        self.last_box = (int(x_min), int(y_min), int(x_max), int(y_max))
+        return landmarks
+
+    def stats(self) -> dict:
+        return {
+            "full_detections": self.full_detections,
+            "roi_detections": self.roi_detections,
+            "tracked_frames": self.tracked_frames,
+        }
+
+
+def create_face_analyzer(face_detector, landmark_predictor, config) -> FaceAnalyzer:
+    """Build the face analyzer selected by EngagementConfig"""
+    if config.FACE_TRACKING:
+        return TrackingFaceAnalyzer.from_config(face_detector, landmark_predictor, config)
+    return FaceAnalyzer(face_detector, landmark_predictor)
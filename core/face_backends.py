@@ -0,0 +1,184 @@
+import json
+import os
+import platform
+import time
+import cv2
+import dlib
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+from core.engagement_detector import ears_from_landmarks
+from core.face_analyzer import FaceAnalyzer
+from core.model_registry import get_model_registry
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+BACKENDS = ("dlib", "yunet", "haar", "haar_lbf")
+
+
+def _to_rect(x: float, y: float, w: float, h: float) -> dlib.rectangle:
+    return dlib.rectangle(int(x), int(y), int(x + w), int(y + h))
+
+
+class HaarFaceDetector:
+    """OpenCV Haar cascade behind the dlib detector's call signature"""
+
+    def __init__(self, cascade_path: Optional[str] = None, scale_factor: float = 1.1,
+                 min_neighbors: int = 5, min_size: int = 40):
+        if not hasattr(cv2, "CascadeClassifier"):
+            raise RuntimeError("Haar cascades are not available in this OpenCV build")
+        cascade_path = cascade_path or os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise RuntimeError(f"Cannot load Haar cascade: {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = (min_size, min_size)
+
+    def __call__(self, gray: np.ndarray, upsample: int = 0) -> List[dlib.rectangle]:
+        faces = self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors,
+                                              minSize=self.min_size)
+        return [_to_rect(*face) for face in faces]
+
+
+class YuNetFaceDetector:
+    """OpenCV YuNet CNN detector behind the dlib detector's call signature"""
+
+    def __init__(self, model_path: str, score_threshold: float = 0.7):
+        if not hasattr(cv2, "FaceDetectorYN"):
+            raise RuntimeError("YuNet needs OpenCV 4.5.4 or newer")
+        if not os.path.exists(model_path):
+            raise RuntimeError(f"YuNet model not found: {model_path}")
+        self.detector = cv2.FaceDetectorYN.create(model_path, "", (320, 320), score_threshold)
+        self._size = None
+
+    def __call__(self, gray: np.ndarray, upsample: int = 0) -> List[dlib.rectangle]:
+        height, width = gray.shape[:2]
+        if self._size != (width, height):
+            self._size = (width, height)
+            self.detector.setInputSize(self._size)
+        _, faces = self.detector.detect(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+        if faces is None:
+            return []
+        return [_to_rect(*face[:4]) for face in faces]
+
+
+class LBFLandmarkPredictor:
+    """OpenCV contrib LBF facemark; same 68-point layout as dlib's predictor"""
+
+    def __init__(self, model_path: str):
+        if not hasattr(cv2, "face"):
+            raise RuntimeError("LBF facemark needs opencv-contrib-python")
+        if not os.path.exists(model_path):
+            raise RuntimeError(f"LBF model not found: {model_path}")
+        self.facemark = cv2.face.createFacemarkLBF()
+        self.facemark.loadModel(model_path)
+
+    def __call__(self, gray: np.ndarray, face: dlib.rectangle) -> np.ndarray:
+        box = np.array([[face.left(), face.top(), face.width(), face.height()]], dtype=np.int32)
+        ok, landmarks = self.facemark.fit(gray, box)
+        if not ok:
+            return np.zeros((68, 2), dtype=int)
+        return np.rint(landmarks[0][0]).astype(int)
+
+
+@dataclass
+class FaceBackend:
+    """A face detector and 68-point landmark predictor pair"""
+    name: str
+    face_detector: Callable
+    landmark_predictor: Callable
+
+
+def create_backend(name: str, model_path: str, config) -> FaceBackend:
+    """Build a backend; the models are shared process-wide through the model registry"""
+    models = get_model_registry()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown face backend: {name}")
+    if name == "dlib":
+        detector = models.face_detector()
+    elif name == "yunet":
+        detector = models.load(("yunet", config.YUNET_MODEL_PATH),
+                               lambda: YuNetFaceDetector(config.YUNET_MODEL_PATH, config.YUNET_SCORE_THRESHOLD))
+    else:
+        detector = models.load("haar", HaarFaceDetector)
+    if name == "haar_lbf":
+        predictor = models.load(("lbf", config.LBF_MODEL_PATH), lambda: LBFLandmarkPredictor(config.LBF_MODEL_PATH))
+    else:
+        predictor = models.landmark_predictor(model_path)
+    return FaceBackend(name, detector, predictor)
+
+
+def benchmark_backends(frames: Sequence[np.ndarray], backends: Sequence[FaceBackend],
+                       reference: FaceBackend) -> List[Dict]:
+    """Latency, detection rate and EAR agreement with the reference backend on grayscale frames"""
+    def run(backend: FaceBackend):
+        analyzer = FaceAnalyzer(backend.face_detector, backend.landmark_predictor)
+        analyzer.analyze(frames[0])  # warm-up: lazy allocations, first-call costs
+        ears, started = [], time.perf_counter()
+        for gray in frames:
+            landmarks = analyzer.analyze(gray)
+            ears.append(np.nan if landmarks is None else ears_from_landmarks(landmarks[None])[0])
+        return np.array(ears), (time.perf_counter() - started) / len(frames) * 1000
+
+    reference_ears, _ = run(reference)
+    results = []
+    for backend in backends:
+        ears, ms = run(backend)
+        both = ~np.isnan(ears) & ~np.isnan(reference_ears)
+        results.append({
+            "backend": backend.name,
+            "ms_per_frame": ms,
+            "detection_rate": float(np.mean(~np.isnan(ears))),
+            "ear_mae": float(np.mean(np.abs(ears[both] - reference_ears[both]))) if both.any() else float("inf"),
+        })
+    return results
+
+
+def pick_backend(results: List[Dict], tolerance: float, reference_rate: float) -> Optional[str]:
+    """Fastest backend whose EARs agree with the reference and that finds faces as often"""
+    eligible = [r for r in results
+                if r["ear_mae"] <= tolerance and r["detection_rate"] >= reference_rate * 0.9]
+    return min(eligible, key=lambda r: r["ms_per_frame"])["backend"] if eligible else None
+
+
+def select_backend(model_path: str, config, sample_frames: Callable[[], List[np.ndarray]]) -> str:
+    """Backend named in the config, or for "auto" the benchmark winner cached for this machine"""
+    if config.BACKEND != "auto":
+        return config.BACKEND
+
+    machine = platform.node() or "local"
+    cache = {}
+    if os.path.exists(config.BENCHMARK_CACHE_PATH):
+        try:
+            with open(config.BENCHMARK_CACHE_PATH, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable backend benchmark cache: {e}")
+    if machine in cache:
+        return cache[machine]["backend"]
+
+    reference = create_backend("dlib", model_path, config)
+    candidates = [reference]
+    for name in BACKENDS[1:]:
+        try:
+            candidates.append(create_backend(name, model_path, config))
+        except RuntimeError as e:
+            logger.info(f"Skipping face backend '{name}': {e}")
+
+    frames = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) if f.ndim == 3 else f for f in sample_frames()]
+    if not frames:
+        return "dlib"
+    results = benchmark_backends(frames, candidates, reference)
+    reference_rate = next(r["detection_rate"] for r in results if r["backend"] == "dlib")
+    choice = pick_backend(results, config.EAR_TOLERANCE, reference_rate) or "dlib"
+    logger.info(f"Face backend benchmark: {results}; selected '{choice}'")
+
+    cache[machine] = {"backend": choice, "results": results, "measured_at": time.time()}
+    try:
+        with open(config.BENCHMARK_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write backend benchmark cache: {e}")
+    return choice
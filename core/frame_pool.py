@@ -0,0 +1,106 @@
+import threading
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+LANDMARK_POINTS = 68
+
+
+class FrameSlot:
+    """Preallocated buffers for one frame in flight: colour frame, grayscale copies and landmarks.
+
+    A slot is owned by whichever stage holds it and goes back to its pool on
+    release(); OpenCV writes into the buffers through `dst=` so a frame costs
+    no allocations once the pool is warm.
+    """
+
+    def __init__(self, pool: "FramePool", shape: Tuple[int, int, int]):
+        self._pool = pool
+        self.frame = np.empty(shape, dtype=np.uint8)
+        self.landmarks = np.zeros((LANDMARK_POINTS, 2), dtype=int)
+        self.display_landmarks = np.zeros((LANDMARK_POINTS, 2), dtype=int)
+        self._full_gray = np.empty(shape[:2], dtype=np.uint8)
+        self._grays: Dict[int, np.ndarray] = {}  # one buffer per processing width the governor has used
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.frame.shape
+
+    def gray(self, width: Optional[int] = None) -> np.ndarray:
+        """Grayscale copy of the frame, downscaled to `width` when that is narrower"""
+        gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY, dst=self._full_gray)
+        height, frame_width = gray.shape
+        if width is None or width >= frame_width:
+            return gray
+        small = self._grays.get(width)
+        if small is None:
+            small = self._grays[width] = np.empty((int(height * width / frame_width), width), dtype=np.uint8)
+        return cv2.resize(gray, (width, small.shape[0]), dst=small, interpolation=cv2.INTER_AREA)
+
+    def release(self):
+        self._pool.release(self)
+
+
+class FramePool:
+    """Free list of FrameSlots sized for frames resized to `width`.
+
+    Runs dry only if more frames are in flight than `slots`; a fresh slot is
+    allocated then (counted in `misses`) rather than blocking the pipeline.
+    """
+
+    def __init__(self, width: int, slots: int = 6):
+        self.width = width
+        self.slots = max(1, slots)
+        self.misses = 0
+        self.allocated = 0
+        self._shape: Optional[Tuple[int, int, int]] = None
+        self._free: List[FrameSlot] = []
+        self._lock = threading.Lock()
+
+    def _target_shape(self, raw: np.ndarray) -> Tuple[int, int, int]:
+        height, width = raw.shape[:2]
+        # Same rounding as imutils.resize, so frames match the unpooled pipeline exactly
+        return int(height * self.width / float(width)), self.width, 3
+
+    def acquire(self, shape: Tuple[int, int, int]) -> FrameSlot:
+        with self._lock:
+            if shape != self._shape:
+                # New camera resolution: slots of the old size are dropped as they come back
+                self._shape = shape
+                self._free = [FrameSlot(self, shape) for _ in range(self.slots)]
+                self.allocated += self.slots
+            if self._free:
+                return self._free.pop()
+            self.misses += 1
+            self.allocated += 1
+        logger.debug("Frame pool exhausted; allocating an extra slot")
+        return FrameSlot(self, shape)
+
+    def release(self, slot: FrameSlot):
+        with self._lock:
+            if slot.shape == self._shape and slot not in self._free:
+                self._free.append(slot)
+
+    def load(self, raw: np.ndarray) -> FrameSlot:
+        """Copy a captured frame into a free slot, resizing it to the pool width in the same pass"""
+        shape = self._target_shape(raw)
+        slot = self.acquire(shape)
+        if raw.shape == shape:
+            np.copyto(slot.frame, raw)
+        else:
+            cv2.resize(raw, (shape[1], shape[0]), dst=slot.frame, interpolation=cv2.INTER_AREA)
+        return slot
+
+    def stats(self) -> dict:
+        return {"slots": self.slots, "allocated": self.allocated, "misses": self.misses,
+                "free": len(self._free)}
+
+
+def release_buffers(item):
+    """Return an item's pooled buffers, if it holds any; used for queue drops and skipped frames"""
+    slot = getattr(item, "buffers", item)
+    if isinstance(slot, FrameSlot):
+        slot.release()
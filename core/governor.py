@@ -0,0 +1,89 @@
+import time
+from typing import Optional
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class FrameGovernor:
+    """Adapts analysis frame skipping and processing width to a CPU budget.
+
+    `budget` is the fraction of wall time the analysis loop may spend busy.
+    Over budget, frames are skipped first (up to `max_skip` between analysed
+    frames) and then the processing width is reduced; under the low
+    watermark the steps are undone in reverse order. The detector works on
+    timestamps, so skipped frames do not distort the engagement timeline.
+    """
+
+    def __init__(self, budget: float = 0.6, max_width: int = 450, min_width: int = 240,
+                 max_skip: int = 3, adjust_every: int = 15, low_watermark: float = 0.6,
+                 width_step: float = 0.8, smoothing: float = 0.2):
+        self.budget = budget
+        self.max_width = max_width
+        self.min_width = min(min_width, max_width)
+        self.max_skip = max_skip
+        self.adjust_every = max(1, adjust_every)
+        self.low_watermark = low_watermark
+        self.width_step = width_step
+        self.smoothing = smoothing
+        self.width = max_width
+        self.skip = 0
+        self.load = 0.0  # smoothed busy / wall time of the analysis loop
+        self.skipped_frames = 0
+        self.adjustments = 0
+        self._to_skip = 0
+        self._since_adjust = 0
+        self._last_started: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config, max_width: int, adaptive_width: bool = True):
+        """Build from PipelineConfig; `adaptive_width=False` only varies the frame skip"""
+        enabled = config.ADAPTIVE_GOVERNOR
+        return cls(budget=config.CPU_BUDGET, max_width=max_width,
+                   min_width=config.MIN_FRAME_WIDTH if enabled and adaptive_width else max_width,
+                   max_skip=config.MAX_FRAME_SKIP if enabled else 0,
+                   adjust_every=config.GOVERNOR_INTERVAL)
+
+    def admit(self) -> bool:
+        """Whether the incoming frame should be analysed"""
+        if self._to_skip > 0:
+            self._to_skip -= 1
+            self.skipped_frames += 1
+            return False
+        self._to_skip = self.skip
+        return True
+
+    def record(self, started: float):
+        """Account for an analysed frame whose processing began at `started` (perf_counter)"""
+        now = time.perf_counter()
+        if self._last_started is not None:
+            interval = started - self._last_started
+            if interval > 0:
+                sample = min((now - started) / interval, 1.0)
+                self.load += self.smoothing * (sample - self.load)
+        self._last_started = started
+
+        self._since_adjust += 1
+        if self._since_adjust >= self.adjust_every:
+            self._since_adjust = 0
+            self._adjust()
+
+    def _adjust(self):
+        width, skip = self.width, self.skip
+        if self.load > self.budget:
+            if self.skip < self.max_skip:
+                self.skip += 1
+            elif self.width > self.min_width:
+                self.width = max(self.min_width, int(self.width * self.width_step))
+        elif self.load < self.budget * self.low_watermark:
+            if self.width < self.max_width:
+                self.width = min(self.max_width, int(self.width / self.width_step))
+            elif self.skip > 0:
+                self.skip -= 1
+        if (width, skip) != (self.width, self.skip):
+            self.adjustments += 1
+            logger.info(f"Governor: load {self.load:.2f}, skip {self.skip}, width {self.width}")
+
+    def stats(self) -> dict:
+        return {"load": self.load, "skip": self.skip, "width": self.width,
+                "skipped_frames": self.skipped_frames, "adjustments": self.adjustments}
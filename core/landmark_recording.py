@@ -0,0 +1,234 @@
+import json
+import mmap
+import os
+import struct
+import time
+import numpy as np
+from dataclasses import asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from config.settings import EngagementConfig
+from core.data_models import SessionData
+from core.engagement_detector import EngagementDetector, ears_from_landmarks
+from services.api_service import build_engagement_summary
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+# File layout (little endian, every section 8-byte aligned so arrays can be mapped in place):
+#   MAGIC | uint32 header length | JSON header | padding
+#   then repeated chunks:
+#   CHUNK_MAGIC | uint32 frame count n | float64[n] timestamps | int16[n, 4] boxes
+#   | int16[n, 68, 2] landmarks | uint8[n] face present | padding
+MAGIC = b"ASESLMK1"
+CHUNK_MAGIC = b"CHNK"
+VERSION = 1
+LANDMARK_POINTS = 68
+
+_TIMESTAMP = np.dtype("<f8")
+_COORD = np.dtype("<i2")
+_INT16_RANGE = (np.iinfo(np.int16).min, np.iinfo(np.int16).max)
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+class LandmarkRecorder:
+    """Writes per-frame timestamps, face boxes and 68-point landmarks in chunks"""
+
+    def __init__(self, path: str, fps: float, chunk_frames: int = 256, **metadata):
+        self.path = path
+        self.chunk_frames = max(1, chunk_frames)
+        self.frames = 0
+        self._timestamps = np.zeros(self.chunk_frames, dtype=_TIMESTAMP)
+        self._boxes = np.zeros((self.chunk_frames, 4), dtype=_COORD)
+        self._landmarks = np.zeros((self.chunk_frames, LANDMARK_POINTS, 2), dtype=_COORD)
+        self._present = np.zeros(self.chunk_frames, dtype=np.uint8)
+        self._pending = 0
+
+        header = json.dumps({"version": VERSION, "fps": fps, "created_at": time.time(),
+                             **metadata}).encode("utf-8")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "wb")
+        preamble = MAGIC + struct.pack("<I", len(header)) + header
+        self._file.write(preamble + b"\0" * _padding(len(preamble)))
+
+    def append(self, timestamp: float, box: Optional[Tuple[int, int, int, int]] = None,
+               landmarks: Optional[np.ndarray] = None):
+        """Record one analysed frame; box and landmarks are None when no face was found"""
+        i = self._pending
+        self._timestamps[i] = timestamp
+        if landmarks is not None:
+            self._landmarks[i] = np.clip(landmarks, *_INT16_RANGE)
+            self._boxes[i] = np.clip(box, *_INT16_RANGE) if box is not None else 0
+            self._present[i] = 1
+        else:
+            self._landmarks[i] = 0
+            self._boxes[i] = 0
+            self._present[i] = 0
+        self._pending += 1
+        self.frames += 1
+        if self._pending == self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """Write buffered frames as one chunk"""
+        n = self._pending
+        if not n:
+            return
+        parts = [CHUNK_MAGIC, struct.pack("<I", n), self._timestamps[:n].tobytes(),
+                 self._boxes[:n].tobytes(), self._landmarks[:n].tobytes(), self._present[:n].tobytes()]
+        chunk = b"".join(parts)
+        # One write per chunk: a crash can only leave a truncated final chunk, which readers skip
+        self._file.write(chunk + b"\0" * _padding(len(chunk)))
+        self._file.flush()
+        self._pending = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        logger.info(f"Recorded {self.frames} frames of landmarks to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped reader for files written by LandmarkRecorder"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Not a landmark recording: {path}")
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a landmark recording: {path}")
+
+        header_len, = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.metadata: Dict = json.loads(self._mmap[start:start + header_len].decode("utf-8"))
+        self.fps: float = self.metadata["fps"]
+        offset = start + header_len
+        self._chunks = self._index(offset + _padding(offset))
+        self._arrays = None
+
+    def _index(self, offset: int) -> List[Tuple[int, int]]:
+        """(offset, frame count) of every complete chunk"""
+        chunks = []
+        size = len(self._mmap)
+        while offset + 8 <= size and self._mmap[offset:offset + 4] == CHUNK_MAGIC:
+            n, = struct.unpack_from("<I", self._mmap, offset + 4)
+            body = n * (_TIMESTAMP.itemsize + 4 * _COORD.itemsize + LANDMARK_POINTS * 2 * _COORD.itemsize + 1)
+            if offset + 8 + body > size:
+                logger.warning(f"{self.path}: ignoring truncated final chunk")
+                break
+            chunks.append((offset, n))
+            offset += 8 + body + _padding(8 + body)
+        return chunks
+
+    def chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """Zero-copy (timestamps, boxes, landmarks, present) views, one tuple per chunk"""
+        for offset, n in self._chunks:
+            offset += 8
+            timestamps = np.frombuffer(self._mmap, _TIMESTAMP, n, offset)
+            offset += timestamps.nbytes
+            boxes = np.frombuffer(self._mmap, _COORD, n * 4, offset).reshape(n, 4)
+            offset += boxes.nbytes
+            landmarks = np.frombuffer(self._mmap, _COORD, n * LANDMARK_POINTS * 2, offset)
+            landmarks = landmarks.reshape(n, LANDMARK_POINTS, 2)
+            offset += landmarks.nbytes
+            present = np.frombuffer(self._mmap, np.uint8, n, offset).astype(bool)
+            yield timestamps, boxes, landmarks, present
+
+    def _load(self):
+        if self._arrays is None:
+            parts = list(zip(*self.chunks()))
+            if not parts:
+                self._arrays = (np.zeros(0, _TIMESTAMP), np.zeros((0, 4), _COORD),
+                                np.zeros((0, LANDMARK_POINTS, 2), _COORD), np.zeros(0, bool))
+            elif len(self._chunks) == 1:
+                self._arrays = tuple(p[0] for p in parts)
+            else:
+                self._arrays = tuple(np.concatenate(p) for p in parts)
+        return self._arrays
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._load()[0]
+
+    @property
+    def boxes(self) -> np.ndarray:
+        return self._load()[1]
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        return self._load()[2]
+
+    @property
+    def present(self) -> np.ndarray:
+        return self._load()[3]
+
+    def __len__(self) -> int:
+        return sum(n for _, n in self._chunks)
+
+    def close(self):
+        # Arrays handed out keep the map alive; only drop our references
+        self._arrays = None
+        self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def replay(recording: LandmarkRecording, config: Optional[EngagementConfig] = None) -> EngagementDetector:
+    """Feed a recording through calibration and detection exactly as the live session does"""
+    detector_engine = EngagementDetector(config or EngagementConfig(), recording.fps)
+    ears = ears_from_landmarks(recording.landmarks).tolist()
+    start_time = None
+    for ear, present, current_time in zip(ears, recording.present.tolist(), recording.timestamps.tolist()):
+        ear = detector_engine.smooth_ear(ear) if present else 0
+        if not detector_engine.is_calibrated:
+            if detector_engine.calibrate(ear, current_time):
+                start_time = current_time
+        else:
+            detector_engine.detect_engagement(ear, current_time)
+            detector_engine.update_threshold_dynamically(current_time, start_time)
+    return detector_engine
+
+
+def score_recording(path: str, session: SessionData, config: Optional[EngagementConfig] = None) -> Dict:
+    """Re-score a landmark recording with a (possibly different) EngagementConfig"""
+    started = time.perf_counter()
+    with LandmarkRecording(path) as recording:
+        detector_engine = replay(recording, config)
+        frames = len(recording)
+        fps = recording.fps
+        recorded_seconds = (float(recording.timestamps[-1] - recording.timestamps[0]) + 1 / fps
+                            if frames else 0.0)
+    elapsed = time.perf_counter() - started
+
+    scored_time = len(detector_engine.engaged_status) / fps
+    summary = build_engagement_summary(session, detector_engine.engaged_status, scored_time, fps)
+    summary.update({
+        "recording": os.path.basename(path),
+        "calibrated": detector_engine.is_calibrated,
+        "ear_thresh": float(detector_engine.ear_thresh),
+        "processed_frames": frames,
+        "processing_seconds": elapsed,
+        "speedup": recorded_seconds / elapsed if elapsed > 0 else 0.0,
+        "config": asdict(detector_engine.config),
+    })
+    return summary
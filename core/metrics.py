@@ -0,0 +1,166 @@
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from config.settings import MetricsConfig
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+# Latency bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; each instance is written by a single thread"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing the q-th quantile"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Per-stage latency histograms and counters for the session hot path"""
+
+    enabled = True
+
+    def __init__(self, prefix: str = "ases", histogram_name: str = "stage_latency_seconds",
+                 label: str = "stage"):
+        self.prefix = prefix
+        self.histogram_name = histogram_name
+        self.label = label
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, stage: str) -> Histogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        return histogram
+
+    def observe(self, stage: str, started: float):
+        """Record the time since `started` (a time.perf_counter() value) for a stage"""
+        self._histogram(stage).observe((time.perf_counter() - started) * 1000)
+
+    def observe_ms(self, stage: str, latency_ms: float):
+        """Record a latency measured elsewhere, in milliseconds"""
+        self._histogram(stage).observe(latency_ms)
+
+    def inc(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self) -> List[dict]:
+        """Compact per-stage breakdown for display"""
+        return [
+            {"stage": stage, "count": h.count, "mean_ms": h.mean,
+             "p50_ms": h.quantile(0.5), "p95_ms": h.quantile(0.95)}
+            for stage, h in list(self.histograms.items())
+        ]
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        name = f"{self.prefix}_{self.histogram_name}"
+        lines = [f"# TYPE {name} histogram"]
+        for stage, h in list(self.histograms.items()):
+            label = f'{self.label}="{stage}"'
+            cumulative = 0
+            for bound, count in zip(h.buckets, h.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label},le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {h.count}')
+            lines.append(f'{name}_sum{{{label}}} {h.total / 1000:.6f}')
+            lines.append(f'{name}_count{{{label}}} {h.count}')
+        for counter, value in list(self.counters.items()):
+            metric = f"{self.prefix}_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics(MetricsRegistry):
+    """Drop-in registry used when instrumentation is disabled"""
+
+    enabled = False
+
+    def observe(self, stage: str, started: float):
+        pass
+
+    def observe_ms(self, stage: str, latency_ms: float):
+        pass
+
+    def inc(self, name: str, amount: int = 1):
+        pass
+
+
+class MetricsExporter:
+    """Serves a registry at /metrics from a background HTTP server thread"""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "127.0.0.1"):
+        registry_ref = registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry_ref.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep scrapes out of the application log
+
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-exporter", daemon=True)
+        self.thread.start()
+        logger.info(f"Metrics exporter listening on http://{host}:{port}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+# Global instances
+metrics_registry = None
+metrics_exporter = None
+
+def get_metrics() -> MetricsRegistry:
+    """Get or create the process-wide metrics registry, starting the exporter if configured"""
+    global metrics_registry, metrics_exporter
+    if metrics_registry is None:
+        config = MetricsConfig()
+        metrics_registry = MetricsRegistry() if config.ENABLED else NullMetrics()
+        if config.ENABLED and config.EXPORT_PORT:
+            try:
+                metrics_exporter = MetricsExporter(metrics_registry, config.EXPORT_PORT)
+            except OSError as e:
+                logger.warning(f"Metrics exporter not started: {e}")
+    return metrics_registry
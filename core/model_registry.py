@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class ModelRegistry:
+    """Process-wide cache of the dlib face detector, landmark predictors and other face models.
+
+    dlib is imported on first use, and each model is loaded once per process
+    and shared by every Streamlit rerun and session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._detector = None
+        self._predictors: Dict[str, object] = {}
+        self._others: Dict[object, object] = {}
+        self.load_times: Dict[str, float] = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def face_detector(self):
+        with self._lock:
+            if self._detector is None:
+                started = time.perf_counter()
+                import dlib
+                self._detector = dlib.get_frontal_face_detector()
+                self.load_times["face_detector"] = time.perf_counter() - started
+            return self._detector
+
+    def landmark_predictor(self, model_path: str):
+        with self._lock:
+            predictor = self._predictors.get(model_path)
+            if predictor is None:
+                started = time.perf_counter()
+                import dlib
+                predictor = self._predictors[model_path] = dlib.shape_predictor(model_path)
+                self.load_times[model_path] = time.perf_counter() - started
+                logger.info(f"Loaded landmark model in {self.load_times[model_path]:.2f}s")
+            return predictor
+
+    def load(self, key, loader: Callable[[], object]):
+        """Any other model, built by `loader` on first request for `key`"""
+        with self._lock:
+            model = self._others.get(key)
+            if model is None:
+                started = time.perf_counter()
+                model = self._others[key] = loader()
+                self.load_times[str(key)] = time.perf_counter() - started
+            return model
+
+    def warm_up(self, model_path: str) -> threading.Thread:
+        """Load the models (and the session UI's heavy imports) on a background thread"""
+        with self._lock:
+            if self._warmup_thread is not None:
+                return self._warmup_thread
+
+            def _load():
+                try:
+                    self.face_detector()
+                    self.landmark_predictor(model_path)
+                    import ui.session_ui  # noqa: F401  (cv2, pandas, imutils, pyttsx3)
+                except Exception as e:
+                    logger.error(f"Model warm-up failed: {e}")
+
+            self._warmup_thread = threading.Thread(target=_load, name="model-warmup", daemon=True)
+            self._warmup_thread.start()
+            return self._warmup_thread
+
+# Global instance
+model_registry = ModelRegistry()
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry"""
+    return model_registry
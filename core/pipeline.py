@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class PipelineStop(Exception):
+    """Raised by a stage function to end the pipeline normally"""
+
+
+class DropOldestQueue:
+    """Bounded hand-off queue that evicts the oldest item instead of blocking"""
+
+    def __init__(self, name: str, maxsize: int = 1, on_drop: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.on_drop = on_drop  # e.g. hand an evicted frame's buffers back to its pool
+        self.dropped = 0
+        self.put_count = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item: Any) -> None:
+        """Add an item, discarding the oldest one if the queue is full"""
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                evicted = self._items.popleft()
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(evicted)
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Return the oldest queued item, or None if nothing arrives in time"""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def wake(self):
+        """Release any consumer blocked in get()"""
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+
+class PipelineStage:
+    """Single pipeline stage: pulls from an inbox, applies a function, pushes to an outbox"""
+
+    def __init__(self, name: str, func: Callable, inbox: Optional[DropOldestQueue] = None,
+                 outbox: Optional[DropOldestQueue] = None):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.processed = 0
+        self.busy_time = 0.0
+        self.thread = None
+        self._stop_event = None
+
+    def run(self, stop_event: threading.Event):
+        """Stage loop; runs until the stop event is set or the function ends the pipeline"""
+        self._stop_event = stop_event
+        while not stop_event.is_set():
+            if self.inbox is not None:
+                item = self.inbox.get(timeout=0.1)
+                if item is None:
+                    continue
+
+            started = time.perf_counter()
+            try:
+                result = self.func(item) if self.inbox is not None else self.func()
+            except PipelineStop:
+                stop_event.set()
+                break
+            finally:
+                self.busy_time += time.perf_counter() - started
+
+            if result is None:
+                continue
+            self.processed += 1
+            if self.outbox is not None:
+                self.outbox.put(result)
+
+    def start(self, stop_event: threading.Event, on_error: Callable[[str, Exception], None]):
+        """Run the stage loop on a daemon thread"""
+        def _target():
+            try:
+                self.run(stop_event)
+            except Exception as e:
+                on_error(self.name, e)
+
+        self.thread = threading.Thread(target=_target, name=f"pipeline-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "processed": self.processed,
+            "queue_depth": self.inbox.depth if self.inbox else 0,
+            "dropped": self.inbox.dropped if self.inbox else 0,
+            "avg_ms": (self.busy_time / self.processed * 1000) if self.processed else 0.0,
+        }
+
+
+class FramePipeline:
+    """Capture / analysis / presentation stages linked by drop-oldest queues"""
+
+    def __init__(self):
+        self.stages: List[PipelineStage] = []
+        self.stop_event = threading.Event()
+        self.error: Optional[Exception] = None
+        self.started_at = None
+
+    def add_stage(self, name: str, func: Callable, inbox: Optional[DropOldestQueue] = None,
+                  outbox: Optional[DropOldestQueue] = None) -> PipelineStage:
+        stage = PipelineStage(name, func, inbox, outbox)
+        self.stages.append(stage)
+        return stage
+
+    def _on_error(self, name: str, error: Exception):
+        logger.error(f"Pipeline stage '{name}' failed: {error}")
+        self.error = error
+        self.stop()
+
+    def start(self, foreground: Optional[PipelineStage] = None):
+        """Start every background stage; the foreground stage is left to the caller"""
+        self.started_at = time.perf_counter()
+        for stage in self.stages:
+            if stage is not foreground:
+                stage.start(self.stop_event, self._on_error)
+
+    def run_foreground(self, stage: PipelineStage):
+        """Run a stage on the calling thread (e.g. Streamlit rendering) until the pipeline stops"""
+        try:
+            stage.run(self.stop_event)
+        except Exception as e:
+            self._on_error(stage.name, e)
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 2.0):
+        self.stop_event.set()
+        for stage in self.stages:
+            if stage.inbox is not None:
+                stage.inbox.wake()
+        current = threading.current_thread()
+        for stage in self.stages:
+            if stage.thread and stage.thread is not current and stage.thread.is_alive():
+                stage.thread.join(timeout=timeout)
+
+    @property
+    def running(self) -> bool:
+        return not self.stop_event.is_set()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage throughput, queue depth and drop counts"""
+        elapsed = (time.perf_counter() - self.started_at) if self.started_at else 0.0
+        stats = {}
+        for stage in self.stages:
+            stage_stats = stage.stats()
+            stage_stats["fps"] = stage.processed / elapsed if elapsed > 0 else 0.0
+            stats[stage.name] = stage_stats
+        return stats
@@ -3,8 +3,8 @@ import os
 from config.settings import EngagementConfig
 from core.data_models import SessionData
 from ui.components import setup_ui
-from ui.session_ui import run_engagement_session
-from services.chatbot_service import ChatbotManager
+from core.model_registry import get_model_registry
+from services.chatbot_service import get_chatbot_manager
 from config.logging_config import setup_logging
 
 logger = setup_logging()
@@ -19,10 +19,12 @@ def main():
         st.error("❌ Required model file 'shape_predictor_68_face_landmarks.dat' not found!", icon="❌")
         st.info("📥 Download from: http://dlib.net/files/shape_predictor_68_face_landmarks.dat.bz2")
         st.stop()
+
+    # Load dlib and the session modules in the background while the form is filled in
+    get_model_registry().warm_up(model_path)
     
-    # Initialize chatbot manager
-    chatbot = ChatbotManager()
-    chatbot.start()
+    # Process-wide sidecar; nothing is started until the chatbot is first opened
+    chatbot = get_chatbot_manager()
     
     # Header
     st.markdown('<div class="title">📚 aSES: Automated Student Engagement System</div>', 
@@ -41,6 +43,9 @@ def main():
             group = st.text_input("👥 Group", placeholder="e.g., Group 1")
             module = st.text_input("📋 Module", placeholder="e.g., Lecture 1")
             duration = st.slider("⏱️ Duration (minutes)", 1, 120, 10)
+            classroom = st.checkbox("🏫 Classroom mode", value=False,
+                                    help="Track every face in view as a separate student. "
+                                         "Name and matric number are used as the room label.")
             
             col1, col2 = st.columns(2)
             with col1:
@@ -54,7 +59,16 @@ def main():
         
         st.markdown("---")
         st.markdown("### 🤖 Assistant")
-        st.markdown(f"[💬 Open Chatbot](http://localhost:{chatbot.port})")
+        if chatbot.ready:
+            st.link_button("💬 Open Chatbot", chatbot.url, use_container_width=True)
+        elif st.button("💬 Start Chatbot", use_container_width=True):
+            chatbot.start()
+            with st.spinner("Starting the assistant..."):
+                ready = chatbot.wait_ready()
+            if ready:
+                st.link_button("💬 Open Chatbot", chatbot.url, use_container_width=True)
+            else:
+                st.error(f"Chatbot did not start; see {chatbot.config.SIDECAR_LOG}", icon="❌")
         
         st.markdown("---")
         st.markdown("### ℹ️ System Info")
@@ -68,9 +82,11 @@ def main():
             st.error("⚠️ Please fill in all required fields.", icon="❌")
         else:
             session = SessionData(name, matric_id, course, group, module, duration)
+            # Deferred: pulls in cv2, dlib, pandas and pyttsx3 (already imported if warm-up finished)
+            from ui.session_ui import run_engagement_session
             
             with st.spinner("🚀 Initializing engagement monitoring..."):
-                run_engagement_session(session, model_path)
+                run_engagement_session(session, model_path, classroom=classroom)
     else:
         # Welcome screen
         st.markdown("---")
@@ -1,39 +1,24 @@
 import streamlit as st
-import ollama
 import os
+import sys
+
+# Run as its own Streamlit app, so the project root is not on the path by default
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import ChatConfig
+from services.chat_engine import Conversation, get_chat_engine
 
 # Initialize session state for conversation history
-if "interaction" not in st.session_state:
-    st.session_state.interaction = [
-        {
-            "role": "system",
-            "content": "You are a helpful assistant for students, providing guidance on lectures and engagement tips.",
-        }
-    ]
+if "conversation" not in st.session_state:
+    st.session_state.conversation = Conversation.from_config(ChatConfig())
     st.session_state.messages = []
 
 # Function to interact with Ollama model
 def get_response(input_message, image_paths=None):
-    interaction = st.session_state.interaction
+    """Stream the reply; the prompt holds only as much history as the token budget allows"""
     if image_paths:
-        interaction.append({
-            "role": "user",
-            "content": f"{input_message} (Images uploaded: {', '.join(image_paths)})",
-        })
-    else:
-        interaction.append({
-            "role": "user",
-            "content": input_message,
-        })
-    try:
-        response = ollama.chat(model="gemma3:4b", messages=interaction)
-        interaction.append({
-            "role": "assistant",
-            "content": response['message']['content'],
-        })
-        return response['message']['content']
-    except Exception as e:
-        return f"Error: Could not connect to Ollama model. Ensure it is running. ({str(e)})"
+        input_message = f"{input_message} (Images uploaded: {', '.join(image_paths)})"
+    return get_chat_engine().reply(st.session_state.conversation, input_message)
 
 # Streamlit app layout
 st.title("Local Chat Assistant")
@@ -65,8 +50,7 @@ with st.container():
             st.write(f"Uploaded images: {', '.join(image_paths)}")
 
         with st.chat_message("assistant"):
-            response = get_response(user_input, image_paths)
-            st.markdown(response)
+            response = st.write_stream(get_response(user_input, image_paths))
             st.session_state.messages.append({"role": "assistant", "content": response})
 
 # Footer
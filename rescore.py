@@ -0,0 +1,121 @@
+import argparse
+import glob
+import json
+import os
+import time
+from dataclasses import fields
+from config.settings import EngagementConfig
+from core.data_models import SessionData
+from core.batch_engine import score_grid
+from core.engagement_detector import ears_from_landmarks
+from core.landmark_recording import LandmarkRecording, score_recording
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+def _convert(field_type, value: str):
+    if field_type in (bool, "bool"):
+        return value.strip().lower() in ("1", "true", "yes")
+    if field_type in (int, "int"):
+        return int(value)
+    if field_type in (float, "float"):
+        return float(value)
+    return value
+
+
+def parse_overrides(pairs, multiple: bool = False) -> dict:
+    """KEY=VALUE pairs -> EngagementConfig fields, converted to each field's type.
+
+    With `multiple`, VALUE is a comma-separated list and each key maps to a list.
+    """
+    types = {f.name: f.type for f in fields(EngagementConfig)}
+    overrides = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        key = key.strip().upper()
+        if key not in types:
+            raise ValueError(f"Unknown EngagementConfig field: {key}")
+        if multiple:
+            overrides[key] = [_convert(types[key], item) for item in value.split(",")]
+        else:
+            overrides[key] = _convert(types[key], value)
+    return overrides
+
+
+def sweep(paths, config: EngagementConfig, grid: dict) -> list:
+    """Score every recording against every grid combination with the vectorised engine"""
+    rows = []
+    for path in paths:
+        try:
+            with LandmarkRecording(path) as recording:
+                started = time.perf_counter()
+                results = score_grid(ears_from_landmarks(recording.landmarks), recording.present,
+                                     recording.timestamps, recording.fps, grid, config)
+                elapsed = time.perf_counter() - started
+        except (OSError, ValueError) as e:
+            print(f"{path}: FAILED ({e})")
+            continue
+        print(f"{os.path.basename(path)}: {len(results)} configurations in {elapsed * 1000:.0f} ms")
+        for overrides, result in results:
+            settings = ", ".join(f"{k}={v}" for k, v in overrides.items())
+            print(f"  {settings}: {result.engaged_fraction * 100:.1f}% engaged, "
+                  f"threshold {result.ear_thresh:.3f}")
+            rows.append({"recording": os.path.basename(path), **overrides,
+                         "calibrated": result.calibrated, "ear_thresh": result.ear_thresh,
+                         "engaged_percentage": result.engaged_fraction * 100,
+                         "disengaged_seconds": result.total_disengaged / recording.fps})
+    return rows
+
+
+def main():
+    """Re-score landmark recordings with a different engagement configuration"""
+    parser = argparse.ArgumentParser(description="Re-score landmark recordings without re-running vision")
+    parser.add_argument("recordings", nargs="+", help="Recording files (.lmr) or directories containing them")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="EngagementConfig override, e.g. --set DISENGAGED_THRESHOLD=2.0")
+    parser.add_argument("--grid", action="append", default=[], metavar="KEY=V1,V2,...",
+                        help="Sweep an EngagementConfig field over several values, e.g. --grid BLINK_DURATION=0.2,0.3")
+    parser.add_argument("--output", default=None, help="Write all summaries to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        config = EngagementConfig(**parse_overrides(args.overrides))
+        grid = parse_overrides(args.grid, multiple=True)
+    except ValueError as e:
+        parser.error(str(e))
+
+    paths = []
+    for item in args.recordings:
+        paths += sorted(glob.glob(os.path.join(item, "*.lmr"))) if os.path.isdir(item) else [item]
+
+    if grid:
+        summaries = sweep(paths, config, grid)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(summaries, f, indent=2)
+        logger.info(f"Swept {len(paths)} recordings over {args.grid}")
+        return
+
+    summaries = []
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        session = SessionData(stem, stem, "", "", "", 0)
+        try:
+            summary = score_recording(path, session, config)
+        except (OSError, ValueError) as e:
+            print(f"{path}: FAILED ({e})")
+            continue
+        summaries.append(summary)
+        print(f"{summary['recording']}: {summary['engaged_percentage']:.1f}% engaged, "
+              f"{summary['processed_frames']} frames in {summary['processing_seconds'] * 1000:.1f} ms "
+              f"({summary['speedup']:.0f}x real time)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summaries, f, indent=2)
+    logger.info(f"Re-scored {len(summaries)} recordings with overrides {args.overrides}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,73 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 import uvicorn
+from config.settings import DashboardConfig, EngagementConfig, LiveConfig, ServerConfig
+from services.ingestion_service import IngestionStore, WriteBehindBuffer
+from services.reporting_service import ReportingStore
+from services.live_scoring import LiveScoringService
+from services.live_dashboard import EventHub, clean_event
+from core.metrics import MetricsRegistry
 
-app = FastAPI()
+server_config = ServerConfig()
+dashboard_config = DashboardConfig()
+server_metrics = MetricsRegistry(prefix="ases_server", histogram_name="request_latency_seconds", label="route")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    store = IngestionStore(server_config.DATABASE_PATH, server_config.ROLLUP_BUCKET_SECONDS)
+    buffer = WriteBehindBuffer(store, server_config.BATCH_SIZE, server_config.FLUSH_INTERVAL,
+                               server_config.MAX_PENDING)
+    await buffer.start()
+    app.state.store = store
+    app.state.ingest_buffer = buffer
+    app.state.reporting = ReportingStore(server_config.DATABASE_PATH, server_config.ROLLUP_BUCKET_SECONDS)
+    app.state.dashboard = EventHub(dashboard_config.EVENT_BUFFER, dashboard_config.STALE_SECONDS)
+    # Live sessions end up in the same write-behind buffer as uploaded summaries
+    app.state.live = LiveScoringService(EngagementConfig(), LiveConfig().RESUME_SECONDS,
+                                        lambda summary, key: buffer.submit([summary], key=key),
+                                        app.state.dashboard.publish, dashboard_config.PROGRESS_INTERVAL)
+    try:
+        yield
+    finally:
+        await app.state.live.close()
+        await buffer.stop()
+        store.close()
+
+
+class LatencyMiddleware:
+    """Records each request's latency (until its response starts) per route.
+
+    Plain ASGI rather than @app.middleware("http"): that wraps every response
+    body in an extra stream, which long-lived dashboard streams pay for on
+    every push.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                server_metrics.observe(route.path if route else "unmatched", started)
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(LatencyMiddleware)
 
 # End point for healthy check
 @app.get("/", tags=['Home'])
@@ -9,10 +75,194 @@ async def home():
     return {'up & running'}
 
 
+def _validate(summary: dict):
+    if not isinstance(summary, dict) or not summary.get("matric_id"):
+        raise HTTPException(status_code=422, detail="Each summary must be an object with a matric_id")
+
+
 @app.post("/api/v1/engagement/upload", tags=['Engagement'])
-async def upload_engagement(data: dict):
-    print("Received data:", data)  # For debugging
-    return {"status": "success", "message": "Data received"}
+async def upload_engagement(data: dict, idempotency_key: Optional[str] = Header(default=None)):
+    _validate(data)
+    result = await app.state.ingest_buffer.submit([data], key=idempotency_key)
+    return {"status": "success", "message": "Data received", **result}
+
+
+@app.post("/api/v1/engagement/bulk", tags=['Engagement'])
+async def upload_engagement_bulk(data: List[dict]):
+    """Accept many session summaries at once; each may carry its own idempotency_key"""
+    for summary in data:
+        _validate(summary)
+    result = await app.state.ingest_buffer.submit(data)
+    return {"status": "success", "received": len(data), **result}
+
+
+@app.get("/api/v1/engagement/ingest/stats", tags=['Engagement'])
+async def ingest_stats():
+    buffer = app.state.ingest_buffer
+    return {"pending": buffer.pending, **buffer.stats}
+
+
+@app.websocket("/api/v1/engagement/live")
+async def live_engagement(websocket: WebSocket):
+    """Thin-client scoring: a session hello, then binary EAR packets, each answered with the live status"""
+    await websocket.accept()
+    live_service = app.state.live
+    try:
+        live = live_service.open(await websocket.receive_json())
+    except (KeyError, TypeError, ValueError) as e:
+        await websocket.close(code=1008, reason=f"Invalid session: {e}"[:120])
+        return
+    except WebSocketDisconnect:
+        return
+
+    try:
+        await websocket.send_json(live.state())
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                await websocket.send_json(live_service.feed(live, message["bytes"]))
+            elif json.loads(message.get("text") or "{}").get("type") == "end":
+                await websocket.send_json({"summary": await live_service.finish(live)})
+                await websocket.close()
+                break
+    except WebSocketDisconnect:
+        pass
+    except ValueError as e:
+        await websocket.close(code=1003, reason=str(e)[:120])
+    finally:
+        live_service.detach(live)
+
+
+@app.get("/api/v1/engagement/live/stats", tags=['Engagement'])
+async def live_stats():
+    live_service = app.state.live
+    return {"active": live_service.active, **live_service.stats}
+
+
+@app.post("/api/v1/engagement/live/events", tags=['Dashboard'])
+async def publish_live_events(events: List[dict]):
+    """Status events from kiosks: transitions, periodic engagement percentage and session end"""
+    try:
+        cleaned = [clean_event(event) for event in events]
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"status": "success", "published": app.state.dashboard.publish_many(cleaned)}
+
+
+def _dashboard_filter(course: Optional[str], group: Optional[str]):
+    if group is not None and course is None:
+        raise HTTPException(status_code=422, detail="A group filter needs a course")
+
+
+@app.get("/api/v1/engagement/live/dashboard", tags=['Dashboard'])
+async def live_dashboard(course: Optional[str] = None, group: Optional[str] = None,
+                         recent: int = Query(default=50, ge=0, le=1000)):
+    """Latest state of every live session, and the most recent events"""
+    _dashboard_filter(course, group)
+    return app.state.dashboard.snapshot(course, group, recent)
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _dashboard_stream(hub: EventHub, subscriber, snapshot: dict):
+    try:
+        yield _sse("snapshot", json.dumps(snapshot, separators=(",", ":")))
+        while True:
+            try:
+                updates = await asyncio.wait_for(subscriber.next(), dashboard_config.HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse("update", updates)
+            # Caps the push rate per viewer; whatever arrives meanwhile is merged into the next push
+            await asyncio.sleep(dashboard_config.COALESCE_INTERVAL)
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+@app.get("/api/v1/engagement/live/dashboard/stream", tags=['Dashboard'])
+async def live_dashboard_stream(course: Optional[str] = None, group: Optional[str] = None):
+    """Server-Sent Events: a snapshot, then coalesced updates for the matching sessions"""
+    _dashboard_filter(course, group)
+    hub = app.state.dashboard
+    subscriber = hub.subscribe(course, group)
+    return StreamingResponse(_dashboard_stream(hub, subscriber, hub.snapshot(course, group)),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/dashboard", tags=['Dashboard'], include_in_schema=False)
+async def dashboard_page():
+    return FileResponse(os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui", "dashboard.html"))
+
+
+@app.get("/metrics", tags=['Home'], response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of request latencies, ingestion and live scoring counters"""
+    buffer = app.state.ingest_buffer
+    for name, value in buffer.stats.items():
+        server_metrics.counters[f"ingest_{name}"] = value
+    for name, value in app.state.live.stats.items():
+        server_metrics.counters[f"live_{name}"] = value
+    hub = app.state.dashboard
+    for name, value in hub.stats.items():
+        server_metrics.counters[f"dashboard_{name}"] = value
+    gauges = (f"# TYPE ases_server_ingest_pending gauge\nases_server_ingest_pending {buffer.pending}\n"
+              f"# TYPE ases_server_live_sessions gauge\nases_server_live_sessions {app.state.live.active}\n"
+              f"# TYPE ases_server_dashboard_viewers gauge\nases_server_dashboard_viewers {hub.viewers}\n"
+              f"# TYPE ases_server_dashboard_buffered_events gauge\n"
+              f"ases_server_dashboard_buffered_events {hub.buffered_events}\n")
+    return server_metrics.render_prometheus() + gauges
+
+
+# Reporting endpoints are plain functions: FastAPI runs them in its threadpool,
+# so SQLite reads never block the event loop that handles uploads.
+@app.get("/api/v1/engagement/rollups", tags=['Reporting'])
+def engagement_rollups(course: Optional[str] = None, group: Optional[str] = None,
+                       module: Optional[str] = None,
+                       start: Optional[float] = Query(default=None, alias="from"),
+                       end: Optional[float] = Query(default=None, alias="to"),
+                       by_bucket: bool = False):
+    """Engagement per course/group/module from the pre-aggregated time buckets"""
+    return app.state.reporting.rollups(course, group, module, start, end, by_bucket)
+
+
+@app.get("/api/v1/engagement/students", tags=['Reporting'])
+def engagement_students(course: Optional[str] = None, group: Optional[str] = None,
+                        module: Optional[str] = None, matric_id: Optional[str] = None,
+                        limit: int = Query(default=100, ge=1, le=1000), offset: int = Query(default=0, ge=0)):
+    """Per-student engagement rollups"""
+    return app.state.reporting.students(course, group, module, matric_id, limit, offset)
+
+
+@app.get("/api/v1/engagement/sessions", tags=['Reporting'])
+def engagement_sessions(course: Optional[str] = None, group: Optional[str] = None,
+                        module: Optional[str] = None,
+                        start: Optional[float] = Query(default=None, alias="from"),
+                        end: Optional[float] = Query(default=None, alias="to"),
+                        after_id: int = Query(default=0, ge=0),
+                        limit: int = Query(default=500, ge=1, le=5000)):
+    """Raw session rows, keyset-paginated by id; pass next_after_id to get the next page"""
+    items = app.state.reporting.sessions_page(start, end, course, group, module, after_id, limit)
+    next_after_id = items[-1]["id"] if len(items) == limit else None
+    return {"items": items, "next_after_id": next_after_id}
+
+
+@app.get("/api/v1/engagement/export", tags=['Reporting'])
+def engagement_export(course: Optional[str] = None, group: Optional[str] = None,
+                      module: Optional[str] = None,
+                      start: Optional[float] = Query(default=None, alias="from"),
+                      end: Optional[float] = Query(default=None, alias="to")):
+    """Stream every matching session as newline-delimited JSON"""
+    rows = app.state.reporting.iter_sessions(
+        chunk_size=server_config.EXPORT_CHUNK_SIZE,
+        start=start, end=end, course=course, group=group, module=module
+    )
+    return StreamingResponse((json.dumps(row) + "\n" for row in rows), media_type="application/x-ndjson")
 
 # if __name__ == "__main__":
-#     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+#     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -1,51 +1,47 @@
-import requests
-import pandas as pd
-from typing import Optional, List
-import time
+import numpy as np
+from typing import Optional, Sequence
 from core.data_models import SessionData
+from services.upload_service import get_upload_client
 from config.logging_config import setup_logging
-import streamlit as st
 
 logger = setup_logging()
 
-def post_engagement_data(session: SessionData, engaged_status: List[int], 
-                        total_time: float, fps: float) -> Optional[dict]:
-    """Post engagement data to server with retry logic"""
-    summary = {
+def build_engagement_summary(session: SessionData, engaged_status: Sequence[int],
+                             total_time: float, fps: float) -> dict:
+    """Build the session summary payload sent to the server"""
+    total_frames = len(engaged_status)
+    engaged_frames = int(np.count_nonzero(engaged_status)) if total_frames else 0
+    return {
         "name": session.name,
         "matric_id": session.matric_id,
         "course": session.course,
         "module": session.module,
         "group": session.group,
-        "engaged_percentage": (sum(engaged_status) / len(engaged_status) * 100) if engaged_status else 0,
-        "total_frames": len(engaged_status),
-        "disengaged_seconds": sum(1 for x in engaged_status if x == 0) / fps if engaged_status else 0,
+        "engaged_percentage": (engaged_frames / total_frames * 100) if total_frames else 0,
+        "total_frames": total_frames,
+        "disengaged_seconds": (total_frames - engaged_frames) / fps if total_frames else 0,
         "time": total_time,
         "fps": fps
     }
+
+def post_engagement_data(session: SessionData, engaged_status: Sequence[int], 
+                        total_time: float, fps: float, idempotency_key: Optional[str] = None) -> Optional[dict]:
+    """Queue engagement data for upload and return immediately.
+
+    The summary is journaled to the local outbox and sent by the background
+    upload client, which retries with backoff until the server accepts it.
+    """
+    # Imported here: the server builds summaries for live sessions without Streamlit installed
+    import streamlit as st
+    summary = build_engagement_summary(session, engaged_status, total_time, fps)
+    if idempotency_key:
+        summary["idempotency_key"] = idempotency_key  # the server keeps one record per key
     
-    # Try to post to server
-    for attempt in range(3):
-        try:
-            response = requests.post(
-                'http://127.0.0.1:8000/api/v1/engagement/upload',
-                json=summary,
-                timeout=10
-            )
-            response.raise_for_status()
-            st.success("Data sent to server successfully.", icon="✅")
-            logger.info(f"Server response: {response.json()}")
-            return summary
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Server attempt {attempt + 1} failed: {e}")
-            if attempt == 2:  # Last attempt
-                st.error(f"Server error: {e}. Data logged locally.", icon="❌")
-                # Save locally as backup
-                try:
-                    df = pd.DataFrame([summary])
-                    df.to_csv("engagement_data.csv", mode='a', header=False, index=False)
-                except Exception as save_error:
-                    logger.error(f"Failed to save locally: {save_error}")
-            time.sleep(1)  # Brief delay between retries
+    try:
+        get_upload_client().submit(summary)
+        st.success("Session saved. Uploading to server in the background.", icon="✅")
+    except OSError as e:
+        logger.error(f"Failed to queue upload: {e}")
+        st.error(f"Could not save session data locally: {e}", icon="❌")
     
     return summary
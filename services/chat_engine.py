@@ -0,0 +1,175 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+import ollama
+from config.settings import ChatConfig
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+_WORDS = re.compile(r"[a-z0-9']+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token); no tokenizer is loaded for the local model"""
+    return len(text) // 4 + 1
+
+
+def normalise(text: str) -> str:
+    """Lower-case words only, so "Engagement tips?" and "engagement  tips" share a cache entry"""
+    return " ".join(_WORDS.findall(text.lower()))
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of complete assistant replies"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max(1, max_size)
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[str]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: str):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class Conversation:
+    """One browser session's chat history, sent to the model within a token budget.
+
+    The newest turns that fit are sent verbatim; older user questions are
+    condensed into a short note so the model keeps the thread of the
+    conversation without the prompt growing with every turn.
+    """
+
+    def __init__(self, system_prompt: str, token_budget: int = 1500, summary_budget: int = 150):
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.turns: List[Dict[str, str]] = []
+
+    @classmethod
+    def from_config(cls, config: ChatConfig) -> "Conversation":
+        return cls(config.SYSTEM_PROMPT, config.HISTORY_TOKEN_BUDGET, config.SUMMARY_TOKEN_BUDGET)
+
+    def add(self, role: str, content: str):
+        self.turns.append({"role": role, "content": content})
+
+    def recent(self, count: int) -> List[Dict[str, str]]:
+        return self.turns[-count:] if count > 0 else []
+
+    def _summary(self, dropped: List[Dict[str, str]]) -> Optional[str]:
+        """Earlier questions, newest first, cut off at the summary budget"""
+        questions = [t["content"].strip() for t in reversed(dropped) if t["role"] == "user"]
+        if not questions:
+            return None
+        note = "Earlier in this conversation the student asked about: "
+        kept = []
+        for question in questions:
+            question = question if len(question) <= 120 else question[:117] + "..."
+            if estimate_tokens(note + "; ".join(kept + [question])) > self.summary_budget:
+                break
+            kept.append(question)
+        return note + "; ".join(kept) if kept else None
+
+    def window(self, message: str) -> List[Dict[str, str]]:
+        """Messages for the next request: system prompt, summary, the newest turns that fit, the question"""
+        used = estimate_tokens(self.system_prompt) + estimate_tokens(message) + self.summary_budget
+        start = len(self.turns)
+        while start > 0:
+            cost = estimate_tokens(self.turns[start - 1]["content"])
+            if used + cost > self.token_budget:
+                break
+            used += cost
+            start -= 1
+
+        messages = [{"role": "system", "content": self.system_prompt}]
+        summary = self._summary(self.turns[:start])
+        if summary:
+            messages.append({"role": "system", "content": summary})
+        messages += self.turns[start:]
+        messages.append({"role": "user", "content": message})
+        return messages
+
+
+class ChatEngine:
+    """Streams replies from the Ollama model, answering repeated questions from the cache"""
+
+    def __init__(self, config: ChatConfig, client=None, cache: Optional[ResponseCache] = None):
+        self.config = config
+        self.client = client or ollama.Client(host=config.OLLAMA_HOST or None)
+        self.cache = cache or ResponseCache(config.CACHE_SIZE)
+
+    def cache_key(self, conversation: Conversation, message: str) -> Tuple:
+        context = tuple(normalise(t["content"]) for t in conversation.recent(self.config.CACHE_CONTEXT_TURNS))
+        return self.config.MODEL, context, normalise(message)
+
+    def reply(self, conversation: Conversation, message: str) -> Iterator[str]:
+        """Yield the reply as it is generated; the turn is recorded once the reply is complete"""
+        key = self.cache_key(conversation, message)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"Chat reply served from cache ({self.cache.hits} hits, {len(self.cache)} entries)")
+            conversation.add("user", message)
+            conversation.add("assistant", cached)
+            yield cached
+            return
+
+        messages = conversation.window(message)
+        started = time.perf_counter()
+        first_token = None
+        parts = []
+        try:
+            for chunk in self.client.chat(model=self.config.MODEL, messages=messages, stream=True):
+                text = chunk["message"]["content"]
+                if not text:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(text)
+                yield text
+        except Exception as e:
+            logger.error(f"Chat request failed: {e}")
+            yield f"Error: Could not connect to Ollama model. Ensure it is running. ({str(e)})"
+            return
+
+        # Only complete replies reach the history and the cache; a stream the UI abandoned never gets here
+        answer = "".join(parts)
+        conversation.add("user", message)
+        conversation.add("assistant", answer)
+        if answer:
+            self.cache.put(key, answer)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        logger.info(f"Chat reply: ~{prompt_tokens} prompt tokens in {len(messages)} messages, "
+                    f"first token {first_token or 0:.2f}s, total {time.perf_counter() - started:.2f}s")
+
+
+# Global instance; shared by every chat session in the process so cached answers are too
+chat_engine = None
+
+
+def get_chat_engine() -> ChatEngine:
+    """Get or create the chat engine"""
+    global chat_engine
+    if chat_engine is None:
+        chat_engine = ChatEngine(ChatConfig())
+    return chat_engine
@@ -1,36 +1,183 @@
 import subprocess
 import os
+import sys
 import atexit
+import threading
 import time
+import urllib.error
+import urllib.request
+from typing import Optional
+from config.settings import ChatConfig
 from config.logging_config import setup_logging
 
 logger = setup_logging()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
 class ChatbotManager:
-    """Manage chatbot subprocess"""
-    
-    def __init__(self, port: int = 8502):
-        self.port = port
-        self.process = None
+    """Supervise the chatbot Streamlit app as a single process-wide sidecar.
+
+    Nothing runs until start() is first called. Readiness is checked on the
+    sidecar's health endpoint, its output goes to a log file, and it is
+    restarted with exponential backoff if it exits unexpectedly.
+    """
+
+    def __init__(self, config: ChatConfig, script_path: str = os.path.join(PROJECT_ROOT, "pages", "chatbot.py")):
+        self.config = config
+        self.port = config.SIDECAR_PORT
+        self.script_path = script_path
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self._ready = False
+        self._checked_at = 0.0  # monotonic time of the last health probe behind `ready`
+        self._external = False  # another process already serves the port
+        self._log_file = None
+        self._started_at = 0.0
+        self._crashes = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
         atexit.register(self.stop)
-    
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    def is_ready(self) -> bool:
+        """True when the sidecar's health endpoint answers"""
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{self.config.HEALTH_PATH}", timeout=1) as r:
+                return r.status == 200
+        except (urllib.error.URLError, OSError):
+            return False
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def ready(self) -> bool:
+        """Cheap per-rerun check: once the sidecar has answered it is re-probed every HEALTH_RECHECK_SECONDS"""
+        if not (self.running or self._external):
+            self._ready = False
+            return False
+        now = time.monotonic()
+        if not self._ready or now - self._checked_at >= self.config.HEALTH_RECHECK_SECONDS:
+            self._checked_at = now
+            self._ready = self.is_ready()
+            if not self._ready and self._external:
+                # Not ours to restart; the next start() serves the port itself
+                logger.warning(f"Chatbot on port {self.port} stopped answering")
+                self._external = False
+        return self._ready
+
     def start(self):
-        """Start chatbot subprocess"""
-        if not self.process and os.path.exists("pages/chatbot.py"):
+        """Start the sidecar and its supervisor if they are not running yet; returns immediately"""
+        with self._lock:
+            if self._supervisor is not None and self._supervisor.is_alive():
+                return
+            if not os.path.exists(self.script_path):
+                logger.error(f"Chatbot script not found: {self.script_path}")
+                return
+            if self.is_ready():
+                logger.info(f"Chatbot already served on port {self.port}; not starting another")
+                self._external = self._ready = True
+                self._checked_at = time.monotonic()
+                return
+            self._stopping.clear()
             try:
-                self.process = subprocess.Popen(
-                    ["streamlit", "run", "pages/chatbot.py", "--server.port", str(self.port)],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                logger.info(f"Started chatbot on port {self.port}")
-                time.sleep(2)
-            except Exception as e:
+                self._spawn()
+            except OSError as e:
                 logger.error(f"Failed to start chatbot: {e}")
-    
+                self._stopping.set()  # wait_ready() gives up straight away
+                return
+            self._supervisor = threading.Thread(target=self._supervise, name="chatbot-supervisor", daemon=True)
+            self._supervisor.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the health endpoint answers, the sidecar stops or crashes, or the timeout passes"""
+        deadline = time.monotonic() + (self.config.READY_TIMEOUT if timeout is None else timeout)
+        restarts = self.restarts
+        while time.monotonic() < deadline:
+            if self.is_ready():
+                self._ready = True
+                self._checked_at = time.monotonic()
+                return True
+            if self._stopping.is_set():
+                return False
+            if not self.running or self.restarts != restarts:
+                # Crashed during start-up; the supervisor retries with backoff, the caller need not wait
+                logger.warning(f"Chatbot exited while starting; see {self.config.SIDECAR_LOG}")
+                return False
+            time.sleep(0.2)
+        return False
+
+    def _spawn(self):
+        if self._log_file is None or self._log_file.closed:
+            self._log_file = open(self.config.SIDECAR_LOG, "a", buffering=1)
+        self._log_file.write(f"--- starting chatbot on port {self.port} at {time.ctime()} ---\n")
+        # Output goes to the log file: an undrained PIPE would eventually block the child
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", self.script_path,
+             "--server.port", str(self.port), "--server.headless", "true"],
+            stdout=self._log_file,
+            stderr=subprocess.STDOUT,
+            cwd=PROJECT_ROOT,
+        )
+        self._started_at = time.monotonic()
+        self._ready = False
+        logger.info(f"Started chatbot on port {self.port} (pid {self.process.pid})")
+
+    def _supervise(self):
+        """Restart the sidecar with exponential backoff whenever it exits on its own"""
+        while not self._stopping.is_set():
+            process = self.process
+            code = process.wait()
+            if self._stopping.is_set():
+                break
+            if time.monotonic() - self._started_at >= self.config.STABLE_SECONDS:
+                self._crashes = 0  # It ran fine for a while; start the backoff over
+            delay = min(self.config.RESTART_BACKOFF_BASE * 2 ** self._crashes, self.config.RESTART_BACKOFF_MAX)
+            self._crashes += 1
+            logger.warning(f"Chatbot exited with code {code}; restarting in {delay:.0f}s")
+            if self._stopping.wait(delay):
+                break
+            with self._lock:
+                if self._stopping.is_set():
+                    break
+                try:
+                    self._spawn()
+                    self.restarts += 1
+                except OSError as e:
+                    logger.error(f"Failed to restart chatbot: {e}")
+                    self._stopping.set()
+
     def stop(self):
         """Stop chatbot subprocess"""
-        if self.process:
-            self.process.terminate()
-            self.process = None
-            logger.info("Chatbot subprocess terminated")
\ No newline at end of file
+        self._stopping.set()
+        with self._lock:
+            process, self.process = self.process, None
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            logger.info("Chatbot subprocess terminated")
+        if self._log_file is not None:
+            self._log_file.close()
+
+
+# Global instance; Streamlit reruns and sessions share the one sidecar
+chatbot_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_chatbot_manager() -> ChatbotManager:
+    """Get or create the chatbot manager; creating it does not start anything"""
+    global chatbot_manager
+    with _manager_lock:
+        if chatbot_manager is None:
+            chatbot_manager = ChatbotManager(ChatConfig())
+        return chatbot_manager
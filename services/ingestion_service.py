@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+SUMMARY_FIELDS = ("name", "matric_id", "course", "group", "module", "engaged_percentage",
+                  "total_frames", "disengaged_seconds", "time", "fps")
+
+
+def idempotency_key(summary: dict, key: Optional[str] = None) -> str:
+    """Explicit key if given, otherwise a hash of the canonical payload"""
+    key = key or summary.get("idempotency_key")
+    if key:
+        return str(key)
+    canonical = json.dumps(summary, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class IngestionStore:
+    """SQLite store for uploaded session summaries, opened in WAL mode"""
+
+    def __init__(self, path: str, bucket_seconds: int = 3600):
+        self.path = path
+        self.bucket_seconds = int(bucket_seconds)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def _create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS engagement_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                received_at REAL NOT NULL,
+                name TEXT,
+                matric_id TEXT,
+                course TEXT,
+                "group" TEXT,
+                module TEXT,
+                engaged_percentage REAL,
+                total_frames INTEGER,
+                disengaged_seconds REAL,
+                time REAL,
+                fps REAL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_received ON engagement_sessions (received_at);
+        """)
+        self._create_rollups()
+
+    def _create_rollups(self):
+        """Rollup tables maintained by triggers, so they only count rows actually inserted"""
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS rollup_window (
+                course TEXT NOT NULL,
+                "group" TEXT NOT NULL,
+                module TEXT NOT NULL,
+                bucket_start INTEGER NOT NULL,
+                sessions INTEGER NOT NULL,
+                engaged_percentage_sum REAL NOT NULL,
+                engaged_frames REAL NOT NULL,
+                total_frames INTEGER NOT NULL,
+                disengaged_seconds REAL NOT NULL,
+                PRIMARY KEY (course, "group", module, bucket_start)
+            );
+            CREATE TABLE IF NOT EXISTS rollup_student (
+                course TEXT NOT NULL,
+                "group" TEXT NOT NULL,
+                module TEXT NOT NULL,
+                matric_id TEXT NOT NULL,
+                name TEXT,
+                sessions INTEGER NOT NULL,
+                engaged_percentage_sum REAL NOT NULL,
+                engaged_frames REAL NOT NULL,
+                total_frames INTEGER NOT NULL,
+                disengaged_seconds REAL NOT NULL,
+                last_received REAL NOT NULL,
+                PRIMARY KEY (course, "group", module, matric_id)
+            );
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_after_insert AFTER INSERT ON engagement_sessions
+            BEGIN
+                INSERT INTO rollup_window VALUES (
+                    COALESCE(NEW.course, ''), COALESCE(NEW."group", ''), COALESCE(NEW.module, ''),
+                    CAST(NEW.received_at / {self.bucket_seconds} AS INTEGER) * {self.bucket_seconds},
+                    1, COALESCE(NEW.engaged_percentage, 0),
+                    COALESCE(NEW.engaged_percentage, 0) * COALESCE(NEW.total_frames, 0) / 100.0,
+                    COALESCE(NEW.total_frames, 0), COALESCE(NEW.disengaged_seconds, 0)
+                )
+                ON CONFLICT (course, "group", module, bucket_start) DO UPDATE SET
+                    sessions = sessions + 1,
+                    engaged_percentage_sum = engaged_percentage_sum + excluded.engaged_percentage_sum,
+                    engaged_frames = engaged_frames + excluded.engaged_frames,
+                    total_frames = total_frames + excluded.total_frames,
+                    disengaged_seconds = disengaged_seconds + excluded.disengaged_seconds;
+
+                INSERT INTO rollup_student VALUES (
+                    COALESCE(NEW.course, ''), COALESCE(NEW."group", ''), COALESCE(NEW.module, ''),
+                    COALESCE(NEW.matric_id, ''), NEW.name,
+                    1, COALESCE(NEW.engaged_percentage, 0),
+                    COALESCE(NEW.engaged_percentage, 0) * COALESCE(NEW.total_frames, 0) / 100.0,
+                    COALESCE(NEW.total_frames, 0), COALESCE(NEW.disengaged_seconds, 0), NEW.received_at
+                )
+                ON CONFLICT (course, "group", module, matric_id) DO UPDATE SET
+                    name = excluded.name,
+                    sessions = sessions + 1,
+                    engaged_percentage_sum = engaged_percentage_sum + excluded.engaged_percentage_sum,
+                    engaged_frames = engaged_frames + excluded.engaged_frames,
+                    total_frames = total_frames + excluded.total_frames,
+                    disengaged_seconds = disengaged_seconds + excluded.disengaged_seconds,
+                    last_received = MAX(last_received, excluded.last_received);
+            END;
+        """)
+
+    @staticmethod
+    def _row(record: dict) -> tuple:
+        summary = record["summary"]
+        return (record["key"], record["received_at"],
+                *(summary.get(field) for field in SUMMARY_FIELDS),
+                json.dumps(summary, default=str))
+
+    def write_batch(self, records: List[dict]) -> int:
+        """Insert a batch in one transaction; duplicates by idempotency key are ignored"""
+        rows = [self._row(record) for record in records]
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                # rowcount, not total_changes: the rollup triggers' own inserts must not count as written
+                cursor = self.conn.executemany(
+                    'INSERT OR IGNORE INTO engagement_sessions (idempotency_key, received_at, name, '
+                    'matric_id, course, "group", module, engaged_percentage, total_frames, '
+                    'disengaged_seconds, time, fps, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM engagement_sessions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class WriteBehindBuffer:
+    """Collects uploads in memory and flushes them to the store in batches.
+
+    A flush is triggered when `batch_size` records are pending or every
+    `flush_interval` seconds. SQLite writes run in the default executor so
+    the event loop is never blocked by disk I/O.
+    """
+
+    def __init__(self, store: IngestionStore, batch_size: int = 500, flush_interval: float = 0.5,
+                 max_pending: int = 50000):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.stats = {"accepted": 0, "duplicates": 0, "written": 0, "batches": 0, "errors": 0}
+        self._pending: List[dict] = []
+        self._pending_keys = set()
+        self._wakeup = None
+        self._flush_lock = None
+        self._task = None
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background flusher and write anything still pending"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def submit(self, summaries: List[dict], key: Optional[str] = None) -> Dict[str, int]:
+        """Queue summaries for writing; returns accepted and duplicate counts"""
+        accepted = duplicates = 0
+        received_at = time.time()
+        for summary in summaries:
+            record_key = idempotency_key(summary, key if len(summaries) == 1 else None)
+            if record_key in self._pending_keys:
+                duplicates += 1
+                continue
+            self._pending_keys.add(record_key)
+            self._pending.append({"key": record_key, "received_at": received_at, "summary": summary})
+            accepted += 1
+
+        self.stats["accepted"] += accepted
+        self.stats["duplicates"] += duplicates
+        if len(self._pending) >= self.max_pending:
+            await self.flush()  # Backpressure: make the caller wait for the disk
+        elif len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return {"accepted": accepted, "duplicates": duplicates}
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                loop = asyncio.get_running_loop()
+                try:
+                    written = await loop.run_in_executor(None, self.store.write_batch, batch)
+                except Exception as e:
+                    # Put the batch back so the next flush retries it
+                    logger.error(f"Failed to write batch of {len(batch)} summaries: {e}")
+                    self.stats["errors"] += 1
+                    self._pending[:0] = batch
+                    return
+                self._pending_keys.difference_update(record["key"] for record in batch)
+                self.stats["written"] += written
+                self.stats["duplicates"] += len(batch) - written
+                self.stats["batches"] += 1
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,160 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict
+from typing import Optional
+import numpy as np
+from websockets.exceptions import ConnectionClosed, WebSocketException
+from websockets.sync.client import connect
+from core.data_models import SessionData
+from config.settings import LiveConfig
+from services.live_scoring import encode_batch, quantize_ear
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class LiveScoringClient:
+    """Streams a session's per-frame EARs to the server over one persistent WebSocket.
+
+    push() only appends to an in-memory queue; a background thread sends
+    batches and keeps every frame until the server acknowledges it, so a
+    dropped connection is resumed without losing or double-scoring frames.
+    """
+
+    def __init__(self, session: SessionData, fps: float, config: LiveConfig):
+        self.session = session
+        self.fps = fps
+        self.config = config
+        self.session_id = uuid.uuid4().hex
+        self.status: Optional[dict] = None  # latest state reported by the server
+        self.summary: Optional[dict] = None  # the server's final summary
+        self.stats = {"packets": 0, "bytes": 0, "reconnects": 0, "dropped_frames": 0}
+        self._frames = deque()  # (ms since start, quantized EAR), oldest unacknowledged first
+        self._base_seq = 0  # sequence number of _frames[0]
+        self._sent = 0  # frames at the front of _frames already sent on this connection
+        self._start = None
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="live-scoring", daemon=True)
+        self._thread.start()
+
+    def push(self, timestamp: float, ear: float, present: bool = True):
+        """Queue one analysed frame; never blocks on the network"""
+        with self._cond:
+            if self._start is None:
+                self._start = timestamp
+            if len(self._frames) >= self.config.QUEUE_FRAMES:
+                # Offline for too long: the oldest frames go, the server counts them as lost
+                self._frames.popleft()
+                self._base_seq += 1
+                self._sent = max(self._sent - 1, 0)
+                self.stats["dropped_frames"] += 1
+            self._frames.append((int((timestamp - self._start) * 1000), quantize_ear(ear, present)))
+            if len(self._frames) - self._sent >= self.config.BATCH_FRAMES:
+                self._cond.notify()
+
+    def _next_batch(self, flush: bool) -> Optional[bytes]:
+        """The next packet of unsent frames, once a full batch is queued or `flush` is set"""
+        with self._cond:
+            unsent = len(self._frames) - self._sent
+            if not unsent or (unsent < self.config.BATCH_FRAMES and not flush):
+                return None
+            count = min(unsent, self.config.BATCH_FRAMES)
+            frames = np.array([self._frames[self._sent + i] for i in range(count)], dtype=np.int64)
+            seq = self._base_seq + self._sent
+            self._sent += count
+        return encode_batch(seq, frames[:, 0], frames[:, 1])
+
+    def _acknowledge(self, ack: int):
+        with self._cond:
+            acked = min(max(ack - self._base_seq, 0), len(self._frames))
+            for _ in range(acked):
+                self._frames.popleft()
+            self._base_seq += acked
+            self._sent = max(self._sent - acked, 0)
+
+    def _handle(self, message) -> bool:
+        """Apply a server message; True once it carried the final summary"""
+        reply = json.loads(message)
+        if "summary" in reply:
+            self.summary = reply["summary"]
+            return True
+        if "ack" in reply:
+            self._acknowledge(reply["ack"])
+            self.status = reply
+        return False
+
+    def _session(self, ws):
+        """One connection: resume, stream batches, and end the session when asked to"""
+        ws.send(json.dumps({"session_id": self.session_id, "session": asdict(self.session), "fps": self.fps}))
+        self._handle(ws.recv(timeout=self.config.CLOSE_TIMEOUT))
+        with self._cond:
+            self._sent = 0  # Resend whatever the server has not acknowledged
+
+        last_sent = time.monotonic()
+        while True:
+            with self._cond:
+                stopping = self._stopping
+                if not stopping and len(self._frames) - self._sent < self.config.BATCH_FRAMES:
+                    self._cond.wait(max(self.config.BATCH_INTERVAL - (time.monotonic() - last_sent), 0.01))
+            flush = stopping or time.monotonic() - last_sent >= self.config.BATCH_INTERVAL
+            while True:
+                packet = self._next_batch(flush)
+                if packet is None:
+                    break
+                ws.send(packet)
+                last_sent = time.monotonic()
+                self.stats["packets"] += 1
+                self.stats["bytes"] += len(packet)
+            if flush and not stopping:
+                last_sent = time.monotonic()
+            # Drain acknowledgements without waiting for them
+            while True:
+                try:
+                    self._handle(ws.recv(timeout=0))
+                except TimeoutError:
+                    break
+            if stopping:
+                ws.send(json.dumps({"type": "end"}))
+                deadline = time.monotonic() + self.config.CLOSE_TIMEOUT
+                while not self._handle(ws.recv(timeout=max(deadline - time.monotonic(), 0))):
+                    pass
+                return
+
+    def _run(self):
+        failures = 0
+        while self.summary is None:
+            try:
+                with connect(self.config.SERVER_URL, open_timeout=self.config.CLOSE_TIMEOUT) as ws:
+                    failures = 0
+                    self._session(ws)
+                return
+            except (OSError, TimeoutError, ConnectionClosed, WebSocketException, ValueError) as e:
+                failures += 1
+                self.stats["reconnects"] += 1
+                with self._cond:
+                    if self._stopping:
+                        logger.warning(f"Live scoring could not finish the session: {e}")
+                        return
+                delay = min(2 ** (failures - 1), self.config.RECONNECT_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+                logger.warning(f"Live scoring connection lost ({e}); reconnecting in {delay:.1f}s")
+                with self._cond:
+                    self._cond.wait_for(lambda: self._stopping, timeout=delay)
+
+    @property
+    def pending(self) -> int:
+        """Frames not yet acknowledged by the server"""
+        return len(self._frames)
+
+    def close(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Send what is left, end the session and return the server's summary (None if unreachable)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(self.config.CLOSE_TIMEOUT * 2 if timeout is None else timeout)
+        logger.info(f"Live scoring closed: {self.stats}, {self.pending} frames unacknowledged")
+        return self.summary
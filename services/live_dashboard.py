@@ -0,0 +1,161 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from core.data_models import SessionData
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+EVENT_TYPES = ("transition", "progress", "end")
+EVENT_FIELDS = ("session_id", "name", "matric_id", "course", "group", "module", "type", "status",
+                "disengaged", "engaged_percentage", "ts")
+
+
+def status_event(session: SessionData, session_id: str, event_type: str, status: str, disengaged: bool,
+                 engaged_percentage: float, ts: Optional[float] = None) -> dict:
+    """A dashboard event for one session: a transition, a periodic progress update or its end"""
+    return {"session_id": session_id, "name": session.name, "matric_id": session.matric_id,
+            "course": session.course, "group": session.group, "module": session.module,
+            "type": event_type, "status": status, "disengaged": bool(disengaged),
+            "engaged_percentage": round(float(engaged_percentage), 2),
+            "ts": time.time() if ts is None else ts}
+
+
+def clean_event(event: dict) -> dict:
+    """Only the known fields of a published event; raises ValueError if it is unusable"""
+    if not isinstance(event, dict) or not event.get("session_id") or event.get("type") not in EVENT_TYPES:
+        raise ValueError("Each event needs a session_id and a type of " + ", ".join(EVENT_TYPES))
+    cleaned = {field: event.get(field) for field in EVENT_FIELDS}
+    cleaned["course"] = str(cleaned["course"] or "")
+    cleaned["group"] = str(cleaned["group"] or "")
+    cleaned["ts"] = float(cleaned["ts"] or time.time())
+    return cleaned
+
+
+class Subscriber:
+    """One dashboard viewer: the newest update per session, waiting to be sent.
+
+    Publishing only overwrites an entry and sets a flag, so a viewer that
+    reads slowly receives fewer, merged updates and never holds up the
+    publishers or the other viewers.
+    """
+
+    def __init__(self, course: Optional[str], group: Optional[str]):
+        self.key = (course, group)
+        self.pending: Dict[str, str] = {}  # session id -> its newest event, already JSON encoded
+        self.coalesced = 0
+        self._wakeup = asyncio.Event()
+
+    def offer(self, session_id: str, encoded: str):
+        if session_id in self.pending:
+            self.coalesced += 1
+        self.pending[session_id] = encoded
+        self._wakeup.set()
+
+    async def next(self) -> str:
+        """Wait for updates, then take everything that accumulated as one JSON array"""
+        await self._wakeup.wait()
+        self._wakeup.clear()
+        updates, self.pending = self.pending, {}
+        return "[" + ",".join(updates.values()) + "]"
+
+
+class Topic:
+    """One course/group: its recent events and each session's latest state"""
+
+    def __init__(self, buffer_size: int):
+        self.events = deque(maxlen=buffer_size)
+        self.sessions: Dict[str, dict] = {}
+
+
+class EventHub:
+    """In-memory pub/sub of live engagement events, partitioned by course and group.
+
+    Viewers subscribe to one group, a whole course (group None) or
+    everything (course None). Nothing here awaits, so publishing costs the
+    same however many viewers there are and however slowly they read.
+    """
+
+    def __init__(self, buffer_size: int = 500, stale_seconds: float = 300.0):
+        self.buffer_size = buffer_size
+        self.stale_seconds = stale_seconds
+        self.topics: Dict[Tuple[str, str], Topic] = {}
+        self.subscribers: Dict[Tuple[Optional[str], Optional[str]], Set[Subscriber]] = {}
+        self.stats = {"published": 0, "delivered": 0, "subscribed": 0, "unsubscribed": 0, "pruned": 0}
+        self._last_prune = time.monotonic()
+
+    def publish(self, event: dict):
+        """Record a cleaned event and hand it to every matching viewer"""
+        course, group = event["course"], event["group"]
+        topic = self.topics.get((course, group))
+        if topic is None:
+            topic = self.topics[(course, group)] = Topic(self.buffer_size)
+        topic.events.append(event)
+        topic.sessions[event["session_id"]] = event
+        self.stats["published"] += 1
+        encoded = None  # Encoded once, however many viewers receive it
+        for key in ((course, group), (course, None), (None, None)):
+            for subscriber in self.subscribers.get(key, ()):
+                if encoded is None:
+                    encoded = json.dumps(event, separators=(",", ":"))
+                subscriber.offer(event["session_id"], encoded)
+                self.stats["delivered"] += 1
+        if time.monotonic() - self._last_prune >= 1.0:
+            self.prune()
+
+    def publish_many(self, events: Iterable[dict]) -> int:
+        count = 0
+        for event in events:
+            self.publish(event)
+            count += 1
+        return count
+
+    def prune(self, now: Optional[float] = None):
+        """Forget sessions that ended or went quiet more than stale_seconds ago"""
+        now = time.time() if now is None else now
+        self._last_prune = time.monotonic()
+        for key, topic in list(self.topics.items()):
+            stale = [sid for sid, event in topic.sessions.items() if now - event["ts"] > self.stale_seconds]
+            for sid in stale:
+                del topic.sessions[sid]
+            self.stats["pruned"] += len(stale)
+            if not topic.sessions and (not topic.events or now - topic.events[-1]["ts"] > self.stale_seconds):
+                del self.topics[key]
+
+    def _matching(self, course: Optional[str], group: Optional[str]) -> List[Topic]:
+        if course is not None and group is not None:
+            topic = self.topics.get((course, group))
+            return [topic] if topic else []
+        return [topic for (c, g), topic in self.topics.items() if course is None or c == course]
+
+    def snapshot(self, course: Optional[str] = None, group: Optional[str] = None, recent: int = 50) -> dict:
+        """Current state of every matching session and the most recent events, newest last"""
+        topics = self._matching(course, group)
+        sessions = [event for topic in topics for event in topic.sessions.values()]
+        events = sorted((event for topic in topics for event in list(topic.events)[-recent:]),
+                        key=lambda e: e["ts"])[-recent:] if recent > 0 else []
+        return {"sessions": sessions, "recent": events}
+
+    def subscribe(self, course: Optional[str] = None, group: Optional[str] = None) -> Subscriber:
+        subscriber = Subscriber(course, group)
+        self.subscribers.setdefault(subscriber.key, set()).add(subscriber)
+        self.stats["subscribed"] += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        viewers = self.subscribers.get(subscriber.key)
+        if viewers is not None:
+            viewers.discard(subscriber)
+            if not viewers:
+                del self.subscribers[subscriber.key]
+        self.stats["unsubscribed"] += 1
+
+    @property
+    def viewers(self) -> int:
+        return sum(len(viewers) for viewers in self.subscribers.values())
+
+    @property
+    def buffered_events(self) -> int:
+        return sum(len(topic.events) for topic in self.topics.values())
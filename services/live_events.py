@@ -0,0 +1,77 @@
+import atexit
+import threading
+from collections import deque
+import requests
+from config.settings import DashboardConfig, UploadConfig
+from config.logging_config import RateLimiter, setup_logging
+
+logger = setup_logging()
+
+
+class EventPublisher:
+    """Sends status events to the live dashboard from a background thread.
+
+    Events are only worth showing while they are fresh, so unlike session
+    summaries they are not journaled or retried: when the server is slow or
+    unreachable the oldest queued events are dropped.
+    """
+
+    def __init__(self, config: DashboardConfig, server_url: str):
+        self.config = config
+        self.url = server_url.rstrip("/") + "/api/v1/engagement/live/events"
+        self.session = requests.Session()
+        self.stats = {"sent": 0, "dropped": 0, "failed_requests": 0}
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._warn = RateLimiter(30.0)
+        self._thread = threading.Thread(target=self._run, name="live-events", daemon=True)
+        self._thread.start()
+
+    def publish(self, event: dict):
+        """Queue an event; never blocks on the network"""
+        with self._cond:
+            if len(self._queue) >= self.config.PUBLISH_QUEUE:
+                self._queue.popleft()
+                self.stats["dropped"] += 1
+            self._queue.append(event)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.config.PUBLISH_BATCH))]
+            try:
+                response = self.session.post(self.url, json=batch, timeout=self.config.REQUEST_TIMEOUT)
+                response.raise_for_status()
+                self.stats["sent"] += len(batch)
+            except requests.exceptions.RequestException as e:
+                self.stats["failed_requests"] += 1
+                self.stats["dropped"] += len(batch)
+                if self._warn.ready():
+                    logger.warning(f"Could not publish {len(batch)} dashboard events: {e}")
+
+    def stop(self, timeout: float = 2.0):
+        """Send what is queued (within `timeout`) and stop"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+
+# Global instance
+event_publisher = None
+
+
+def get_event_publisher() -> EventPublisher:
+    """Get or create the dashboard event publisher"""
+    global event_publisher
+    if event_publisher is None:
+        event_publisher = EventPublisher(DashboardConfig(), UploadConfig().SERVER_URL)
+    return event_publisher
+
+
+atexit.register(lambda: event_publisher.stop() if event_publisher else None)
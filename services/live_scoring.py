@@ -0,0 +1,238 @@
+import asyncio
+import struct
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from core.data_models import SessionData
+from core.engagement_detector import EngagementDetector
+from config.settings import EngagementConfig
+from services.api_service import build_engagement_summary
+from services.live_dashboard import status_event
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+# Packet: header (version, reserved, sequence number of the first frame) + 6 bytes per frame
+PACKET_VERSION = 1
+PACKET_HEADER = struct.Struct("<BBI")
+FRAME_DTYPE = np.dtype([("t_ms", "<u4"), ("ear", "<u2")])  # ms since session start, raw EAR x EAR_SCALE
+EAR_SCALE = 10000  # 0 means no face in the frame
+
+
+def encode_batch(seq: int, times_ms: np.ndarray, ears: np.ndarray) -> bytes:
+    """Pack frames into one binary packet; `ears` are already scaled (0 = no face)"""
+    frames = np.empty(len(times_ms), dtype=FRAME_DTYPE)
+    frames["t_ms"] = times_ms
+    frames["ear"] = ears
+    return PACKET_HEADER.pack(PACKET_VERSION, 0, seq) + frames.tobytes()
+
+
+def decode_batch(packet: bytes) -> Tuple[int, np.ndarray]:
+    """(sequence number of the first frame, structured frame array) from a packet"""
+    if len(packet) < PACKET_HEADER.size or (len(packet) - PACKET_HEADER.size) % FRAME_DTYPE.itemsize:
+        raise ValueError(f"Malformed packet of {len(packet)} bytes")
+    version, _, seq = PACKET_HEADER.unpack_from(packet)
+    if version != PACKET_VERSION:
+        raise ValueError(f"Unsupported packet version {version}")
+    return seq, np.frombuffer(packet, dtype=FRAME_DTYPE, offset=PACKET_HEADER.size)
+
+
+def quantize_ear(ear: float, present: bool) -> int:
+    """A raw EAR as sent on the wire; a present face never encodes as 0"""
+    if not present:
+        return 0
+    return min(max(int(round(ear * EAR_SCALE)), 1), 65535)
+
+
+class LiveSession:
+    """Server-side scoring of one kiosk's stream, frame by frame as the kiosk scores it.
+
+    Frames carry sequence numbers, so a batch resent after a reconnect is
+    only scored once.
+    """
+
+    def __init__(self, session_id: str, session: SessionData, fps: float, config: EngagementConfig):
+        self.session_id = session_id
+        self.session = session
+        self.fps = fps
+        self.detector = EngagementDetector(config, fps)
+        self.next_seq = 0
+        self.start_time = None
+        self.status = "Calibrating"
+        self.disengaged = False
+        self.frames = 0
+        self.lost_frames = 0  # dropped by the kiosk's queue while it was offline
+        self.connections = 1
+        self.summary: Optional[dict] = None
+        self.transitions: List[Tuple[str, bool]] = []  # (status, disengaged) changes not yet published
+        self.last_progress = 0.0
+        self.updated_at = time.time()
+        self._expiry: Optional[asyncio.TimerHandle] = None
+
+    def feed(self, packet: bytes) -> dict:
+        """Score a packet of frames and return the session's state"""
+        seq, frames = decode_batch(packet)
+        if seq > self.next_seq:
+            self.lost_frames += seq - self.next_seq
+        elif seq < self.next_seq:
+            frames = frames[self.next_seq - seq:]  # Resent after a reconnect; score only what is new
+            seq = self.next_seq
+        if len(frames):
+            self._score(frames["ear"].tolist(), (frames["t_ms"] / 1000.0).tolist())
+            self.next_seq = seq + len(frames)
+            self.frames += len(frames)
+            self.updated_at = time.time()
+        return self.state()
+
+    def _score(self, ears: list, times: list):
+        detector_engine = self.detector
+        disengaged = self.disengaged
+        status = self.status
+        for ear, current_time in zip(ears, times):
+            ear = detector_engine.smooth_ear(ear / EAR_SCALE) if ear else 0
+            if not detector_engine.is_calibrated:
+                if detector_engine.calibrate(ear, current_time):
+                    self.start_time = current_time
+                    status = "Engaged"
+            else:
+                now_disengaged, status = detector_engine.detect_engagement(ear, current_time)
+                if now_disengaged != disengaged:
+                    self.transitions.append((status, now_disengaged))
+                    disengaged = now_disengaged
+                detector_engine.update_threshold_dynamically(current_time, self.start_time)
+        self.disengaged = disengaged
+        self.status = status
+
+    @property
+    def engaged_percentage(self) -> float:
+        scored = len(self.detector.engaged_status)
+        return self.detector.status_log.nonzero / scored * 100 if scored else 0.0
+
+    def state(self) -> dict:
+        """Acknowledgement and live status sent back after every packet"""
+        detector_engine = self.detector
+        return {
+            "ack": self.next_seq,
+            "calibrated": detector_engine.is_calibrated,
+            "calibration_progress": detector_engine.calibration_progress,
+            "status": self.status,
+            "disengaged": self.disengaged,
+            "ear_thresh": float(detector_engine.ear_thresh),
+            "engaged_percentage": self.engaged_percentage,
+        }
+
+    def finish(self) -> dict:
+        """The session's summary, in the same shape as a kiosk upload"""
+        if self.summary is None:
+            engaged_status = self.detector.engaged_status
+            self.summary = build_engagement_summary(self.session, engaged_status,
+                                                    len(engaged_status) / self.fps, self.fps)
+            self.summary.update({"scored_by": "server", "ear_thresh": float(self.detector.ear_thresh),
+                                 "received_frames": self.frames, "lost_frames": self.lost_frames})
+        return self.summary
+
+
+class LiveScoringService:
+    """Every streaming session on this node, scored on the event loop.
+
+    A session whose connection drops is kept for `resume_seconds` so the
+    kiosk can reconnect and carry on; after that, or when the kiosk ends the
+    session, its summary is handed to `on_finish` once. Status transitions,
+    periodic progress and the session's end go to `on_event` for the live
+    dashboard.
+    """
+
+    def __init__(self, config: EngagementConfig, resume_seconds: float,
+                 on_finish: Callable[[dict, str], Awaitable],
+                 on_event: Optional[Callable[[dict], None]] = None, progress_interval: float = 5.0):
+        self.config = config
+        self.resume_seconds = resume_seconds
+        self.on_finish = on_finish
+        self.on_event = on_event
+        self.progress_interval = progress_interval
+        self.sessions: Dict[str, LiveSession] = {}
+        self.stats = {"opened": 0, "resumed": 0, "finished": 0, "abandoned": 0, "packets": 0, "frames": 0,
+                      "bad_packets": 0}
+
+    def open(self, hello: dict) -> LiveSession:
+        """Start or resume the session described by a kiosk's first message"""
+        session_id = str(hello["session_id"])
+        live = self.sessions.get(session_id)
+        if live is not None:
+            if live._expiry is not None:
+                live._expiry.cancel()
+                live._expiry = None
+            live.connections += 1
+            self.stats["resumed"] += 1
+            return live
+        session = SessionData(**hello["session"])
+        fps = float(hello["fps"])
+        if not 0 < fps <= 240:
+            raise ValueError(f"Invalid fps {fps}")
+        live = self.sessions[session_id] = LiveSession(session_id, session, fps, self.config)
+        self.stats["opened"] += 1
+        return live
+
+    def feed(self, live: LiveSession, packet: bytes) -> dict:
+        before = live.frames
+        try:
+            state = live.feed(packet)
+        except ValueError:
+            self.stats["bad_packets"] += 1
+            raise
+        self.stats["packets"] += 1
+        self.stats["frames"] += live.frames - before
+        if self.on_event is not None:
+            self._publish(live)
+        return state
+
+    def _publish(self, live: LiveSession):
+        for status, disengaged in live.transitions:
+            self.on_event(status_event(live.session, live.session_id, "transition", status, disengaged,
+                                       live.engaged_percentage))
+        live.transitions.clear()
+        now = time.time()
+        if live.detector.is_calibrated and now - live.last_progress >= self.progress_interval:
+            live.last_progress = now
+            self.on_event(status_event(live.session, live.session_id, "progress", live.status, live.disengaged,
+                                       live.engaged_percentage))
+
+    def detach(self, live: LiveSession):
+        """The kiosk disconnected; finish the session unless it reconnects in time"""
+        live.connections -= 1
+        if live.connections > 0 or live.summary is not None or self.sessions.get(live.session_id) is not live:
+            return  # Already reconnected (the old socket closed late) or already finished
+        loop = asyncio.get_running_loop()
+        live._expiry = loop.call_later(self.resume_seconds,
+                                       lambda: asyncio.create_task(self._abandon(live)))
+
+    async def _abandon(self, live: LiveSession):
+        if live.connections > 0 or live.summary is not None:
+            return
+        self.stats["abandoned"] += 1
+        logger.info(f"Live session {live.session_id} did not reconnect; storing what was scored")
+        await self.finish(live)
+
+    async def finish(self, live: LiveSession) -> dict:
+        """Store the session's summary (once) and forget the session"""
+        if self.sessions.pop(live.session_id, None) is None:
+            return live.finish()
+        if live._expiry is not None:
+            live._expiry.cancel()
+        summary = live.finish()
+        self.stats["finished"] += 1
+        if self.on_event is not None:
+            self.on_event(status_event(live.session, live.session_id, "end", "Ended", live.disengaged,
+                                       live.engaged_percentage))
+        if len(live.detector.engaged_status):  # Like the kiosk: nothing to store before calibration
+            await self.on_finish(summary, live.session_id)
+        return summary
+
+    async def close(self):
+        """Server shutdown: store every open session as it stands"""
+        for live in list(self.sessions.values()):
+            await self.finish(live)
+
+    @property
+    def active(self) -> int:
+        return len(self.sessions)
@@ -0,0 +1,103 @@
+import json
+import sqlite3
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def _where(filters: Dict[str, Optional[str]], start_col: Optional[str] = None,
+           start: Optional[float] = None, end: Optional[float] = None) -> Tuple[str, list]:
+    clauses, params = [], []
+    for column, value in filters.items():
+        if value is not None:
+            clauses.append(f'"{column}" = ?')
+            params.append(value)
+    if start_col and start is not None:
+        clauses.append(f"{start_col} >= ?")
+        params.append(start)
+    if start_col and end is not None:
+        clauses.append(f"{start_col} < ?")
+        params.append(end)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _with_percentages(row: sqlite3.Row) -> dict:
+    item = dict(row)
+    percentage_sum = item.pop("engaged_percentage_sum")
+    engaged_frames = item.pop("engaged_frames")
+    item["avg_engaged_percentage"] = percentage_sum / item["sessions"] if item["sessions"] else 0.0
+    item["weighted_engaged_percentage"] = (engaged_frames / item["total_frames"] * 100
+                                           if item["total_frames"] else 0.0)
+    return item
+
+
+class ReportingStore:
+    """Read-only queries over the ingestion database: rollups and raw exports.
+
+    Each query opens its own read-only connection; in WAL mode readers never
+    block the ingestion writer.
+    """
+
+    def __init__(self, path: str, bucket_seconds: int = 3600):
+        self.path = path
+        self.bucket_seconds = bucket_seconds
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def rollups(self, course: Optional[str] = None, group: Optional[str] = None,
+                module: Optional[str] = None, start: Optional[float] = None,
+                end: Optional[float] = None, by_bucket: bool = False) -> List[dict]:
+        """Engagement per course/group/module over a time window, optionally per time bucket.
+
+        Reads only the pre-aggregated buckets, so cost depends on the window
+        length, not on how many sessions are stored.
+        """
+        if start is not None:
+            start = int(start // self.bucket_seconds) * self.bucket_seconds
+        where, params = _where({"course": course, "group": group, "module": module},
+                               "bucket_start", start, end)
+        keys = 'course, "group", module' + (", bucket_start" if by_bucket else "")
+        query = (f"SELECT {keys}, SUM(sessions) AS sessions, "
+                 "SUM(engaged_percentage_sum) AS engaged_percentage_sum, "
+                 "SUM(engaged_frames) AS engaged_frames, SUM(total_frames) AS total_frames, "
+                 "SUM(disengaged_seconds) AS disengaged_seconds "
+                 f"FROM rollup_window{where} GROUP BY {keys} ORDER BY {keys}")
+        with closing(self._connect()) as conn:
+            return [_with_percentages(row) for row in conn.execute(query, params)]
+
+    def students(self, course: Optional[str] = None, group: Optional[str] = None,
+                 module: Optional[str] = None, matric_id: Optional[str] = None,
+                 limit: int = 100, offset: int = 0) -> List[dict]:
+        """Per-student engagement rollups"""
+        where, params = _where({"course": course, "group": group, "module": module,
+                                "matric_id": matric_id})
+        query = (f"SELECT * FROM rollup_student{where} "
+                 'ORDER BY course, "group", module, matric_id LIMIT ? OFFSET ?')
+        with closing(self._connect()) as conn:
+            return [_with_percentages(row) for row in conn.execute(query, params + [limit, offset])]
+
+    def sessions_page(self, start: Optional[float] = None, end: Optional[float] = None,
+                      course: Optional[str] = None, group: Optional[str] = None,
+                      module: Optional[str] = None, after_id: int = 0, limit: int = 500) -> List[dict]:
+        """One keyset-paginated page of raw session rows"""
+        where, params = _where({"course": course, "group": group, "module": module},
+                               "received_at", start, end)
+        where = (where + " AND id > ?") if where else " WHERE id > ?"
+        query = (f"SELECT id, received_at, payload FROM engagement_sessions{where} "
+                 "ORDER BY id LIMIT ?")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params + [after_id, limit]).fetchall()
+        return [{"id": row["id"], "received_at": row["received_at"], **json.loads(row["payload"])}
+                for row in rows]
+
+    def iter_sessions(self, chunk_size: int = 1000, **filters) -> Iterator[dict]:
+        """Stream every matching session row, one short read transaction per chunk"""
+        after_id = 0
+        while True:
+            page = self.sessions_page(after_id=after_id, limit=chunk_size, **filters)
+            yield from page
+            if len(page) < chunk_size:
+                return
+            after_id = page[-1]["id"]
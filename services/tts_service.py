@@ -2,79 +2,249 @@ import pyttsx3
 import threading
 import queue
 import atexit
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import sys
 import time
+import wave
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+import numpy as np
+from config.settings import AlertConfig
+from core.metrics import get_metrics
 from config.logging_config import setup_logging
 
 logger = setup_logging()
 
-class TTSManager:
-    """Thread-safe TTS manager with improved reliability"""
-    
+
+@dataclass
+class AlertAudio:
+    """A rendered alert phrase: the cached file and its bytes"""
+    text: str
+    path: str
+    data: bytes
+
+
+class AudioPlayer:
+    """Non-blocking playback of rendered alerts; a new alert cuts off the previous one"""
+
+    name = "none"
+
+    def play(self, audio: AlertAudio) -> bool:
+        return False
+
+
+class WinsoundPlayer(AudioPlayer):
+    """Windows: asynchronous playback of the cached file (winsound cannot play memory asynchronously)"""
+
+    name = "winsound"
+
+    def __init__(self):
+        import winsound
+        self.winsound = winsound
+
+    def play(self, audio: AlertAudio) -> bool:
+        flags = self.winsound.SND_FILENAME | self.winsound.SND_ASYNC | self.winsound.SND_NODEFAULT
+        self.winsound.PlaySound(audio.path, flags)
+        return True
+
+
+class SimpleaudioPlayer(AudioPlayer):
+    """Plays straight from the in-memory buffer when the optional simpleaudio package is installed"""
+
+    name = "simpleaudio"
+
     def __init__(self):
+        import simpleaudio
+        self.simpleaudio = simpleaudio
+        self._current = None
+        self._decoded: Dict[str, tuple] = {}
+
+    def play(self, audio: AlertAudio) -> bool:
+        decoded = self._decoded.get(audio.path)
+        if decoded is None:
+            try:
+                with wave.open(io.BytesIO(audio.data), "rb") as w:
+                    decoded = (w.readframes(w.getnframes()), w.getnchannels(), w.getsampwidth(), w.getframerate())
+            except (wave.Error, EOFError):
+                return False  # Not PCM WAV (some platforms render AIFF); speak it live instead
+            self._decoded[audio.path] = decoded
+        if self._current is not None:
+            self._current.stop()
+        self._current = self.simpleaudio.play_buffer(*decoded)
+        return True
+
+
+class CommandPlayer(AudioPlayer):
+    """Hands the cached file to the platform's command-line player"""
+
+    def __init__(self, command: str):
+        self.name = os.path.basename(command)
+        self.command = command
+        self._current: Optional[subprocess.Popen] = None
+
+    def play(self, audio: AlertAudio) -> bool:
+        if self._current is not None and self._current.poll() is None:
+            self._current.terminate()
+        self._current = subprocess.Popen([self.command, audio.path],
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return True
+
+
+def create_player() -> AudioPlayer:
+    """Best non-blocking player available here; the null player means alerts are spoken live"""
+    if sys.platform == "win32":
+        return WinsoundPlayer()
+    try:
+        return SimpleaudioPlayer()
+    except ImportError:
+        pass
+    for command in ("afplay", "paplay", "aplay"):
+        path = shutil.which(command)
+        if path:
+            return CommandPlayer(path)
+    return AudioPlayer()
+
+
+class TTSManager:
+    """Spoken alerts: phrases are rendered to audio once, cached, and replayed without blocking.
+
+    Phrases that cannot be rendered or played back are spoken live with pyttsx3.
+    Each alert's latency, from detection to the start of playback, is recorded.
+    """
+
+    def __init__(self, config: Optional[AlertConfig] = None):
+        self.config = config or AlertConfig()
         self.engine = None
         self.tts_queue = queue.Queue(maxsize=10)  # Limit queue size
         self.worker_thread = None
         self.is_running = True
+        self.player = create_player()
+        self.audio: Dict[str, AlertAudio] = {}  # in-memory cache, filled from disk or by rendering
+        self.latencies = deque(maxlen=1000)  # ms from detection to playback start
+        self.metrics = get_metrics()
+        self._utterance_started = None
         self._initialize_engine()
         self._start_worker()
-    
+
     def _initialize_engine(self):
         """Initialize TTS engine with error handling"""
         try:
             self.engine = pyttsx3.init()
             # Set properties for better reliability
-            self.engine.setProperty('rate', 150)
-            self.engine.setProperty('volume', 0.9)
-            
+            self.engine.setProperty('rate', self.config.RATE)
+            self.engine.setProperty('volume', self.config.VOLUME)
+
             # Get available voices (optional - helps with some systems)
             voices = self.engine.getProperty('voices')
             if voices:
                 self.engine.setProperty('voice', voices[0].id)
-                
+            # Marks when live speech actually starts, for latency reporting
+            self.engine.connect('started-utterance', self._on_utterance_started)
+
             logger.info("TTS engine initialized successfully")
         except Exception as e:
             logger.warning(f"TTS initialization failed: {e}")
             self.engine = None
-    
+
     def _start_worker(self):
         """Start background worker for TTS"""
-        if self.engine:
+        # Cached audio can still be played when the engine is unavailable
+        if self.engine or self.player.name != "none":
             self.worker_thread = threading.Thread(target=self._tts_worker, daemon=True)
             self.worker_thread.start()
-            logger.info("TTS worker thread started")
-    
+            logger.info(f"TTS worker thread started (player: {self.player.name})")
+
+    def _cache_path(self, text: str) -> str:
+        voice = self.engine.getProperty('voice') if self.engine else ""
+        key = f"{text}|{voice}|{self.config.RATE}|{self.config.VOLUME}"
+        return os.path.join(self.config.CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + ".wav")
+
+    def _load_or_render(self, text: str) -> Optional[AlertAudio]:
+        """Audio for a phrase from memory, then disk, then by rendering it once"""
+        audio = self.audio.get(text)
+        if audio is not None:
+            return audio
+        path = self._cache_path(text)
+        if not os.path.exists(path) and self.engine:
+            os.makedirs(self.config.CACHE_DIR, exist_ok=True)
+            tmp_path = path + ".tmp.wav"
+            try:
+                started = time.perf_counter()
+                self.engine.save_to_file(text, tmp_path)
+                self.engine.runAndWait()
+                if os.path.getsize(tmp_path) > 44:  # more than a bare WAV header
+                    os.replace(tmp_path, path)
+                    logger.info(f"Rendered alert '{text}' in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                logger.warning(f"Could not render alert '{text}': {e}")
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)  # failed or empty render
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            audio = self.audio[text] = AlertAudio(text, path, f.read())
+        return audio
+
+    def prepare(self, phrases: Iterable[str]):
+        """Render (or load) phrases ahead of their first use; runs on the worker thread"""
+        for text in phrases:
+            if self._load_or_render(text) is None:
+                logger.warning(f"Alert '{text}' will be spoken live")
+
+    def _on_utterance_started(self, name=None):
+        self._utterance_started = time.perf_counter()
+
+    def _record_latency(self, detected_at: float, started: float, how: str):
+        latency_ms = (started - detected_at) * 1000
+        self.latencies.append(latency_ms)
+        self.metrics.observe_ms("alert_latency", latency_ms)
+        logger.info("Alert played (%s) %.0f ms after detection", how, latency_ms)
+
+    def _say(self, message: str, detected_at: float):
+        """Play the cached audio if possible, else speak live (blocking only this worker)"""
+        if self.player.name != "none":
+            audio = self._load_or_render(message)
+            if audio is not None and self.player.play(audio):
+                self._record_latency(detected_at, time.perf_counter(), "cached")
+                return
+        if not self.engine:
+            return
+        try:
+            self._utterance_started = None
+            self.engine.say(message)
+            self.engine.runAndWait()
+            self._record_latency(detected_at, self._utterance_started or time.perf_counter(), "live")
+        except Exception as speak_error:
+            logger.error(f"TTS speaking error: {speak_error}")
+            # Try to reinitialize engine if speaking fails
+            self._reinitialize_engine()
+
     def _tts_worker(self):
-        """Background worker for TTS processing with improved error handling"""
+        """Background worker: renders the alert phrases, then plays queued alerts"""
+        # pyttsx3 engines are not thread-safe; all rendering and live speech happen here
+        self.prepare(self.config.PHRASES)
         while self.is_running:
             try:
                 # Use timeout to allow thread to check is_running periodically
-                message = self.tts_queue.get(timeout=1)
-                if message is None:  # Shutdown signal
+                item = self.tts_queue.get(timeout=1)
+                if item is None:  # Shutdown signal
                     break
-                    
-                if self.engine:
-                    try:
-                        # Clear any pending speech before speaking new message
-                        self.engine.stop()
-                        
-                        # Speak the message
-                        self.engine.say(message)
-                        self.engine.runAndWait()
-                        
-                        logger.info(f"TTS spoke: {message}")
-                        
-                    except Exception as speak_error:
-                        logger.error(f"TTS speaking error: {speak_error}")
-                        # Try to reinitialize engine if speaking fails
-                        self._reinitialize_engine()
-                        
+                message, detected_at = item
+                self._say(message, detected_at)
+
             except queue.Empty:
                 continue  # Normal timeout, continue loop
             except Exception as e:
                 logger.error(f"TTS worker error: {e}")
                 # Small delay before continuing to prevent rapid error loops
                 time.sleep(0.1)
-    
+
     def _reinitialize_engine(self):
         """Reinitialize TTS engine if it becomes unresponsive"""
         try:
@@ -83,24 +253,25 @@ class TTSManager:
                     self.engine.stop()
                 except:
                     pass
-                
+
             # Create new engine instance
             self.engine = pyttsx3.init()
-            self.engine.setProperty('rate', 150)
-            self.engine.setProperty('volume', 0.9)
-            
+            self.engine.setProperty('rate', self.config.RATE)
+            self.engine.setProperty('volume', self.config.VOLUME)
+            self.engine.connect('started-utterance', self._on_utterance_started)
+
             logger.info("TTS engine reinitialized")
-            
+
         except Exception as e:
             logger.error(f"TTS reinitialization failed: {e}")
             self.engine = None
-    
-    def speak(self, message: str):
-        """Add message to TTS queue with improved error handling"""
-        if not self.engine:
+
+    def speak(self, message: str, detected_at: Optional[float] = None):
+        """Queue an alert; `detected_at` (time.perf_counter()) is when disengagement was detected"""
+        if self.worker_thread is None:
             logger.warning("TTS engine not available")
             return
-            
+
         try:
             # Clear queue if it's getting full to prevent old messages from piling up
             if self.tts_queue.qsize() > 5:
@@ -110,16 +281,24 @@ class TTSManager:
                         self.tts_queue.get_nowait()
                     except queue.Empty:
                         break
-            
+
             # Add new message
-            self.tts_queue.put_nowait(message)
-            logger.info(f"TTS message queued: {message}")
-            
+            self.tts_queue.put_nowait((message, detected_at if detected_at is not None else time.perf_counter()))
+            logger.info("TTS message queued: %s", message)
+
         except queue.Full:
             logger.warning("TTS queue full, skipping message")
         except Exception as e:
             logger.error(f"Error queuing TTS message: {e}")
-    
+
+    def latency_stats(self) -> dict:
+        """Alert latency (detection to playback start) over the recent alerts"""
+        if not self.latencies:
+            return {"alerts": 0, "player": self.player.name}
+        values = np.array(self.latencies)
+        return {"alerts": len(values), "player": self.player.name, "mean_ms": float(values.mean()),
+                "p95_ms": float(np.percentile(values, 95)), "max_ms": float(values.max())}
+
     def stop(self):
         """Stop the TTS manager"""
         self.is_running = False
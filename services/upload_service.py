@@ -0,0 +1,185 @@
+import atexit
+import json
+import os
+import random
+import threading
+import uuid
+from typing import Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import UploadConfig
+from config.logging_config import setup_logging
+
+logger = setup_logging()
+
+
+class Outbox:
+    """Append-only journal of summaries waiting to be uploaded.
+
+    Each line is either {"key", "summary"} for a queued upload or {"ack": key}
+    once the server has accepted it. Replaying the journal on start-up
+    recovers everything not yet acknowledged, so uploads survive restarts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final write from a crash
+                if "ack" in entry:
+                    self._pending.pop(entry["ack"], None)
+                else:
+                    self._pending[entry["key"]] = entry["summary"]
+        if self._pending:
+            logger.info(f"Outbox recovered {len(self._pending)} pending uploads")
+        self._compact()
+
+    def _append(self, entries: List[dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self):
+        """Rewrite the journal with only the pending entries"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, summary in self._pending.items():
+                f.write(json.dumps({"key": key, "summary": summary}, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def add(self, summary: dict) -> str:
+        key = summary.get("idempotency_key") or uuid.uuid4().hex
+        with self._lock:
+            self._append([{"key": key, "summary": summary}])
+            self._pending[key] = summary
+        return key
+
+    def peek(self, limit: int) -> List[tuple]:
+        with self._lock:
+            return list(self._pending.items())[:limit]
+
+    def ack(self, keys: List[str]):
+        with self._lock:
+            self._append([{"ack": key} for key in keys])
+            for key in keys:
+                self._pending.pop(key, None)
+            if not self._pending:
+                self._compact()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class UploadClient:
+    """Background sender that drains the outbox over a pooled HTTP session"""
+
+    def __init__(self, config: Optional[UploadConfig] = None):
+        self.config = config or UploadConfig()
+        self.outbox = Outbox(self.config.OUTBOX_PATH)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.config.POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.failures = 0
+        self.sent = 0
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self.worker_thread = threading.Thread(target=self._worker, name="upload-sender", daemon=True)
+        self.worker_thread.start()
+
+    def submit(self, summary: dict) -> str:
+        """Journal a summary and return immediately; the sender uploads it later"""
+        key = self.outbox.add(summary)
+        self._wakeup.set()
+        return key
+
+    def _backoff(self) -> float:
+        delay = min(self.config.BACKOFF_BASE * (2 ** (self.failures - 1)), self.config.BACKOFF_MAX)
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _is_rejected(error: requests.exceptions.RequestException) -> bool:
+        """Client errors other than timeouts and rate limits are not worth retrying"""
+        response = getattr(error, "response", None)
+        if response is None:
+            return False
+        return 400 <= response.status_code < 500 and response.status_code not in (408, 429)
+
+    def _send(self, batch: List[tuple]):
+        base = self.config.SERVER_URL.rstrip("/")
+        if len(batch) == 1:
+            key, summary = batch[0]
+            response = self.session.post(f"{base}/api/v1/engagement/upload", json=summary,
+                                         headers={"Idempotency-Key": key},
+                                         timeout=self.config.REQUEST_TIMEOUT)
+        else:
+            payload = [dict(summary, idempotency_key=key) for key, summary in batch]
+            response = self.session.post(f"{base}/api/v1/engagement/bulk", json=payload,
+                                         timeout=self.config.REQUEST_TIMEOUT)
+        response.raise_for_status()
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            batch = self.outbox.peek(self.config.BATCH_SIZE)
+            if not batch:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            try:
+                self._send(batch)
+            except requests.exceptions.RequestException as e:
+                if self._is_rejected(e):
+                    # The server will never accept this payload; drop it instead of blocking the outbox
+                    logger.error(f"Server rejected {len(batch)} summaries ({e}); discarding")
+                    self.outbox.ack([key for key, _ in batch])
+                    continue
+                self.failures += 1
+                delay = self._backoff()
+                logger.warning(f"Upload of {len(batch)} summaries failed ({e}); retrying in {delay:.1f}s")
+                self._stopping.wait(delay)
+                continue
+
+            self.outbox.ack([key for key, _ in batch])
+            self.sent += len(batch)
+            if self.failures:
+                logger.info(f"Server reachable again after {self.failures} failed attempts")
+            self.failures = 0
+            logger.info(f"Uploaded {len(batch)} summaries, {len(self.outbox)} pending")
+
+    @property
+    def pending(self) -> int:
+        return len(self.outbox)
+
+    def stop(self, timeout: float = 2.0):
+        self._stopping.set()
+        self._wakeup.set()
+        self.worker_thread.join(timeout=timeout)
+        self.session.close()
+
+# Global instance
+upload_client = None
+
+def get_upload_client() -> UploadClient:
+    """Get or create the upload client instance"""
+    global upload_client
+    if upload_client is None:
+        upload_client = UploadClient()
+    return upload_client
+
+# Register cleanup function
+atexit.register(lambda: upload_client.stop() if upload_client else None)
@@ -0,0 +1,58 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from config.settings import EngagementConfig
+from core.batch_engine import score_trace
+from core.engagement_detector import EngagementDetector
+
+FPS = 30.0
+
+
+def synthetic_trace(seed: int, seconds: float = 90.0):
+    """Open eyes with blinks, closures and looking away, on slightly uneven frame times"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * FPS)
+    times = np.cumsum(rng.uniform(0.8, 1.2, n) / FPS)
+    raw = rng.normal(0.3, 0.02, n)
+    present = np.ones(n, dtype=bool)
+    for _ in range(40):
+        start = rng.integers(int(10 * FPS), n)
+        kind = rng.integers(3)
+        length = (rng.integers(2, 8), rng.integers(30, 90), rng.integers(10, 80))[kind]
+        if kind == 2:
+            present[start:start + length] = False
+        else:
+            raw[start:start + length] = rng.normal(0.12, 0.02)
+    return raw, present, times
+
+
+def stream(raw, present, times, config):
+    """The per-frame loop of the live session and core.landmark_recording.replay"""
+    detector_engine = EngagementDetector(config, FPS)
+    start_time = None
+    for ear, face, current_time in zip(raw.tolist(), present.tolist(), times.tolist()):
+        ear = detector_engine.smooth_ear(ear) if face else 0
+        if not detector_engine.is_calibrated:
+            if detector_engine.calibrate(ear, current_time):
+                start_time = current_time
+        else:
+            detector_engine.detect_engagement(ear, current_time)
+            detector_engine.update_threshold_dynamically(current_time, start_time)
+    return detector_engine
+
+
+@pytest.mark.parametrize("window", [1, 2, 5])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_matches_streaming_detector(seed, window):
+    raw, present, times = synthetic_trace(seed)
+    config = replace(EngagementConfig(), EAR_SMOOTHING_WINDOW=window)
+
+    streamed = stream(raw, present, times, config)
+    batch = score_trace(raw, present, times, FPS, config)
+
+    assert batch.calibrated == streamed.is_calibrated
+    assert batch.ear_thresh == pytest.approx(float(streamed.ear_thresh))
+    assert batch.total_disengaged == streamed.total_disengaged
+    np.testing.assert_array_equal(batch.engaged_status, streamed.engaged_status)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from core.buffers import FrameLog, RingBuffer
+
+
+def test_ring_buffer_keeps_the_newest_values_and_their_mean():
+    buffer = RingBuffer(3)
+    assert len(buffer) == 0 and buffer.mean() == 0.0
+
+    for value in (1.0, 2.0, 3.0, 4.0, 5.0):
+        buffer.append(value)
+
+    assert len(buffer) == 3
+    assert buffer.mean() == pytest.approx(4.0)
+    assert buffer.last() == 5.0 and buffer.last(2) == 3.0
+    np.testing.assert_array_equal(buffer.recent(3), [3.0, 4.0, 5.0])
+    np.testing.assert_array_equal(buffer.recent(10), [3.0, 4.0, 5.0])
+    with pytest.raises(IndexError):
+        buffer.last(3)
+
+
+def test_ring_buffer_running_mean_matches_a_fresh_sum():
+    rng = np.random.default_rng(0)
+    values = rng.normal(0.3, 0.05, 10000)
+    buffer = RingBuffer(7)
+    for i, value in enumerate(values):
+        buffer.append(value)
+        assert buffer.mean() == pytest.approx(values[max(0, i - 6):i + 1].mean(), abs=1e-12)
+
+
+def test_ring_buffer_clear():
+    buffer = RingBuffer(4)
+    for value in (1.0, 2.0):
+        buffer.append(value)
+    buffer.clear()
+    buffer.append(9.0)
+    assert len(buffer) == 1 and buffer.mean() == 9.0
+    np.testing.assert_array_equal(buffer.recent(4), [9.0])
+
+
+def test_frame_log_counts_nonzero_and_grows_past_capacity():
+    log = FrameLog(2)
+    for value in (1, 0, 1, 1, 0):
+        log.append(value)
+
+    assert len(log) == 5
+    assert log.nonzero == 3
+    np.testing.assert_array_equal(log.values, [1, 0, 1, 1, 0])
+
+    log.clear()
+    assert len(log) == 0 and log.nonzero == 0
+    log.append(1)
+    np.testing.assert_array_equal(log.values, [1])
+
+
+def test_frame_log_extend_matches_repeated_append():
+    bulk, single = FrameLog(4), FrameLog(4)
+    for value, n in ((1, 3), (0, 0), (0, 6), (1, 11), (1, -2)):
+        bulk.extend(value, n)
+        for _ in range(max(0, n)):
+            single.append(value)
+
+    assert len(bulk) == len(single) == 20
+    assert bulk.nonzero == single.nonzero == 14
+    np.testing.assert_array_equal(bulk.values, single.values)
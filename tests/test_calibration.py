@@ -0,0 +1,72 @@
+import json
+import time
+from dataclasses import replace
+
+from config.settings import EngagementConfig
+from core.calibration_cache import CalibrationCache
+from core.data_models import CalibrationProfile
+from core.engagement_detector import EngagementDetector
+
+FPS = 30.0
+
+
+def profile(matric_id: str = "a123456", camera_index: int = 0, updated_at: float = None) -> CalibrationProfile:
+    return CalibrationProfile(matric_id, camera_index, 0.25, 0.3, 1, time.time() if updated_at is None else updated_at)
+
+
+def test_cache_round_trip_keys_by_student_and_camera(tmp_path):
+    cache = CalibrationCache(str(tmp_path / "profiles.json"), ttl_days=30)
+    cache.save(profile())
+    cache.save(profile(camera_index=1))
+
+    assert cache.load(" A123456 ", 0) == profile(updated_at=cache.load("A123456", 0).updated_at)
+    assert cache.load("A123456", 1).camera_index == 1
+    assert cache.load("A123456", 2) is None
+    assert cache.load("B000001", 0) is None
+    assert not (tmp_path / "profiles.json.tmp").exists()
+
+
+def test_cache_ignores_expired_and_unreadable_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    cache = CalibrationCache(str(path), ttl_days=1)
+    cache.save(profile(updated_at=time.time() - 2 * 86400))
+    assert cache.load("A123456", 0) is None
+
+    path.write_text("{not json")
+    assert cache.load("A123456", 0) is None
+    cache.save(profile())
+    assert list(json.loads(path.read_text())) == ["A123456:0"]
+
+
+def feed(detector: EngagementDetector, ear: float, seconds: float):
+    """Frames of a steady EAR, as the session loop scores them, until the profile is judged"""
+    for i in range(1, int(seconds * FPS) + 1):
+        detector.detect_engagement(detector.smooth_ear(ear), i / FPS)
+        if detector.validation != "pending":
+            return
+
+
+def test_drifted_profile_recalibrates_from_a_clean_state():
+    config = replace(EngagementConfig(), VALIDATION_DURATION=1.0, VALIDATION_TOLERANCE=0.15)
+    detector = EngagementDetector(config, FPS)
+    detector.apply_profile(ear_thresh=0.3, baseline_ear=0.4)  # saved with much wider eyes
+
+    feed(detector, 0.25, 2.0)
+
+    assert detector.validation == "drifted"
+    assert not detector.is_calibrated
+    assert len(detector.engaged_status) == 0
+    assert len(detector.ear_buffer) == 0  # no EARs smoothed under the rejected profile
+    assert detector.ear_thresh == config.INITIAL_EAR_THRESH
+
+
+def test_matching_profile_is_confirmed():
+    config = replace(EngagementConfig(), VALIDATION_DURATION=1.0)
+    detector = EngagementDetector(config, FPS)
+    detector.apply_profile(ear_thresh=0.25, baseline_ear=0.3)
+
+    feed(detector, 0.3, 2.0)
+
+    assert detector.validation == "confirmed"
+    assert detector.is_calibrated
+    assert detector.engaged_status.all()
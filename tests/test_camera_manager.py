@@ -0,0 +1,50 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from core.camera_manager import CameraManager
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in delivering blank frames"""
+
+    def __init__(self):
+        self.opened = True
+
+    def read(self, buffer=None):
+        return True, buffer if buffer is not None else np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def isOpened(self):
+        return self.opened
+
+    def release(self):
+        self.opened = False
+
+
+@pytest.fixture
+def cameras(tmp_path, monkeypatch):
+    monkeypatch.setattr(CameraManager, "config", replace(CameraManager.config,
+                                                         CACHE_PATH=str(tmp_path / "camera_cache.json")))
+    monkeypatch.setattr(CameraManager, "_streams", {})
+    monkeypatch.setattr(CameraManager, "_users", {})
+    monkeypatch.setattr(CameraManager, "_open", classmethod(lambda cls, index: FakeCapture()))
+    yield CameraManager
+    for stream in CameraManager._streams.values():
+        stream.close()
+
+
+def test_stream_keeps_capturing_until_its_last_session_releases_it(cameras):
+    first = cameras.acquire(0)
+    second = cameras.acquire(0)
+    assert first is second
+    assert first.wait_ready(2)
+
+    cameras.release(0)  # one session ends; the other is still reading
+    assert first.wait_ready(2)
+
+    cameras.release(0)
+    assert not first._active.is_set()
+    assert first.is_open  # paused, not closed, for the next session
+    assert cameras.acquire(0) is first
+    assert first.wait_ready(2)
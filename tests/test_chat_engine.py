@@ -0,0 +1,122 @@
+from dataclasses import replace
+
+import pytest
+
+from config.settings import ChatConfig
+from services.chat_engine import ChatEngine, Conversation, ResponseCache, estimate_tokens, normalise
+
+
+class StubClient:
+    """Stands in for ollama.Client: streams a canned reply in chunks and records each request"""
+
+    def __init__(self, chunks=("Take ", "", "short ", "breaks.")):
+        self.chunks = chunks
+        self.requests = []
+
+    def chat(self, model, messages, stream):
+        assert stream
+        self.requests.append(messages)
+        for text in self.chunks:
+            yield {"message": {"content": text}}
+
+
+class FailingClient:
+    def chat(self, model, messages, stream):
+        raise ConnectionError("connection refused")
+        yield
+
+
+@pytest.fixture
+def config():
+    return replace(ChatConfig(), SYSTEM_PROMPT="You help students.", HISTORY_TOKEN_BUDGET=200,
+                   SUMMARY_TOKEN_BUDGET=40, CACHE_SIZE=2)
+
+
+def test_window_keeps_newest_turns_within_budget(config):
+    conversation = Conversation.from_config(config)
+    for i in range(20):
+        conversation.add("user", f"Question {i}: " + "word " * 10)
+        conversation.add("assistant", f"Answer {i}: " + "word " * 20)
+
+    messages = conversation.window("What next?")
+
+    assert sum(estimate_tokens(m["content"]) for m in messages) <= config.HISTORY_TOKEN_BUDGET
+    assert messages[0] == {"role": "system", "content": "You help students."}
+    assert messages[-1] == {"role": "user", "content": "What next?"}
+    assert messages[-2] == conversation.turns[-1]
+    assert len(messages) - 3 < len(conversation.turns)  # older turns did not fit
+
+
+def test_window_condenses_dropped_questions_into_a_note(config):
+    conversation = Conversation.from_config(config)
+    for i in range(20):
+        conversation.add("user", f"Question {i}: " + "word " * 10)
+        conversation.add("assistant", f"Answer {i}: " + "word " * 20)
+
+    note = conversation.window("What next?")[1]
+
+    assert note["role"] == "system"
+    assert note["content"].startswith("Earlier in this conversation the student asked about: ")
+    assert estimate_tokens(note["content"]) <= config.SUMMARY_TOKEN_BUDGET
+    assert "Answer" not in note["content"]
+
+
+def test_short_history_is_sent_verbatim_without_a_note(config):
+    conversation = Conversation.from_config(config)
+    conversation.add("user", "Hi")
+    conversation.add("assistant", "Hello!")
+
+    messages = conversation.window("Any tips?")
+
+    assert [m["content"] for m in messages] == ["You help students.", "Hi", "Hello!", "Any tips?"]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_size=2)
+    cache.put(("a",), "A")
+    cache.put(("b",), "B")
+    assert cache.get(("a",)) == "A"  # "b" is now the least recently used
+    cache.put(("c",), "C")
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == "A"
+    assert cache.get(("c",)) == "C"
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_reply_streams_chunks_and_records_the_turn(config):
+    client = StubClient()
+    engine = ChatEngine(config, client=client)
+    conversation = Conversation.from_config(config)
+
+    chunks = list(engine.reply(conversation, "Engagement tips?"))
+
+    assert chunks == ["Take ", "short ", "breaks."]
+    assert conversation.turns == [{"role": "user", "content": "Engagement tips?"},
+                                  {"role": "assistant", "content": "Take short breaks."}]
+    assert client.requests[0][-1] == {"role": "user", "content": "Engagement tips?"}
+
+
+def test_repeated_question_is_answered_from_the_cache(config):
+    client = StubClient()
+    engine = ChatEngine(config, client=client)
+
+    list(engine.reply(Conversation.from_config(config), "Engagement tips?"))
+    chunks = list(engine.reply(Conversation.from_config(config), "engagement   TIPS"))
+
+    assert normalise("engagement   TIPS") == normalise("Engagement tips?")
+    assert chunks == ["Take short breaks."]
+    assert len(client.requests) == 1
+    assert engine.cache.hits == 1
+
+
+def test_failed_request_is_neither_recorded_nor_cached(config):
+    engine = ChatEngine(config, client=FailingClient())
+    conversation = Conversation.from_config(config)
+
+    chunks = list(engine.reply(conversation, "Engagement tips?"))
+
+    assert len(chunks) == 1 and chunks[0].startswith("Error:")
+    assert conversation.turns == []
+    assert len(engine.cache) == 0
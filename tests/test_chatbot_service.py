@@ -0,0 +1,58 @@
+import subprocess
+import sys
+import threading
+from dataclasses import replace
+
+import pytest
+
+from config.settings import ChatConfig
+from services import chatbot_service
+from services.chatbot_service import ChatbotManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    script = tmp_path / "chatbot.py"
+    script.write_text("")
+    config = replace(ChatConfig(), SIDECAR_LOG=str(tmp_path / "chatbot.log"), HEALTH_RECHECK_SECONDS=0.0,
+                     RESTART_BACKOFF_BASE=0.05)
+    manager = ChatbotManager(config, str(script))
+    yield manager
+    manager.stop()
+
+
+def test_external_sidecar_that_stops_answering_is_forgotten(manager, monkeypatch):
+    monkeypatch.setattr(manager, "is_ready", lambda: True)
+    manager.start()
+    assert manager.ready and manager.process is None
+
+    monkeypatch.setattr(manager, "is_ready", lambda: False)
+    assert not manager.ready
+    assert not manager.ready  # no longer treated as served elsewhere
+
+
+def test_spawn_failure_is_logged_not_raised(manager, monkeypatch):
+    def no_python(*args, **kwargs):
+        raise OSError("No such file or directory")
+    monkeypatch.setattr(manager, "is_ready", lambda: False)
+    monkeypatch.setattr(chatbot_service.subprocess, "Popen", no_python)
+
+    manager.start()
+
+    assert manager.process is None
+    assert manager.wait_ready(timeout=5) is False
+
+
+def test_wait_ready_gives_up_when_the_sidecar_crashes(manager, monkeypatch):
+    crashing = subprocess.Popen([sys.executable, "-c", "import sys; sys.exit(1)"])
+    monkeypatch.setattr(manager, "is_ready", lambda: False)
+    monkeypatch.setattr(manager, "_spawn", lambda: setattr(manager, "process", crashing))
+
+    manager.start()
+    timer = threading.Timer(5, manager.stop)  # only reached if wait_ready ignores the crash
+    timer.start()
+    try:
+        assert manager.wait_ready(timeout=30) is False
+        assert timer.is_alive()
+    finally:
+        timer.cancel()
@@ -0,0 +1,73 @@
+import pytest
+
+import core.governor as governor_module
+from core.governor import FrameGovernor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(governor_module, "time", fake)
+    return fake
+
+
+def run(governor, clock, frames, busy, interval=0.1):
+    """Analyse `frames` frames spaced `interval` apart, each busy for `busy` seconds"""
+    for _ in range(frames):
+        started = clock.now
+        clock.now += busy
+        governor.record(started)
+        clock.now = started + interval
+
+
+def test_admit_skips_between_analysed_frames():
+    governor = FrameGovernor(max_skip=3)
+    governor.skip = 2
+    admitted = [governor.admit() for _ in range(9)]
+    assert admitted == [True, False, False] * 3
+    assert governor.skipped_frames == 6
+
+
+def test_overload_raises_skip_before_reducing_width(clock):
+    governor = FrameGovernor(budget=0.5, max_width=400, min_width=200, max_skip=2,
+                             adjust_every=5, smoothing=1.0)
+
+    run(governor, clock, 10, busy=0.09)
+    assert (governor.skip, governor.width) == (2, 400)
+
+    run(governor, clock, 5, busy=0.09)
+    assert (governor.skip, governor.width) == (2, 320)
+
+    run(governor, clock, 20, busy=0.09)
+    assert governor.width == 200
+
+
+def test_idle_restores_width_before_skip(clock):
+    governor = FrameGovernor(budget=0.5, max_width=400, min_width=200, max_skip=2,
+                             adjust_every=5, smoothing=1.0)
+    governor.skip, governor.width = 2, 256
+
+    run(governor, clock, 5, busy=0.01)
+    assert (governor.skip, governor.width) == (2, 320)
+
+    run(governor, clock, 10, busy=0.01)
+    assert (governor.skip, governor.width) == (1, 400)
+
+    run(governor, clock, 5, busy=0.01)
+    assert (governor.skip, governor.width) == (0, 400)
+
+
+def test_load_between_watermarks_holds_settings(clock):
+    governor = FrameGovernor(budget=0.5, low_watermark=0.6, adjust_every=5, smoothing=1.0)
+    governor.skip = 1
+    run(governor, clock, 20, busy=0.04)
+    assert (governor.skip, governor.width) == (1, governor.max_width)
+    assert governor.adjustments == 0
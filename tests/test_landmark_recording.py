@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from core.data_models import SessionData
+from core.engagement_detector import ears_from_landmarks
+from core.landmark_recording import LandmarkRecorder, LandmarkRecording, replay, score_recording
+
+FPS = 30.0
+
+
+def face(ear: float) -> np.ndarray:
+    """68 landmarks whose eyes both have the given aspect ratio"""
+    points = np.zeros((68, 2), dtype=np.int16)
+    width, half_height = 60, int(round(ear * 30))
+    for start, left in ((36, 100), (42, 200)):
+        points[start:start + 6] = [(left, 100), (left + 20, 100 - half_height), (left + 40, 100 - half_height),
+                                   (left + width, 100), (left + 40, 100 + half_height),
+                                   (left + 20, 100 + half_height)]
+    return points
+
+
+def record(path, frames: int, chunk_frames: int = 64):
+    """Open eyes throughout, with no face on every tenth frame"""
+    with LandmarkRecorder(str(path), FPS, chunk_frames=chunk_frames, camera="test") as recorder:
+        for i in range(frames):
+            if i % 10 == 9:
+                recorder.append(i / FPS)
+            else:
+                recorder.append(i / FPS, (90, 80, 180, 60), face(0.3))
+
+
+def test_round_trip_across_chunks(tmp_path):
+    path = tmp_path / "session.lmk"
+    record(path, 150)
+
+    with LandmarkRecording(str(path)) as recording:
+        assert len(recording) == 150
+        assert recording.fps == FPS
+        assert recording.metadata["camera"] == "test"
+        assert len(list(recording.chunks())) == 3
+        np.testing.assert_allclose(recording.timestamps, np.arange(150) / FPS)
+        assert recording.present.sum() == 135
+        assert not recording.present[9] and recording.present[10]
+        np.testing.assert_array_equal(recording.boxes[0], (90, 80, 180, 60))
+        np.testing.assert_array_equal(recording.boxes[9], 0)
+        np.testing.assert_array_equal(recording.landmarks[0], face(0.3))
+        assert ears_from_landmarks(recording.landmarks[:1])[0] == pytest.approx(0.3)
+
+
+def test_truncated_final_chunk_is_skipped(tmp_path):
+    path = tmp_path / "session.lmk"
+    record(path, 100, chunk_frames=64)
+    path.write_bytes(path.read_bytes()[:-100])
+
+    with LandmarkRecording(str(path)) as recording:
+        assert len(recording) == 64
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.lmk"
+    path.write_bytes(b"not a recording")
+    with pytest.raises(ValueError):
+        LandmarkRecording(str(path))
+
+
+def test_replay_scores_the_recorded_timeline(tmp_path):
+    path = tmp_path / "session.lmk"
+    record(path, int(20 * FPS))
+
+    with LandmarkRecording(str(path)) as recording:
+        detector = replay(recording)
+    assert detector.is_calibrated
+    assert len(detector.engaged_status) > 0
+
+    session = SessionData("Ada", "A123456", "CS101", "G1", "M1", 1)
+    summary = score_recording(str(path), session)
+    assert summary["processed_frames"] == int(20 * FPS)
+    assert summary["calibrated"]
+    assert summary["recording"] == "session.lmk"
+    assert 0 <= summary["engaged_percentage"] <= 100
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from core.data_models import SessionData
+from services.live_dashboard import EventHub, clean_event, status_event
+
+
+def event(session_id: str, course: str = "CS101", group: str = "G1", status: str = "Engaged",
+          ts: float = None) -> dict:
+    session = SessionData("Ada", session_id.upper(), course, group, "M1", 1)
+    return status_event(session, session_id, "progress", status, status != "Engaged", 80.0, ts)
+
+
+def test_slow_viewer_receives_the_newest_update_per_session():
+    async def scenario():
+        hub = EventHub()
+        viewer = hub.subscribe("CS101", "G1")
+        hub.publish(event("s1", status="Engaged"))
+        hub.publish(event("s2"))
+        hub.publish(event("s1", status="Eyes Closed"))
+        hub.publish(event("s1", status="Looking Away"))
+        updates = json.loads(await asyncio.wait_for(viewer.next(), 1))
+        return hub, viewer, updates
+
+    hub, viewer, updates = asyncio.run(scenario())
+    assert [(u["session_id"], u["status"]) for u in updates] == [("s1", "Looking Away"), ("s2", "Engaged")]
+    assert viewer.coalesced == 2
+    assert viewer.pending == {}
+    assert hub.stats["published"] == hub.stats["delivered"] == 4
+
+
+def test_viewers_only_see_their_course_and_group():
+    async def scenario():
+        hub = EventHub()
+        group, course, everything = hub.subscribe("CS101", "G1"), hub.subscribe("CS101"), hub.subscribe()
+        hub.publish(event("s1", group="G1"))
+        hub.publish(event("s2", group="G2"))
+        hub.publish(event("s3", course="MA201"))
+        received = {}
+        for name, viewer in (("group", group), ("course", course), ("everything", everything)):
+            received[name] = sorted(u["session_id"] for u in json.loads(await asyncio.wait_for(viewer.next(), 1)))
+        hub.unsubscribe(group)
+        return hub, received
+
+    hub, received = asyncio.run(scenario())
+    assert received == {"group": ["s1"], "course": ["s1", "s2"], "everything": ["s1", "s2", "s3"]}
+    assert hub.viewers == 2
+    assert [e["session_id"] for e in hub.snapshot("CS101")["sessions"]] == ["s1", "s2"]
+    assert [e["session_id"] for e in hub.snapshot("CS101", "G2")["sessions"]] == ["s2"]
+
+
+def test_prune_forgets_quiet_sessions():
+    hub = EventHub(stale_seconds=60)
+    now = time.time()
+    hub.publish(event("old", ts=now - 120))
+    hub.publish(event("new", group="G2", ts=now))
+    hub.prune(now)
+    assert [e["session_id"] for e in hub.snapshot()["sessions"]] == ["new"]
+    assert list(hub.topics) == [("CS101", "G2")]
+    assert hub.stats["pruned"] == 1
+
+
+def test_clean_event_keeps_known_fields_only():
+    cleaned = clean_event({"session_id": "s1", "type": "end", "course": None, "extra": "dropped", "ts": 5})
+    assert "extra" not in cleaned
+    assert cleaned["course"] == "" and cleaned["group"] == ""
+    assert cleaned["ts"] == 5.0
+
+    for bad in ({"type": "end"}, {"session_id": "s1", "type": "unknown"}, ["not", "a", "dict"]):
+        with pytest.raises(ValueError):
+            clean_event(bad)
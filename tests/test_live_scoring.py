@@ -0,0 +1,115 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from config.settings import EngagementConfig
+from core.data_models import SessionData
+from services.live_scoring import (EAR_SCALE, PACKET_HEADER, LiveScoringService, LiveSession,
+                                   decode_batch, encode_batch, quantize_ear)
+
+FPS = 30.0
+SESSION = {"name": "Ada", "matric_id": "A123456", "course": "CS101", "group": "G1", "module": "M1", "duration": 1}
+
+
+def frames(start: int, n: int):
+    """Sequence-numbered frames of an open-eyed student with a short blink every 3 seconds"""
+    seq = np.arange(start, start + n)
+    ears = np.where(seq % 90 < 4, 0.1, 0.3)
+    return (seq * 1000 / FPS).astype(np.uint32), np.array([quantize_ear(e, True) for e in ears])
+
+
+def packet(start: int, n: int) -> bytes:
+    return encode_batch(start, *frames(start, n))
+
+
+def live_session() -> LiveSession:
+    return LiveSession("kiosk-1", SessionData(**SESSION), FPS, EngagementConfig())
+
+
+def test_packet_round_trip():
+    times_ms, ears = frames(40, 25)
+    seq, decoded = decode_batch(encode_batch(40, times_ms, ears))
+    assert seq == 40
+    np.testing.assert_array_equal(decoded["t_ms"], times_ms)
+    np.testing.assert_array_equal(decoded["ear"], ears)
+    assert decode_batch(encode_batch(7, [], []))[1].size == 0
+
+
+def test_decode_rejects_malformed_packets():
+    good = packet(0, 3)
+    with pytest.raises(ValueError):
+        decode_batch(good[:PACKET_HEADER.size - 1])
+    with pytest.raises(ValueError):
+        decode_batch(good[:-1])
+    with pytest.raises(ValueError):
+        decode_batch(b"\x02" + good[1:])
+
+
+def test_quantize_ear():
+    assert quantize_ear(0.3, True) == round(0.3 * EAR_SCALE)
+    assert quantize_ear(0.3, False) == 0
+    assert quantize_ear(0.0, True) == 1  # a present face never reads as "no face"
+    assert quantize_ear(100.0, True) == 65535
+
+
+def test_resent_frames_are_scored_once():
+    streamed, resumed = live_session(), live_session()
+    for start in range(0, 900, 30):
+        streamed.feed(packet(start, 30))
+
+    # The kiosk reconnects after frame 450 was acknowledged and resends from 420
+    for start in range(0, 450, 30):
+        resumed.feed(packet(start, 30))
+    state = resumed.feed(packet(420, 60))
+    assert state["ack"] == 480
+    for start in range(480, 900, 30):
+        resumed.feed(packet(start, 30))
+    resumed.feed(packet(300, 30))  # a stale duplicate changes nothing
+
+    assert resumed.frames == streamed.frames == 900
+    assert resumed.lost_frames == 0
+    assert len(streamed.detector.engaged_status) > 0
+    np.testing.assert_array_equal(resumed.detector.engaged_status, streamed.detector.engaged_status)
+    assert resumed.finish()["engaged_percentage"] == streamed.finish()["engaged_percentage"]
+
+
+def test_gap_counts_lost_frames():
+    live = live_session()
+    live.feed(packet(0, 30))
+    state = live.feed(packet(50, 30))
+    assert state["ack"] == 80
+    assert live.frames == 60
+    assert live.lost_frames == 20
+    assert live.finish()["lost_frames"] == 20
+
+
+def test_service_resumes_then_stores_abandoned_sessions_once():
+    stored = []
+
+    async def on_finish(summary, session_id):
+        stored.append(session_id)
+
+    async def scenario():
+        service = LiveScoringService(EngagementConfig(), resume_seconds=0.05, on_finish=on_finish)
+        hello = {"session_id": "kiosk-1", "session": SESSION, "fps": FPS}
+        live = service.open(hello)
+        for start in range(0, 600, 30):
+            service.feed(live, packet(start, 30))
+
+        service.detach(live)
+        assert service.open(hello) is live  # reconnected within the window
+        assert service.stats["resumed"] == 1
+        await asyncio.sleep(0.1)
+        assert service.active == 1
+
+        service.detach(live)
+        await asyncio.sleep(0.1)
+        assert service.active == 0
+        await service.finish(live)
+        return service.stats
+
+    stats = asyncio.run(scenario())
+    assert stored == ["kiosk-1"]
+    assert stats["abandoned"] == 1 and stats["finished"] == 1
+    assert stats["frames"] == 600
@@ -0,0 +1,19 @@
+from core.metrics import MetricsRegistry, NullMetrics
+
+
+def test_observe_ms_records_the_given_latency():
+    registry = MetricsRegistry()
+    registry.observe_ms("alert_latency", 42.0)
+    registry.observe_ms("alert_latency", 180.0)
+
+    histogram = registry.histograms["alert_latency"]
+    assert histogram.count == 2
+    assert histogram.total == 222.0
+    assert histogram.quantile(0.5) == 50
+    assert 'ases_stage_latency_seconds_sum{stage="alert_latency"} 0.222000' in registry.render_prometheus()
+
+
+def test_null_metrics_ignores_latencies():
+    registry = NullMetrics()
+    registry.observe_ms("alert_latency", 42.0)
+    assert registry.histograms == {}
@@ -0,0 +1,101 @@
+import importlib
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+
+def stub_missing(*names: str):
+    """Stand-ins for the vision, UI and speech packages; the test replaces everything it calls from them"""
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            sys.modules[name] = MagicMock(name=name)
+
+
+stub_missing("dlib", "streamlit", "pyttsx3")
+
+from config.settings import EngagementConfig
+from core.data_models import SessionData
+from core.engagement_detector import EngagementDetector
+from core.frame_pool import FramePool
+from core.governor import FrameGovernor
+from ui import session_ui
+
+
+class StubTTS:
+    def __init__(self):
+        self.spoken = []
+
+    def speak(self, text, detected_at=None):
+        self.spoken.append(text)
+
+
+class StubFace:
+    def __init__(self, left, top, right, bottom):
+        self._box = (left, top, right, bottom)
+
+    def left(self):
+        return self._box[0]
+
+    def top(self):
+        return self._box[1]
+
+    def right(self):
+        return self._box[2]
+
+    def bottom(self):
+        return self._box[3]
+
+
+class StubFaceAnalyzer:
+    """Always finds one face with open eyes (EAR 0.44) and records the gray sizes it was given"""
+
+    def __init__(self):
+        self.widths = []
+        self.resets = 0
+
+    def detect_primary(self, gray):
+        self.widths.append(gray.shape[1])
+        return StubFace(10, 10, 60, 60)
+
+    def predict_landmarks(self, gray, face, out):
+        out[:] = 0
+        eye = np.array([[0, 0], [3, -2], [6, -2], [9, 0], [6, 2], [3, 2]])
+        out[36:42] = eye + (20, 30)
+        out[42:48] = eye + (40, 30)
+        return out
+
+    def reset(self):
+        self.resets += 1
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setattr(session_ui, "get_tts_manager", StubTTS)
+    session = SessionData("Test Student", "A00001", "CS101", "G1", "Vision", 1)
+    config = EngagementConfig()
+    governor = FrameGovernor(max_width=200, min_width=100, max_skip=0)
+    return session_ui.SessionAnalyzer(session, config, EngagementDetector(config, 30.0), StubFaceAnalyzer(),
+                                      30.0, frame_width=200, governor=governor)
+
+
+def test_analyzer_processes_frames_and_follows_governor_width(analyzer):
+    pool = FramePool(width=200, slots=2)
+    raw = np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+
+    results = []
+    for i in range(6):
+        if i == 3:
+            analyzer.governor.width = 120  # as the governor does when over its CPU budget
+        slot = pool.load(raw)
+        result = analyzer(slot)
+        results.append(result)
+        slot.release()
+
+    assert all(result is not None and result.calibrating for result in results)
+    assert results[-1].calibration_progress > 0
+    assert analyzer.face_analyzer.widths == [200] * 3 + [120] * 3
+    assert analyzer.face_analyzer.resets == 1
@@ -0,0 +1,106 @@
+import importlib
+import os
+import sys
+import wave
+from dataclasses import replace
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def stub_missing(*names: str):
+    """Stand-ins for the speech and audio packages; the tests replace everything they call from them"""
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            sys.modules[name] = MagicMock(name=name)
+
+
+stub_missing("pyttsx3", "simpleaudio")
+
+from config.settings import AlertConfig
+from services import tts_service
+from services.tts_service import AlertAudio, AudioPlayer, SimpleaudioPlayer, TTSManager
+
+
+def write_wav(path: str, frames: bytes = b"\x00\x01" * 100):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(frames)
+
+
+class FakeEngine:
+    """pyttsx3 engine whose save_to_file writes a WAV, an empty header or fails"""
+
+    def __init__(self, mode: str = "wav"):
+        self.mode = mode
+        self.saved = []
+
+    def setProperty(self, name, value):
+        pass
+
+    def getProperty(self, name):
+        return [] if name == "voices" else "voice"
+
+    def connect(self, topic, callback):
+        pass
+
+    def save_to_file(self, text, path):
+        self.saved.append(path)
+        if self.mode == "fail":
+            open(path, "wb").close()
+            raise RuntimeError("driver error")
+        if self.mode == "wav":
+            write_wav(path)
+        else:
+            write_wav(path, b"")  # a bare 44-byte header
+
+    def runAndWait(self):
+        pass
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(tts_service.pyttsx3, "init", lambda: engine)
+    monkeypatch.setattr(tts_service, "create_player", AudioPlayer)
+    manager = TTSManager(replace(AlertConfig(), PHRASES=(), CACHE_DIR=str(tmp_path / "alert_audio")))
+    yield manager
+    manager.stop()
+
+
+def test_rendered_alert_is_cached_in_memory(manager):
+    audio = manager._load_or_render("Please stay engaged!")
+
+    assert audio is not None
+    with open(audio.path, "rb") as f:
+        assert audio.data == f.read()
+    assert manager._load_or_render("Please stay engaged!") is audio
+    assert os.listdir(manager.config.CACHE_DIR) == [os.path.basename(audio.path)]
+
+
+@pytest.mark.parametrize("mode", ["empty", "fail"])
+def test_failed_render_leaves_no_temporary_file(manager, mode):
+    manager.engine.mode = mode
+
+    assert manager._load_or_render("Please stay engaged!") is None
+    assert os.listdir(manager.config.CACHE_DIR) == []
+
+
+def test_simpleaudio_player_decodes_from_memory(tmp_path):
+    path = str(tmp_path / "alert.wav")
+    write_wav(path)
+    with open(path, "rb") as f:
+        audio = AlertAudio("Please stay engaged!", path, f.read())
+    os.remove(path)  # playback must not need the file
+
+    player = SimpleaudioPlayer()
+    player.simpleaudio = MagicMock()
+
+    assert player.play(audio)
+    assert player.play(audio)
+    player.simpleaudio.play_buffer.assert_called_with(b"\x00\x01" * 100, 1, 2, 16000)
+    assert len(player._decoded) == 1
@@ -0,0 +1,95 @@
+import json
+import socket
+import threading
+import time
+from dataclasses import replace
+
+import pytest
+import uvicorn
+
+import server
+from config.settings import UploadConfig
+from services.ingestion_service import IngestionStore
+from services.upload_service import UploadClient
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(predicate, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for condition")
+        time.sleep(0.02)
+
+
+def summary(matric_id: str) -> dict:
+    return {"name": "Test Student", "matric_id": matric_id, "course": "CS101", "module": "Vision",
+            "group": "G1", "engaged_percentage": 80.0, "total_frames": 300, "disengaged_seconds": 2.0,
+            "time": 10.0, "fps": 30.0}
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "engagement.db")
+    monkeypatch.setattr(server.server_config, "DATABASE_PATH", path)
+    monkeypatch.setattr(server.server_config, "FLUSH_INTERVAL", 0.05)
+    return path
+
+
+@pytest.fixture
+def client(tmp_path):
+    config = replace(UploadConfig(), SERVER_URL=f"http://127.0.0.1:{free_port()}",
+                     OUTBOX_PATH=str(tmp_path / "outbox.jsonl"), REQUEST_TIMEOUT=2.0,
+                     BACKOFF_BASE=0.05, BACKOFF_MAX=0.2)
+    client = UploadClient(config)
+    yield client
+    client.stop()
+
+
+def start_server(port: int):
+    api = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=api.run, daemon=True)
+    thread.start()
+    wait_for(lambda: api.started)
+    return api, thread
+
+
+def stored(db_path: str) -> int:
+    store = IngestionStore(db_path)
+    try:
+        return store.count()
+    finally:
+        store.close()
+
+
+def test_outbox_survives_outage_and_replays_once(client, db_path):
+    # Server down: summaries are journaled and the sender backs off
+    keys = [client.submit(summary(f"A{i:05d}")) for i in range(3)]
+    wait_for(lambda: client.failures >= 1)
+    with open(client.config.OUTBOX_PATH, encoding="utf-8") as f:
+        journal = [json.loads(line) for line in f]
+    assert [entry["key"] for entry in journal] == keys
+    assert [entry["summary"]["matric_id"] for entry in journal] == ["A00000", "A00001", "A00002"]
+    assert client.pending == 3
+
+    api, thread = start_server(int(client.config.SERVER_URL.rsplit(":", 1)[1]))
+    try:
+        # Server up: the outbox is replayed, acknowledged and compacted
+        wait_for(lambda: client.pending == 0)
+        wait_for(lambda: stored(db_path) == 3)
+        with open(client.config.OUTBOX_PATH, encoding="utf-8") as f:
+            assert f.read() == ""
+
+        # Resending under the same idempotency key (e.g. a crash before the ack) is not stored twice
+        sent = client.sent
+        client.submit(dict(summary("A00000"), idempotency_key=keys[0]))
+        wait_for(lambda: client.sent == sent + 1)
+    finally:
+        api.should_exit = True
+        thread.join(10)
+    assert stored(db_path) == 3  # shutdown flushed the write-behind buffer
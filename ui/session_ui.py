@@ -1,187 +1,647 @@
 import streamlit as st
+import logging
+import os
 import cv2
-import dlib
 import time
 import numpy as np
 import pandas as pd
-from imutils import face_utils
 import imutils
+import uuid
+from dataclasses import replace
+from typing import Optional
 from core.engagement_detector import EngagementDetector
 from core.camera_manager import CameraManager
+from core.calibration_cache import CalibrationCache
+from core.data_models import CalibrationProfile, FrameResult
+from core.classroom import ClassroomTracker
+from core.face_analyzer import FaceAnalyzer, create_face_analyzer
+from core.face_backends import create_backend, select_backend
+from core.frame_pool import FramePool, FrameSlot, release_buffers
+from core.governor import FrameGovernor
+from core.landmark_recording import LandmarkRecorder
+from core.metrics import get_metrics
+from core.model_registry import get_model_registry
+from core.pipeline import DropOldestQueue, FramePipeline, PipelineStop
 from services.tts_service import get_tts_manager
 from services.api_service import post_engagement_data
+from services.live_client import LiveScoringClient
+from services.live_dashboard import status_event
+from services.live_events import EventPublisher, get_event_publisher
 from utils.context_managers import video_stream_context
-from config.settings import EngagementConfig
-from config.logging_config import setup_logging
+from config.settings import (BackendConfig, ClassroomConfig, DashboardConfig, EngagementConfig, LiveConfig,
+                             LoggingConfig, PipelineConfig, RecordingConfig)
+from config.logging_config import RateLimiter, setup_logging
 
 logger = setup_logging()
 
-def run_engagement_session(session, model_path: str):
-    """Main engagement monitoring session"""
+
+class FrameCapture:
+    """Capture stage: copies new frames from the video stream into pooled buffers at the target size"""
+
+    def __init__(self, vs, pool: FramePool, retries: int = 3):
+        self.vs = vs
+        self.pool = pool
+        self.retries = retries
+        self.metrics = get_metrics()
+        self._last_seq = None
+
+    def __call__(self) -> Optional[FrameSlot]:
+        started = time.perf_counter()
+        # Frame capture with retry logic
+        for attempt in range(self.retries):
+            seq, frame = self.vs.read_latest()
+            if frame is not None:
+                break
+            time.sleep(0.1)
+        else:
+            raise RuntimeError("Failed to capture frame")
+
+        # The threaded stream returns its latest frame on every read; skip repeats
+        if seq == self._last_seq:
+            time.sleep(0.005)
+            return None
+        self._last_seq = seq
+        # Resize straight out of the stream's buffer, which it reuses a few frames later
+        slot = self.pool.load(frame)
+        self.metrics.observe("capture", started)
+        self.metrics.inc("frames_captured")
+        return slot
+
+
+class SessionAnalyzer:
+    """Analysis stage: face/landmark detection, EAR, engagement logic and alerts"""
+
+    def __init__(self, session, config: EngagementConfig, detector_engine: EngagementDetector,
+                 face_analyzer: FaceAnalyzer, fps: float, frame_width: int = 450,
+                 governor: Optional[FrameGovernor] = None, recorder: Optional[LandmarkRecorder] = None,
+                 live: Optional[LiveScoringClient] = None, events: Optional[EventPublisher] = None,
+                 progress_interval: float = 5.0):
+        self.session = session
+        self.config = config
+        self.detector_engine = detector_engine
+        self.face_analyzer = face_analyzer
+        self.fps = fps
+        self.frame_width = frame_width
+        self.governor = governor or FrameGovernor(max_width=frame_width, max_skip=0)
+        self._current_width = frame_width
+        self.recorder = recorder
+        self.live = live  # thin-client mode: the server scores the stored result from these EARs
+        self.events = events  # live dashboard; in thin-client mode the server publishes instead
+        self.progress_interval = progress_interval
+        self.session_id = uuid.uuid4().hex
+        self.last_progress = 0.0
+        self.tts = get_tts_manager()
+        self.metrics = get_metrics()
+        self.frame_log = RateLimiter(LoggingConfig().FRAME_LOG_INTERVAL)
+        self.start_time = None
+        self.last_alert_time = 0
+        self.last_disengaged_status = False
+        self.finished = False
+        self.notice = None
+        self.validation = None
+
+    def __call__(self, slot: FrameSlot) -> Optional[FrameResult]:
+        if self.finished:
+            raise PipelineStop()
+        if not self.governor.admit():
+            slot.release()
+            return None  # Skipped under load; the detector's timeline is timestamp based
+
+        # Process frame; the capture stage already resized it into the slot
+        loop_started = started = time.perf_counter()
+        current_time = time.time()
+        frame = slot.frame
+        gray = slot.gray(self._processing_width())
+        self.metrics.observe("preprocess", started)
+        if self.start_time is None and self.detector_engine.is_calibrated:
+            self.start_time = current_time  # Cached calibration profile: no calibration phase
+        # Notices ride on every result so a dropped display frame cannot lose them
+        result = FrameResult(frame=frame, notice=self.notice, buffers=slot)
+        duration = self.session.duration * 60
+
+        # Update timer and progress
+        if self.start_time:
+            elapsed = current_time - self.start_time
+            remaining = duration - elapsed
+            if remaining < 0:
+                raise PipelineStop()  # Session ended
+            result.remaining = int(remaining)
+            result.progress = min(elapsed / duration, 1.0)
+
+        # Process faces for engagement detection
+        started = time.perf_counter()
+        face = self.face_analyzer.detect_primary(gray)
+        self.metrics.observe("detect", started)
+        landmarks = None
+        if face is not None:
+            started = time.perf_counter()
+            landmarks = self.face_analyzer.predict_landmarks(gray, face, slot.landmarks)
+            self.metrics.observe("predict", started)
+
+        started = time.perf_counter()
+        ear = raw_ear = 0
+        if landmarks is not None:
+            raw_ear = self.detector_engine.ear_from_landmarks(landmarks)
+            ear = self.detector_engine.smooth_ear(raw_ear)
+        if self.live is not None:
+            self.live.push(current_time, raw_ear, landmarks is not None)
+
+        if not self.detector_engine.is_calibrated:
+            self._calibrate(ear, current_time, result)
+        else:
+            self._detect(ear, current_time, result)
+        self.metrics.observe("ear", started)
+
+        started = time.perf_counter()
+        scale = frame.shape[1] / gray.shape[1]
+        if landmarks is not None and scale != 1:
+            # Back to display coordinates; EAR is scale invariant so only drawing and recording need this
+            landmarks = np.multiply(landmarks, scale, out=slot.display_landmarks, casting="unsafe")
+        if self.recorder is not None:
+            box = None if face is None else tuple(
+                int(v * scale) for v in (face.left(), face.top(), face.right(), face.bottom()))
+            self.recorder.append(current_time, box, landmarks)
+        self._annotate(frame, landmarks, ear, result)
+        self.metrics.observe("annotate", started)
+        self.metrics.inc("frames_analyzed")
+
+        # Check for session end
+        if self.start_time and current_time - self.start_time >= duration:
+            self.finished = True
+        self.governor.record(loop_started)
+        return result
+
+    def _processing_width(self) -> int:
+        """The governor's processing width, resetting face tracking when it changes"""
+        width = self.governor.width
+        if width != self._current_width:
+            # Tracked face boxes are in pixels of the old width
+            self._current_width = width
+            self.face_analyzer.reset()
+        return width
+
+    def _calibrate(self, ear: float, current_time: float, result: FrameResult):
+        result.calibration_progress = self.detector_engine.calibration_progress
+
+        if self.detector_engine.calibrate(ear, current_time):
+            self.start_time = current_time
+            result.calibrating = False
+            result.remaining = self.session.duration * 60
+            self.notice = result.notice = f"Calibration complete! Threshold: {self.detector_engine.ear_thresh:.3f}"
+            self.publish("progress", "Engaged", False)
+
+    def _detect(self, ear: float, current_time: float, result: FrameResult):
+        detector_engine = self.detector_engine
+        config = self.config
+
+        # Engagement detection
+        disengaged, status = detector_engine.detect_engagement(ear, current_time)
+        detected_at = time.perf_counter()  # start of the alert latency measurement
+
+        if detector_engine.validation != self.validation:
+            self.validation = detector_engine.validation
+            if self.validation == "confirmed":
+                self.notice = result.notice = "Saved calibration confirmed"
+            elif self.validation == "drifted":
+                # The detector has reset itself; the session restarts after full calibration
+                self.start_time = None
+                self.notice = result.notice = "Saved calibration no longer matches, recalibrating..."
+                logger.info(f"Calibration profile for {self.session.matric_id} drifted; recalibrating")
+                return
+
+        # Dynamic threshold adjustment
+        detector_engine.update_threshold_dynamically(current_time, self.start_time)
+
+        # Per-frame record: sampled, and only formatted when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG) and self.frame_log.ready():
+            logger.debug("Processing frame at time %.2f, disengaged: %s, ear: %.3f",
+                         current_time, disengaged, ear)
+        # Alert management
+        if disengaged and (current_time - self.last_alert_time) >= config.ALERT_COOLDOWN:
+            # Only speak if we weren't disengaged in the previous frame
+            # This prevents continuous alerts for sustained disengagement
+            if not self.last_disengaged_status:
+                alert_message = "Please stay engaged!"
+                self.tts.speak(alert_message, detected_at)
+                logger.info("Alert triggered: %s", alert_message)
+                self.last_alert_time = current_time
+            elif (current_time - self.last_alert_time) >= (config.ALERT_COOLDOWN * 2):
+                # Send reminder after double the cooldown period for sustained disengagement
+                reminder_message = "Please focus on the screen!"
+                self.tts.speak(reminder_message, detected_at)
+                logger.info("Reminder triggered: %s", reminder_message)
+                self.last_alert_time = current_time
+
+        if disengaged != self.last_disengaged_status:
+            self.publish("transition", status, disengaged)
+        elif current_time - self.last_progress >= self.progress_interval:
+            self.publish("progress", status, disengaged)
+        self.last_disengaged_status = disengaged
+
+        result.calibrating = False
+        result.status = status
+        result.disengaged = disengaged
+
+    def publish(self, event_type: str, status: str, disengaged: bool):
+        """Send a status event to the live dashboard, if it is enabled"""
+        if self.events is None:
+            return
+        self.last_progress = time.time()
+        engaged_status = self.detector_engine.status_log
+        percentage = engaged_status.nonzero / len(engaged_status) * 100 if len(engaged_status) else 0.0
+        self.events.publish(status_event(self.session, self.session_id, event_type, status, disengaged,
+                                         percentage, self.last_progress))
+
+    def _annotate(self, frame, landmarks, ear: float, result: FrameResult):
+        if landmarks is not None:
+            # Draw eye contours
+            left_eye, right_eye = self.detector_engine.eyes_from_landmarks(landmarks)
+            cv2.drawContours(frame, [cv2.convexHull(left_eye)], -1, (0, 255, 0), 1)
+            cv2.drawContours(frame, [cv2.convexHull(right_eye)], -1, (0, 255, 0), 1)
+
+        if not result.status:
+            cv2.putText(frame, "Calibrating... Look at screen", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+            return
+
+        # Frame annotations
+        status_color_cv = (0, 0, 255) if result.disengaged else (0, 255, 0)
+        cv2.putText(frame, result.status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color_cv, 2)
+        cv2.putText(frame, f"EAR: {ear:.3f}", (300, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+        cv2.putText(frame, f"Disengaged: {self.detector_engine.total_disengaged/self.fps:.1f}s",
+                    (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+        live_status = self.live.status if self.live is not None else None
+        if live_status:
+            cv2.putText(frame, f"Server: {live_status['status']}", (10, 90),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+
+
+class ClassroomSessionAnalyzer:
+    """Analysis stage for classroom mode: engagement for every student in view"""
+
+    def __init__(self, session, tracker: ClassroomTracker, frame_width: int = 800,
+                 governor: Optional[FrameGovernor] = None):
+        self.session = session
+        self.tracker = tracker
+        self.frame_width = frame_width
+        # Width stays fixed: identities are matched on box overlap in pixel coordinates
+        self.governor = governor or FrameGovernor(max_width=frame_width, max_skip=0)
+        self.metrics = get_metrics()
+        self.start_time = None
+        self.finished = False
+
+    def __call__(self, slot: FrameSlot) -> Optional[FrameResult]:
+        if self.finished:
+            raise PipelineStop()
+        if not self.governor.admit():
+            slot.release()
+            return None
+
+        loop_started = started = time.perf_counter()
+        frame = slot.frame
+        gray = slot.gray()
+        self.metrics.observe("preprocess", started)
+        current_time = time.time()
+        duration = self.session.duration * 60
+
+        # Each student calibrates individually, so the session clock starts immediately
+        if self.start_time is None:
+            self.start_time = current_time
+        elapsed = current_time - self.start_time
+        if elapsed > duration:
+            raise PipelineStop()  # Session ended
+
+        visible = [t for t in self.tracker.update(gray, current_time) if t.missed == 0]
+        started = time.perf_counter()
+        engaged = disengaged = calibrating = 0
+        for track in visible:
+            if not track.detector.is_calibrated:
+                calibrating += 1
+                color = (255, 255, 0)
+            elif track.disengaged:
+                disengaged += 1
+                color = (0, 0, 255)
+            else:
+                engaged += 1
+                color = (0, 255, 0)
+            left, top, right, bottom = track.box
+            cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+            cv2.putText(frame, f"#{track.track_id} {track.status}", (left, max(top - 8, 12)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        self.metrics.observe("annotate", started)
+        self.metrics.inc("frames_analyzed")
+
+        if elapsed >= duration:
+            self.finished = True
+        self.governor.record(loop_started)
+        return FrameResult(
+            frame=frame,
+            buffers=slot,
+            calibrating=False,
+            status=(f"{len(visible)} students: {engaged} engaged, {disengaged} disengaged, "
+                    f"{calibrating} calibrating"),
+            disengaged=disengaged > 0,
+            remaining=int(duration - elapsed),
+            progress=min(elapsed / duration, 1.0),
+        )
+
+
+class SessionPresenter:
+    """Presentation stage: pushes analysed frames and status to Streamlit.
+
+    Frames are JPEG-encoded and sent at most `display_fps` times a second,
+    and each placeholder is only re-rendered when its content changes.
+    """
+
+    def __init__(self, pipeline: FramePipeline, stats_interval: float = 1.0,
+                 display_fps: float = 15.0, jpeg_quality: int = 70):
+        self.pipeline = pipeline
+        self.stats_interval = stats_interval
+        self.display_interval = 1.0 / display_fps if display_fps > 0 else 0.0
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+        self.stframe = st.empty()
+        self.timer_placeholder = st.empty()
+        self.status_placeholder = st.empty()
+        self.progress_placeholder = st.empty()
+        self.stats_placeholder = st.sidebar.empty()
+        self.metrics = get_metrics()
+        self._rendered = {}
+        self._last_stats_update = 0.0
+        self._last_notice = None
+        self._next_display = 0.0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self._started = time.perf_counter()
+        self._window = (self._started, 0, 0)  # (started, frames_sent, bytes_sent)
+        self.display_fps = 0.0
+        self.bytes_per_second = 0.0
+
+    def _changed(self, key: str, content) -> bool:
+        """True (and remembered) when a placeholder's content differs from what is on screen"""
+        if self._rendered.get(key) == content:
+            return False
+        self._rendered[key] = content
+        return True
+
+    def __call__(self, result: FrameResult) -> bool:
+        started = time.perf_counter()
+        if result.notice and result.notice != self._last_notice:
+            self._last_notice = result.notice
+            st.info(result.notice, icon="✅")
+
+        if result.remaining is not None:
+            mins, secs = divmod(result.remaining, 60)
+            timer_text = f"**Time Remaining**: {mins:02d}:{secs:02d}"
+            if self._changed("timer", timer_text):
+                self.timer_placeholder.markdown(timer_text)
+            percent = int(result.progress * 100)
+            if self._changed("progress", percent):
+                self.progress_placeholder.progress(percent)
+
+        if result.calibrating:
+            status_text = f"**Calibrating...** {result.calibration_progress:.0%}"
+        else:
+            status_color_text = 'red' if result.disengaged else 'green'
+            status_text = f"**Status**: <span style='color: {status_color_text}'>{result.status}</span>"
+        if self._changed("status", status_text):
+            self.status_placeholder.markdown(status_text, unsafe_allow_html=True)
+
+        # Display frame, rate-limited and compressed; skipped frames still update the status above
+        if started >= self._next_display:
+            self._next_display = max(self._next_display + self.display_interval, started)
+            ok, encoded = cv2.imencode(".jpg", result.frame, self.encode_params)
+            if ok:
+                payload = encoded.tobytes()
+                self.stframe.image(payload)
+                self.frames_sent += 1
+                self.bytes_sent += len(payload)
+                self.metrics.inc("display_bytes", len(payload))
+        release_buffers(result)
+        self.metrics.observe("display", started)
+
+        now = time.perf_counter()
+        if now - self._last_stats_update >= self.stats_interval:
+            self._last_stats_update = now
+            self.render_stats()
+        return True
+
+    def _update_rates(self):
+        now = time.perf_counter()
+        started, frames, sent = self._window
+        elapsed = now - started
+        if elapsed > 0:
+            self.display_fps = (self.frames_sent - frames) / elapsed
+            self.bytes_per_second = (self.bytes_sent - sent) / elapsed
+        self._window = (now, self.frames_sent, self.bytes_sent)
+
+    def render_stats(self):
+        """Show per-stage throughput, queue depth and drops in the sidebar"""
+        self._update_rates()
+        rows = ["| Stage | FPS | ms | Queue | Dropped |", "|---|---|---|---|---|"]
+        for name, stats in self.pipeline.stats().items():
+            rows.append(f"| {name} | {stats['fps']:.1f} | {stats['avg_ms']:.1f} | "
+                        f"{stats['queue_depth']} | {stats['dropped']} |")
+        rows += ["", f"Display: {self.display_fps:.1f} FPS, {self.bytes_per_second / 1024:.0f} KB/s"]
+        if self.metrics.enabled:
+            rows += ["", "| Step | n | mean ms | p95 ms |", "|---|---|---|---|"]
+            for item in self.metrics.summary():
+                rows.append(f"| {item['stage']} | {item['count']} | {item['mean_ms']:.2f} | "
+                            f"≤{item['p95_ms']:g} |")
+        self.stats_placeholder.markdown("#### ⚙️ Pipeline\n" + "\n".join(rows))
+
+    def stats(self) -> dict:
+        """Session totals and averages for the log"""
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        return {"frames_sent": self.frames_sent, "bytes_sent": self.bytes_sent,
+                "display_fps": self.frames_sent / elapsed, "bytes_per_second": self.bytes_sent / elapsed}
+
+
+def sample_frames(camera_index: int, count: int, width: int, timeout: float = 10.0) -> list:
+    """Distinct frames from the camera, resized to the processing width, for the backend benchmark"""
+    frames = []
+    deadline = time.monotonic() + timeout
+    with video_stream_context(camera_index) as vs:
+        last_seq = None
+        while len(frames) < count and time.monotonic() < deadline:
+            seq, frame = vs.read_latest()
+            if frame is None or seq == last_seq:
+                time.sleep(0.005)
+                continue
+            last_seq = seq
+            frames.append(imutils.resize(frame, width=width))
+    return frames
+
+
+def run_engagement_session(session, model_path: str, classroom: bool = False):
+    """Main engagement monitoring session.
+
+    In classroom mode every detected face is tracked as its own student and
+    uploaded separately; otherwise only the largest face is monitored.
+    """
     try:
         fps, camera_index = CameraManager.get_best_camera()
     except RuntimeError as e:
         st.error(f"Camera error: {e}", icon="❌")
         return
-    
+
     # Initialize components
     config = EngagementConfig()
-    detector_engine = EngagementDetector(config, fps)
+    pipeline_config = PipelineConfig()
 
-    # Get TTS manager instance
-    tts = get_tts_manager()
-    
-    # Load dlib models
+    # Face models are shared process-wide (dlib is usually already warmed up at app start)
+    backend_config = BackendConfig()
     try:
-        face_detector = dlib.get_frontal_face_detector()
-        landmark_predictor = dlib.shape_predictor(model_path)
+        backend_name = select_backend(
+            model_path, backend_config,
+            lambda: sample_frames(camera_index, backend_config.BENCHMARK_FRAMES, pipeline_config.FRAME_WIDTH))
+        try:
+            backend = create_backend(backend_name, model_path, backend_config)
+        except RuntimeError as e:
+            logger.warning(f"Face backend '{backend_name}' unavailable ({e}); falling back to dlib")
+            backend_name = "dlib"
+            backend = create_backend(backend_name, model_path, backend_config)
+        face_detector = backend.face_detector
+        landmark_predictor = backend.landmark_predictor
+        if classroom and backend_name == "haar_lbf":
+            # Landmarks run on a thread pool in classroom mode; the LBF facemark is not thread-safe
+            landmark_predictor = get_model_registry().landmark_predictor(model_path)
+        logger.info(f"Using face backend '{backend_name}'")
     except Exception as e:
         st.error(f"Error loading face detection models: {e}", icon="❌")
         logger.error(f"Model loading error: {e}")
         return
-    
-    # UI placeholders
-    stframe = st.empty()
-    timer_placeholder = st.empty()
-    status_placeholder = st.empty()
-    progress_placeholder = st.empty()
-    
-    start_time = None
-    last_alert_time = 0
-    last_disengaged_status = False
-    
-    with video_stream_context(camera_index) as vs:
-        while True:
-            # Frame capture with retry logic
-            frame = None
-            for attempt in range(3):
-                frame = vs.read()
-                if frame is not None:
-                    break
-                time.sleep(0.1)
-            
-            if frame is None:
-                st.error("Failed to capture frame", icon="❌")
-                break
-            
-            # Process frame
-            frame = imutils.resize(frame, width=450)
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_detector(gray, 0)
-            
-            current_time = int(time.time())
-            
-            # Update timer and progress
-            if start_time:
-                elapsed = current_time - start_time
-                remaining = session.duration * 60 - elapsed
-                progress = min(elapsed / (session.duration * 60), 1.0)
-                
-                if remaining >= 0:
-                    mins, secs = divmod(remaining, 60)
-                    timer_placeholder.markdown(f"**Time Remaining**: {mins:02d}:{secs:02d}")
-                    progress_placeholder.progress(progress)
-                else:
-                    break  # Session ended
-            
-            # Process faces for engagement detection
-            ear = 0
-            if len(faces) > 0:
-                # Use the largest face
-                face = max(faces, key=lambda rect: rect.width() * rect.height())
-                landmarks = landmark_predictor(gray, face)
-                landmarks = face_utils.shape_to_np(landmarks)
-                
-                # Extract eye regions
-                left_eye = landmarks[detector_engine.left_eye_start:detector_engine.left_eye_end]
-                right_eye = landmarks[detector_engine.right_eye_start:detector_engine.right_eye_end]
-                
-                # Calculate EAR
-                left_ear = detector_engine.eye_aspect_ratio(left_eye)
-                right_ear = detector_engine.eye_aspect_ratio(right_eye)
-                ear = (left_ear + right_ear) / 2.0
-                ear = detector_engine.smooth_ear(ear)
-                
-                # Draw eye contours
-                left_hull = cv2.convexHull(left_eye)
-                right_hull = cv2.convexHull(right_eye)
-                cv2.drawContours(frame, [left_hull], -1, (0, 255, 0), 1)
-                cv2.drawContours(frame, [right_hull], -1, (0, 255, 0), 1)
-            
-            # Calibration phase
-            if not detector_engine.is_calibrated:
-                calibration_progress = len(detector_engine.calibration_ears) / (config.CALIBRATION_DURATION * fps)
-                status_placeholder.markdown(f"**Calibrating...** {calibration_progress:.1%}")
-                cv2.putText(frame, "Calibrating... Look at screen", (10, 30), 
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-                
-                if not detector_engine.calibrate(ear):
-                    continue  # Keep calibrating
-                else:
-                    start_time = current_time
-                    st.info(f"Calibration complete! Threshold: {detector_engine.ear_thresh:.3f}", icon="✅")
-            else:
-                # Engagement detection
-                disengaged, status = detector_engine.detect_engagement(ear, current_time)
-                
-                # Dynamic threshold adjustment
-                detector_engine.update_threshold_dynamically(current_time, start_time)
-                
-                # Alert management
-                logger.info(f"Processing frame at time {current_time}, disengaged: {disengaged}, ear: {ear:.3f}")
-                # Alert management (improved version)
-                if disengaged and (current_time - last_alert_time) >= config.ALERT_COOLDOWN:
-                    # Only speak if we weren't disengaged in the previous frame
-                    # This prevents continuous alerts for sustained disengagement
-                    if not last_disengaged_status:
-                        alert_message = "Please stay engaged!"
-                        tts.speak(alert_message)
-                        logger.info(f"Alert triggered: {alert_message}")
-                        last_alert_time = current_time
-                    elif (current_time - last_alert_time) >= (config.ALERT_COOLDOWN * 2):
-                        # Send reminder after double the cooldown period for sustained disengagement
-                        reminder_message = "Please focus on the screen!"
-                        tts.speak(reminder_message)
-                        logger.info(f"Reminder triggered: {reminder_message}")
-                        last_alert_time = current_time
-
-                last_disengaged_status = disengaged
-                
-                # Update UI
-                status_color_text = 'red' if disengaged else 'green'
-                status_placeholder.markdown(
-                    f"**Status**: <span style='color: {status_color_text}'>{status}</span>", 
-                    unsafe_allow_html=True
-                )
-                
-                # Frame annotations
-                status_color_cv = (0, 0, 255) if disengaged else (0, 255, 0)
-                cv2.putText(frame, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color_cv, 2)
-                cv2.putText(frame, f"EAR: {ear:.3f}", (300, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
-                cv2.putText(frame, f"Disengaged: {detector_engine.total_disengaged/fps:.1f}s", 
-                          (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
-            
-            # Display frame
-            stframe.image(frame, channels="BGR")
-            
-            # Check for session end
-            if start_time and current_time - start_time >= session.duration * 60:
-                break
-    
+
+    tracker = None
+    detector_engine = None
+    if classroom:
+        classroom_config = ClassroomConfig()
+        tracker = ClassroomTracker(FaceAnalyzer(face_detector, landmark_predictor),
+                                   config, classroom_config, fps)
+        analyzer = ClassroomSessionAnalyzer(
+            session, tracker, classroom_config.FRAME_WIDTH,
+            FrameGovernor.from_config(pipeline_config, classroom_config.FRAME_WIDTH, adaptive_width=False))
+    else:
+        detector_engine = EngagementDetector(config, fps)
+        analyzer = SessionAnalyzer(session, config, detector_engine,
+                                   create_face_analyzer(face_detector, landmark_predictor, config),
+                                   fps, pipeline_config.FRAME_WIDTH,
+                                   FrameGovernor.from_config(pipeline_config, pipeline_config.FRAME_WIDTH))
+        recording_config = RecordingConfig()
+        if recording_config.ENABLED:
+            analyzer.recorder = LandmarkRecorder(
+                os.path.join(recording_config.DIRECTORY,
+                             f"{session.matric_id}_{time.strftime('%Y%m%d_%H%M%S')}.lmr"),
+                fps, recording_config.CHUNK_FRAMES, matric_id=session.matric_id,
+                frame_width=pipeline_config.FRAME_WIDTH, camera_index=camera_index)
+        live_config = LiveConfig()
+        dashboard_config = DashboardConfig()
+        if live_config.ENABLED:
+            analyzer.live = LiveScoringClient(session, fps, live_config)
+        elif dashboard_config.ENABLED:
+            analyzer.events = get_event_publisher()
+            analyzer.progress_interval = dashboard_config.PROGRESS_INTERVAL
+        calibration_cache = CalibrationCache(config.CALIBRATION_CACHE_PATH, config.CALIBRATION_CACHE_TTL_DAYS)
+        profile = calibration_cache.load(session.matric_id, camera_index)
+        if profile is not None:
+            # Repeat student on this camera: detect immediately, validate the profile as we go
+            detector_engine.apply_profile(profile.ear_thresh, profile.baseline_ear)
+            analyzer.notice = f"Using saved calibration (threshold {detector_engine.ear_thresh:.3f}), validating..."
+
+    # Stages are linked by drop-oldest queues so the slowest stage never stalls the others:
+    # analysis always sees the newest frame and a slow Streamlit push only drops display frames
+    # Frames travel in pooled buffers; dropped ones go straight back to the pool
+    pool = FramePool(analyzer.frame_width, pipeline_config.FRAME_POOL_SLOTS)
+    capture_queue = DropOldestQueue("capture", pipeline_config.CAPTURE_QUEUE_SIZE, on_drop=release_buffers)
+    display_queue = DropOldestQueue("display", pipeline_config.DISPLAY_QUEUE_SIZE, on_drop=release_buffers)
+    pipeline = FramePipeline()
+    presenter = SessionPresenter(pipeline, pipeline_config.STATS_REFRESH_INTERVAL,
+                                 pipeline_config.DISPLAY_FPS, pipeline_config.JPEG_QUALITY)
+
+    try:
+        with video_stream_context(camera_index) as vs:
+            pipeline.add_stage("capture", FrameCapture(vs, pool, pipeline_config.CAPTURE_RETRIES),
+                               outbox=capture_queue)
+            pipeline.add_stage("analysis", analyzer, inbox=capture_queue, outbox=display_queue)
+            # Streamlit elements may only be touched from the script thread
+            presentation = pipeline.add_stage("presentation", presenter, inbox=display_queue)
+            pipeline.start(foreground=presentation)
+            pipeline.run_foreground(presentation)
+    except RuntimeError as e:
+        # The camera never delivered a frame; nothing was scored, so there is no summary to show
+        st.error(f"Camera error: {e}", icon="❌")
+        if classroom:
+            tracker.close()
+        else:
+            if analyzer.recorder is not None:
+                analyzer.recorder.close()
+            if analyzer.live is not None:
+                analyzer.live.close(timeout=0)
+        return
+
+    presenter.render_stats()
+    logger.info(f"Pipeline stats: {pipeline.stats()}")
+    logger.info(f"Display stats: {presenter.stats()}")
+    logger.info(f"Governor stats: {analyzer.governor.stats()}")
+    logger.info(f"Frame pool stats: {pool.stats()}")
+    if pipeline.error:
+        st.error(f"Session stopped: {pipeline.error}", icon="❌")
+
+    if classroom:
+        tracker.close()
+        show_classroom_summary(session, tracker, fps, presenter)
+    else:
+        logger.info(f"Alert latency: {analyzer.tts.latency_stats()}")
+        if hasattr(analyzer.face_analyzer, "stats"):
+            logger.info(f"Face tracking stats: {analyzer.face_analyzer.stats()}")
+        if analyzer.recorder is not None:
+            analyzer.recorder.close()
+        analyzer.publish("end", "Ended", analyzer.last_disengaged_status)
+        save_calibration_profile(calibration_cache, profile, session, camera_index, detector_engine)
+        show_session_summary(session, detector_engine, fps, presenter, analyzer.live)
+
+
+def save_calibration_profile(cache: CalibrationCache, previous: Optional[CalibrationProfile], session,
+                             camera_index: int, detector_engine: EngagementDetector):
+    """Persist the session's final (dynamically adjusted) threshold for the next session"""
+    if not detector_engine.is_calibrated or len(detector_engine.engaged_status) == 0:
+        return
+    if detector_engine.validation == "pending":
+        return  # Too short to confirm the cached profile; keep it as it was
+    cache.save(CalibrationProfile(
+        matric_id=session.matric_id,
+        camera_index=camera_index,
+        ear_thresh=float(detector_engine.ear_thresh),
+        baseline_ear=detector_engine.current_baseline(),
+        sessions=(previous.sessions if previous else 0) + 1,
+        updated_at=time.time(),
+    ))
+
+
+def show_session_summary(session, detector_engine: EngagementDetector, fps: float,
+                         presenter: SessionPresenter, live: Optional[LiveScoringClient] = None):
+    """Upload the session result and show the engagement summary"""
+    # In thin-client mode the server has stored its own result; ending the stream returns it
+    live_summary = live.close() if live is not None else None
     # Session completed
-    if detector_engine.engaged_status:
-        timer_placeholder.markdown("**Session Completed!**")
-        progress_placeholder.progress(1.0)
-        
+    if len(detector_engine.engaged_status) > 0:
+        presenter.timer_placeholder.markdown("**Session Completed!**")
+        presenter.progress_placeholder.progress(1.0)
+
         # Post data and show summary
-        summary = post_engagement_data(session, detector_engine.engaged_status, 
-                                     session.duration * 60, fps)
-        
+        if live_summary is not None and live_summary["total_frames"]:
+            summary = live_summary
+            st.success("Session scored and saved by the server.", icon="✅")
+        else:
+            # Same key as the live session, so a server that also stored it keeps one record
+            summary = post_engagement_data(session, detector_engine.engaged_status,
+                                         session.duration * 60, fps,
+                                         idempotency_key=live.session_id if live is not None else None)
+
         st.success(f"Session ended. Total disengaged: {detector_engine.total_disengaged/fps:.1f}s", icon="✅")
-        
+
         # Create engagement chart
         st.subheader("📊 Engagement Summary")
-        
+
         if summary:
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -190,11 +650,40 @@ def run_engagement_session(session, model_path: str):
                 st.metric("Disengaged Time", f"{summary['disengaged_seconds']:.1f}s")
             with col3:
                 st.metric("Total Frames", summary['total_frames'])
-        
+
         # Engagement timeline
         if len(detector_engine.engaged_status) > 0:
             df = pd.DataFrame({
-                "Time (s)": [i/fps for i in range(len(detector_engine.engaged_status))],
+                "Time (s)": np.arange(len(detector_engine.engaged_status)) / fps,
                 "Engagement": detector_engine.engaged_status
             })
-            st.line_chart(df.set_index("Time (s)"), height=300)
\ No newline at end of file
+            st.line_chart(df.set_index("Time (s)"), height=300)
+
+
+
+def show_classroom_summary(session, tracker: ClassroomTracker, fps: float, presenter: SessionPresenter):
+    """Upload one result per tracked student and show a per-student table"""
+    students = tracker.all_tracks()
+    if not students:
+        st.warning("No students were tracked long enough to report.", icon="⚠️")
+        return
+
+    presenter.timer_placeholder.markdown("**Session Completed!**")
+    presenter.progress_placeholder.progress(1.0)
+
+    rows = []
+    for track in sorted(students, key=lambda t: t.track_id):
+        student = replace(session, name=f"{session.name} - Student {track.track_id}",
+                          matric_id=f"{session.matric_id}-{track.track_id:02d}")
+        engaged_status = track.detector.engaged_status
+        summary = post_engagement_data(student, engaged_status, len(engaged_status) / fps, fps)
+        rows.append({
+            "Student": track.track_id,
+            "Matric": student.matric_id,
+            "Engagement (%)": round(summary["engaged_percentage"], 1),
+            "Disengaged (s)": round(summary["disengaged_seconds"], 1),
+            "Frames": summary["total_frames"],
+        })
+
+    st.subheader("📊 Classroom Engagement Summary")
+    st.dataframe(pd.DataFrame(rows).set_index("Student"), use_container_width=True)
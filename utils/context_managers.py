@@ -1,14 +1,18 @@
-from imutils.video import VideoStream
-import time
 from contextlib import contextmanager
-import cv2
+from core.camera_manager import CameraManager
+from config.settings import CameraConfig
 
 @contextmanager
-def video_stream_context(camera_index: int):
-    """Context manager for video stream"""
-    vs = VideoStream(src=camera_index, apiPreference=cv2.CAP_DSHOW).start()
-    time.sleep(1.0)
+def video_stream_context(camera_index: int, ready_timeout: float = CameraConfig.READY_TIMEOUT):
+    """Context manager for video stream.
+
+    Borrows the warm capture handle for the camera and waits until it
+    delivers a fresh frame; the device stays open after the session.
+    """
+    vs = CameraManager.acquire(camera_index)
     try:
+        if not vs.wait_ready(ready_timeout):
+            raise RuntimeError(f"Camera {camera_index} did not deliver a frame within {ready_timeout:.0f}s")
         yield vs
     finally:
-        vs.stop()
\ No newline at end of file
+        CameraManager.release(camera_index)